@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga: AsyncStarWarsQA contra StarWarsDynamicQA
+
+Dispara o mesmo conjunto de perguntas contra um Neo4j já importado e
+compara a vazão (perguntas/s) da classe síncrona, sequencial e com
+threads, com a assíncrona em um único event loop. O cache de respostas
+fica desligado para que toda pergunta chegue ao banco.
+
+Uso: python benchmarks/bench_async_qa.py [--questions 2000] [--concurrency 1 8 32 128]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("QA_CACHE_TTL", "0")
+
+from src.core.async_qa_system import AsyncStarWarsQA
+from src.core.qa_system import StarWarsDynamicQA
+
+QUESTIONS = [
+    "Quem é Luke Skywalker?",
+    "Quantas naves Han Solo pilota?",
+    "Quais filmes Leia Organa aparece?",
+    "Em que planeta Luke Skywalker nasceu?",
+    "Qual a espécie de Chewbacca?",
+    "Listar citações de Darth Vader",
+    "Listar personagens",
+]
+
+
+def workload(total: int):
+    """Perguntas variadas repetidas até total"""
+    return [QUESTIONS[i % len(QUESTIONS)] for i in range(total)]
+
+
+def bench_sync(questions, concurrency: int) -> float:
+    """Perguntas/s da classe síncrona (concurrency threads ≈ workers do Flask)"""
+    qa = StarWarsDynamicQA()
+    # A thread de aquecimento não concorre com as perguntas medidas, como após /ready
+    qa.warmup.wait()
+    started = time.perf_counter()
+    if concurrency == 1:
+        for question in questions:
+            qa.ask(question)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(qa.ask, questions))
+    return len(questions) / (time.perf_counter() - started)
+
+
+async def bench_async(questions, concurrency: int) -> float:
+    """Perguntas/s da classe assíncrona com até concurrency perguntas em voo"""
+    async with AsyncStarWarsQA() as qa:
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def ask(question):
+            async with semaphore:
+                return await qa.ask(question)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(ask(question) for question in questions))
+        return len(questions) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    args = parser.parse_args()
+    
+    questions = workload(args.questions)
+    print(f"{'concorrência':>12} {'sync (q/s)':>12} {'async (q/s)':>12} {'ganho':>8}")
+    for concurrency in args.concurrency:
+        sync_rate = bench_sync(questions, concurrency)
+        async_rate = asyncio.run(bench_async(questions, concurrency))
+        print(f"{concurrency:>12} {sync_rate:>12.1f} {async_rate:>12.1f} "
+              f"{async_rate / sync_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark do FuzzyMatcher contra o difflib.get_close_matches
+
+Uso: python benchmarks/bench_fuzzy_matcher.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from difflib import get_close_matches
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.fuzzy_matcher import FuzzyMatcher
+
+CONSONANTS = "bcdfghjklmnprstvwz"
+VOWELS = "aeiouy"
+
+
+def random_name(rng: random.Random) -> str:
+    """Nome sintético de duas palavras ("kalo vendu")"""
+    def word():
+        return "".join(
+            rng.choice(CONSONANTS) + rng.choice(VOWELS)
+            + (rng.choice(CONSONANTS) if rng.random() < 0.3 else "")
+            for _ in range(rng.randint(2, 3))
+        )
+    return f"{word()} {word()}"
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Remove ou troca uma ou duas letras"""
+    chars = list(name)
+    for _ in range(rng.randint(1, 2)):
+        position = rng.randrange(len(chars))
+        if rng.random() < 0.5:
+            del chars[position]
+        else:
+            chars[position] = rng.choice("aeiourstlnk")
+    return "".join(chars)
+
+
+def timed(fn, queries):
+    """Tempo médio por consulta, em milissegundos"""
+    started = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--baseline-queries", type=int, default=10,
+                        help="Consultas do get_close_matches (varredura linear, lenta)")
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    print(f"{'nomes':>8} {'build (s)':>10} {'trigramas (ms)':>15} {'difflib (ms)':>13} {'acerto top-1':>13}")
+    for size in args.sizes:
+        names = list({random_name(rng) for _ in range(size)})
+        targets = [rng.choice(names) for _ in range(args.queries)]
+        queries = [misspell(name, rng) for name in targets]
+        
+        started = time.perf_counter()
+        matcher = FuzzyMatcher(names)
+        build_seconds = time.perf_counter() - started
+        
+        index_ms = timed(lambda q: matcher.search(q, limit=5), queries)
+        baseline = queries[:args.baseline_queries]
+        difflib_ms = timed(lambda q: get_close_matches(q, names, n=5, cutoff=0.6), baseline)
+        
+        hits = sum(
+            1 for query, target in zip(queries, targets)
+            if (matcher.search(query, limit=1) or [("", 0)])[0][0] == target
+        )
+        print(f"{len(names):>8} {build_seconds:>10.2f} {index_ms:>15.3f} {difflib_ms:>13.1f} "
+              f"{hits / len(queries):>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark do IntentRecognizer contra a detecção anterior (lower() e laço por palavra-chave)
+
+Mede as palavras-chave atuais do QA e conjuntos sintéticos maiores, para
+mostrar que o custo do regex compilado não cresce com o número de palavras.
+
+Uso: python benchmarks/bench_intent.py [--keywords 10 100 1000 10000]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.intent import IntentRecognizer
+
+RELATIONS = {
+    "naves": ("PILOTS", "Starship", "name"),
+    "ship": ("PILOTS", "Starship", "name"),
+    "citações": ("SAID", "Quote", "quote"),
+    "quotes": ("SAID", "Quote", "quote"),
+    "espécies": ("IS_SPECIES", "Species", "name"),
+    "espécie": ("IS_SPECIES", "Species", "name"),
+    "planeta": ("BORN_ON", "Planet", "name"),
+    "filmes": ("APPEARS_IN", "Film", "title"),
+    "filme": ("APPEARS_IN", "Film", "title"),
+}
+
+QUESTIONS = [
+    "Quantas naves Han Solo pilota?",
+    "Quais filmes Luke Skywalker aparece?",
+    "Quem é Darth Vader?",
+    "Listar citações do Yoda",
+    "Qual o planeta natal de Leia Organa?",
+]
+
+
+def legacy_parse(relations, question):
+    """Detecção anterior de relação e intent"""
+    relation = None
+    for key, val in relations.items():
+        if key in question.lower():
+            relation = val
+            break
+    ql = question.lower()
+    if ql.startswith("quant") or "quantos" in ql or "quantas" in ql:
+        intent = "count"
+    elif ql.startswith("quais") or ql.startswith("listar"):
+        intent = "list"
+    else:
+        intent = None
+    return intent, relation
+
+
+def synthetic_relations(size: int, rng: random.Random):
+    """As palavras-chave reais seguidas de palavras aleatórias que não aparecem nas perguntas"""
+    relations = dict(RELATIONS)
+    while len(relations) < size:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 12)))
+        relations[f"{word}x"] = ("RELATED", "Thing", "name")
+    return relations
+
+
+def per_call_us(fn, questions, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for question in questions:
+            fn(question)
+    return (time.perf_counter() - started) * 1e6 / (rounds * len(questions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keywords", type=int, nargs="+", default=[len(RELATIONS), 100, 1000, 10000])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    print(f"{'palavras':>9} {'anterior (µs)':>14} {'compilado (µs)':>15}")
+    for size in args.keywords:
+        relations = synthetic_relations(size, rng)
+        recognizer = IntentRecognizer(relations)
+        for question in QUESTIONS:
+            assert recognizer.recognize(question)[:2] == legacy_parse(relations, question), question
+        rounds = max(1, args.rounds * len(RELATIONS) // size)
+        legacy = per_call_us(lambda q: legacy_parse(relations, q), QUESTIONS, rounds)
+        compiled = per_call_us(recognizer.recognize, QUESTIONS, args.rounds)
+        print(f"{size:>9} {legacy:>14.2f} {compiled:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
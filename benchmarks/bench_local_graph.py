@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark do LocalGraphBackend: carga do SQLite e do snapshot binário, e latência por intent
+
+Usa o star_wars.db informado ou gera um banco sintético com o schema do
+importador (benchmarks/dataset.py, escalado até --characters personagens).
+
+Uso: python benchmarks/bench_local_graph.py [--db star_wars.db] [--characters 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from dataset import BASE_COUNTS, create_db, scaled_counts
+from src.core.local_graph import LocalGraphBackend
+from src.core.snapshot import SnapshotBackend, export_snapshot
+
+PILOTS = ("PILOTS", "Starship", "name")
+FILMS = ("APPEARS_IN", "Film", "title")
+
+
+def per_call_us(fn, args_list):
+    """Tempo médio por chamada, em microssegundos"""
+    started = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - started) * 1e6 / len(args_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", help="star_wars.db existente (padrão: banco sintético)")
+    parser.add_argument("--characters", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db
+        if path is None:
+            path = os.path.join(tmp, "star_wars.db")
+            create_db(path, scaled_counts(args.characters / BASE_COUNTS["characters"]))
+        
+        started = time.perf_counter()
+        backend = LocalGraphBackend(path)
+        print(f"carga (SQLite): {(time.perf_counter() - started) * 1000:.1f} ms")
+        
+        snapshot_path = os.path.join(tmp, "star_wars.graph")
+        started = time.perf_counter()
+        export_snapshot(path, snapshot_path)
+        print(f"exportação do snapshot: {(time.perf_counter() - started) * 1000:.1f} ms "
+              f"({os.path.getsize(snapshot_path) / 1024:.0f} KiB)")
+        started = time.perf_counter()
+        snapshot = SnapshotBackend(snapshot_path)
+        print(f"carga (snapshot): {(time.perf_counter() - started) * 1000:.1f} ms")
+        
+        names = list(backend.graph.names["Character"])
+        sample = [rng.choice(names) for _ in range(args.lookups)]
+        for label, source in [("SQLite", backend), ("snapshot", snapshot)]:
+            for intent, relation in [("count", PILOTS), ("list", FILMS), ("detail", None)]:
+                latency = per_call_us(source.run, [(intent, name, relation) for name in sample])
+                print(f"{label:>8} {intent:>6}: {latency:.2f} µs/consulta")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Benchmark em escala: importação por etapa e latência do QA em bancos sintéticos
+
+Para cada escala (10×, 100×, 1000× o star_wars.db original) gera o banco com
+benchmarks/dataset.py, executa import_all() e registra o tempo de cada etapa,
+e repete uma mistura de perguntas em StarWarsDynamicQA.ask() sobre o
+LocalGraphBackend, reportando p50/p95/p99 e perguntas/s.
+
+Sem --neo4j nada sai da máquina: o importador escreve em um driver que só
+conta as instruções, então a importação mede leitura do SQLite, hashes,
+lotes e pares de relacionamentos. Com --neo4j a importação vai para o Neo4j
+de NEO4J_URI, que é LIMPO antes da carga. O cache de respostas fica desligado
+(--cache liga). --json grava os resultados com o commit atual, para comparar
+execuções entre commits.
+
+Uso: python benchmarks/bench_scale.py [--scales 10 100 1000] [--questions 5000] [--json out.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from dataset import create_db, scaled_counts
+
+# (peso, pergunta) da mistura repetida no QA; {name} é um personagem sorteado
+QUESTION_MIX = [
+    (4, "Quem é {name}?"),
+    (3, "Quantas naves {name} pilota?"),
+    (3, "Quais filmes {name} aparece?"),
+    (2, "Quais naves {name} pilota?"),
+    (2, "Qual a espécie de {name}?"),
+    (2, "Em que planeta {name} nasceu?"),
+    (2, "Listar citações de {name}"),
+    (1, "Listar personagens"),
+]
+
+
+class NullResult:
+    """Resultado vazio de uma instrução (iterável e com consume())"""
+    
+    def __iter__(self):
+        return iter(())
+    
+    def consume(self):
+        return None
+
+
+class NullDriver:
+    """Driver que só conta instruções e linhas enviadas, para importar sem Neo4j"""
+    
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self._lock = threading.Lock()
+    
+    def session(self, **kwargs):
+        return self
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def run(self, query: str, parameters=None, **params) -> NullResult:
+        with self._lock:
+            self.statements += 1
+            self.rows += len(params.get("rows", ()))
+        return NullResult()
+    
+    def execute_write(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+    
+    execute_read = execute_write
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por posição mais próxima em uma lista já ordenada"""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def bench_import(path: str, use_neo4j: bool, workers: int) -> Dict[str, Any]:
+    """Tempo de import_all() e de cada etapa"""
+    from import_to_neo4j import StarWarsNeo4jImporter
+    
+    importer = StarWarsNeo4jImporter(
+        os.getenv("NEO4J_URI", "bolt://localhost:7687"), os.getenv("NEO4J_USER", "neo4j"),
+        os.getenv("NEO4J_PASSWORD", "password"), path, workers=workers
+    )
+    if not use_neo4j:
+        importer.driver = NullDriver()
+    try:
+        started = time.perf_counter()
+        importer.import_all()
+        total = time.perf_counter() - started
+    finally:
+        importer.close()
+    result = {
+        "seconds": total,
+        "stages": {stage: timing["seconds"] for stage, timing in importer.stage_timings.items()},
+        "rows_per_sec": {entity: stats["rows_per_sec"] for entity, stats in importer.import_stats.items()},
+        "edges": sum(stats["edges"] for stats in importer.relationship_stats.values()),
+    }
+    if not use_neo4j:
+        result["statements"] = importer.driver.statements
+    return result
+
+
+def bench_qa(path: str, names: List[str], questions: int, rng: random.Random) -> Dict[str, Any]:
+    """Carga do grafo local e latência de ask() na mistura de perguntas"""
+    from src.core.local_graph import LocalGraphBackend
+    from src.core.qa_system import StarWarsDynamicQA
+    
+    started = time.perf_counter()
+    qa = StarWarsDynamicQA(backend=LocalGraphBackend(path))
+    load_seconds = time.perf_counter() - started
+    # As perguntas começam com o aquecimento concluído, como após /ready
+    qa.warmup.wait()
+    
+    weights, templates = zip(*QUESTION_MIX)
+    workload = [template.format(name=rng.choice(names))
+                for template in rng.choices(templates, weights=weights, k=questions)]
+    latencies = []
+    started = time.perf_counter()
+    for question in workload:
+        asked = time.perf_counter()
+        qa.ask(question)
+        latencies.append(time.perf_counter() - asked)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "load_seconds": load_seconds,
+        "warmup_seconds": qa.warmup.seconds,
+        "questions": questions,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "per_sec": questions / elapsed,
+    }
+
+
+def git_commit() -> str:
+    """Commit atual do repositório (ou "desconhecido")"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=float, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1, help="Etapas da importação em paralelo")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--neo4j", action="store_true", help="Importa no Neo4j de NEO4J_URI (limpa o banco!)")
+    parser.add_argument("--cache", action="store_true", help="Mantém o cache de respostas do QA")
+    parser.add_argument("--keep", metavar="DIR", help="Mantém os bancos gerados em DIR")
+    parser.add_argument("--json", metavar="PATH", help="Grava os resultados em JSON")
+    args = parser.parse_args()
+    
+    # Settings lê o ambiente ao ser importado: importador e QA só são
+    # importados dentro de bench_import/bench_qa, depois desta linha
+    if not args.cache:
+        os.environ["QA_CACHE_TTL"] = "0"
+    # Só o resumo de cada escala; o importador loga cada entidade e relação
+    logging.disable(logging.INFO)
+    
+    report = {"commit": git_commit(), "neo4j": args.neo4j, "cache": args.cache, "scales": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.keep or tmp
+        os.makedirs(directory, exist_ok=True)
+        for scale in args.scales:
+            path = os.path.join(directory, f"star_wars_{scale:g}x.db")
+            if os.path.exists(path):
+                os.remove(path)
+            counts = scaled_counts(scale)
+            started = time.perf_counter()
+            names = create_db(path, counts, args.seed)
+            generate_seconds = time.perf_counter() - started
+            
+            imported = bench_import(path, args.neo4j, args.workers)
+            answered = bench_qa(path, names["characters"], args.questions, random.Random(args.seed))
+            report["scales"].append({
+                "scale": scale, "rows": sum(counts.values()), "generate_seconds": generate_seconds,
+                "db_bytes": os.path.getsize(path), "import": imported, "qa": answered,
+            })
+            
+            print(f"\n== {scale:g}x: {sum(counts.values())} linhas "
+                  f"({os.path.getsize(path) / 1024:.0f} KiB, gerado em {generate_seconds:.2f}s)")
+            print(f"importação: {imported['seconds']:.2f}s, {imported['edges']} relacionamentos")
+            for stage, seconds in imported["stages"].items():
+                print(f"  {stage:>14}: {seconds * 1000:9.1f} ms")
+            print(f"QA: carga {answered['load_seconds'] * 1000:.1f} ms | "
+                  f"p50 {answered['p50_ms']:.3f} ms | p95 {answered['p95_ms']:.3f} ms | "
+                  f"p99 {answered['p99_ms']:.3f} ms | {answered['per_sec']:.0f} perguntas/s")
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as out:
+            json.dump(report, out, indent=2)
+        print(f"\nResultados gravados em {args.json} (commit {report['commit']})")
+
+
+if __name__ == "__main__":
+    main()
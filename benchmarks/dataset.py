@@ -0,0 +1,119 @@
+"""
+Gerador de star_wars.db sintéticos em escala, com o schema lido pelo importador
+
+As contagens base são as do banco original (96 personagens, 99 citações...),
+multiplicadas por `scale`; cada personagem tem espécie, planeta natal e
+filmes, naves têm pilotos e citações têm autor, então todas as relações de
+graph_schema aparecem. A mesma semente gera sempre o mesmo banco.
+"""
+
+import os
+import random
+import sqlite3
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.config.graph_schema import ENTITY_SPECS
+
+# Linhas por tabela no star_wars.db original
+BASE_COUNTS = {
+    "species": 40,
+    "planets": 13,
+    "characters": 96,
+    "starships": 60,
+    "weapons": 60,
+    "organizations": 8,
+    "films": 9,
+    "quotes": 99,
+}
+
+# Colunas-lista e de valor único que o importador lê além de ENTITY_SPECS
+EXTRA_COLUMNS = {
+    "characters": ["species", "homeworld", "films"],
+    "quotes": ["character_name"],
+}
+
+FIRST_NAMES = ("Luke", "Leia", "Han", "Ben", "Padme", "Anakin", "Rey", "Finn", "Poe", "Jyn",
+               "Cassian", "Lando", "Mace", "Qui-Gon", "Ahsoka", "Din", "Bo-Katan", "Hera",
+               "Kanan", "Ezra", "Sabine", "Wedge", "Biggs", "Mon", "Bail", "Orson", "Saw",
+               "Galen", "Jango", "Boba", "Cad", "Asajj", "Kylo", "Armitage", "Wilhuff",
+               "Sheev", "Dooku", "Plo", "Kit", "Shaak")
+LAST_NAMES = ("Skywalker", "Organa", "Solo", "Kenobi", "Amidala", "Andor", "Erso", "Dameron",
+              "Calrissian", "Windu", "Jinn", "Tano", "Djarin", "Kryze", "Syndulla", "Jarrus",
+              "Bridger", "Wren", "Antilles", "Darklighter", "Mothma", "Krennic", "Gerrera",
+              "Fett", "Bane", "Ventress", "Ren", "Hux", "Tarkin", "Palpatine", "Koon", "Fisto",
+              "Ti", "Secura", "Billaba", "Kota", "Starkiller", "Marek", "Vos", "Drallig")
+
+
+def character_names(count: int) -> List[str]:
+    """Nomes únicos no formato "Nome Sobrenome" (com sufixo numérico além das combinações)"""
+    combinations = len(FIRST_NAMES) * len(LAST_NAMES)
+    names = []
+    for i in range(count):
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last = LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        names.append(f"{first} {last}" if i < combinations else f"{first} {last} {i // combinations}")
+    return names
+
+
+def scaled_counts(scale: float) -> Dict[str, int]:
+    """Linhas por tabela para `scale` vezes o banco original (mínimo de 1 por tabela)"""
+    return {table: max(1, round(count * scale)) for table, count in BASE_COUNTS.items()}
+
+
+def create_db(path: str, counts: Dict[str, int], seed: int = 42) -> Dict[str, List[str]]:
+    """
+    Cria o banco em `path` com as contagens por tabela
+    
+    Returns:
+        Nomes gerados por tabela (personagens, filmes...), usados para montar perguntas
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    for table, _, properties in ENTITY_SPECS.values():
+        columns = list(properties) + EXTRA_COLUMNS.get(table, [])
+        conn.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+    
+    characters = character_names(counts["characters"])
+    species = [f"Species {i}" for i in range(counts["species"])]
+    planets = [f"Planet {i}" for i in range(counts["planets"])]
+    films = [f"Episode {i}" for i in range(counts["films"])]
+    
+    def sample(values: List[str], low: int, high: int) -> str:
+        return ", ".join(rng.sample(values, min(len(values), rng.randint(low, high))))
+    
+    conn.executemany("INSERT INTO species (id, name, classification) VALUES (?, ?, ?)",
+                     [(i, name, rng.choice(("mammal", "reptile", "artificial")))
+                      for i, name in enumerate(species)])
+    conn.executemany("INSERT INTO planets (id, name, climate) VALUES (?, ?, ?)",
+                     [(i, name, rng.choice(("arid", "temperate", "frozen")))
+                      for i, name in enumerate(planets)])
+    conn.executemany("INSERT INTO films (id, title, release_date) VALUES (?, ?, ?)",
+                     [(i, title, f"{1977 + i}-05-25") for i, title in enumerate(films)])
+    conn.executemany(
+        "INSERT INTO characters (id, name, gender, height, species, homeworld, films) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(i, name, rng.choice(("male", "female")), rng.randint(60, 230), rng.choice(species),
+          rng.choice(planets), sample(films, 1, 4)) for i, name in enumerate(characters)]
+    )
+    conn.executemany(
+        "INSERT INTO starships (id, name, model, pilots, films) VALUES (?, ?, ?, ?, ?)",
+        [(i, f"Starship {i}", f"Model {i % 17}", sample(characters, 0, 3), sample(films, 1, 2))
+         for i in range(counts["starships"])]
+    )
+    for table in ("weapons", "organizations"):
+        conn.executemany(
+            f"INSERT INTO {table} (id, name, description, films) VALUES (?, ?, ?, ?)",
+            [(i, f"{table[:-1].title()} {i}", f"Synthetic {table[:-1]}", sample(films, 1, 3))
+             for i in range(counts[table])]
+        )
+    conn.executemany(
+        "INSERT INTO quotes (id, quote, source, character_name) VALUES (?, ?, ?, ?)",
+        [(i, f"Quote number {i}", rng.choice(films), rng.choice(characters))
+         for i in range(counts["quotes"])]
+    )
+    conn.commit()
+    conn.close()
+    return {"characters": characters, "films": films}
@@ -0,0 +1,24 @@
+import multiprocessing
+import os
+
+# Servidor de produção do chat: gunicorn -c gunicorn.conf.py web_chat:app
+# WEB_WORKERS processos, cada um com WEB_THREADS threads e seu próprio QA/pool
+bind = os.getenv("WEB_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.getenv("WEB_THREADS", "4"))
+worker_class = "gthread"
+
+# Requisições lentas (streams longos) e desligamento gracioso
+timeout = int(os.getenv("WEB_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+accesslog = os.getenv("WEB_ACCESS_LOG", "-")
+
+
+def worker_exit(server, worker):
+    """Fecha o QA do worker (e o driver do Neo4j) ao sair"""
+    app = getattr(worker, "wsgi", None)
+    provider = getattr(app, "extensions", {}).get("qa")
+    if provider is not None:
+        provider.close()
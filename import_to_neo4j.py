@@ -1,16 +1,99 @@
-import sqlite3
-import pandas as pd
+import hashlib
+import json
 import os
-from neo4j import GraphDatabase
-from typing import Dict, List
+import time
+import argparse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
 import logging
 
+from src.config.graph_schema import (CHARACTER_DEGREES, ENTITY_RELATIONSHIP_SPECS, ENTITY_SPECS,
+                                     NAME_PROPERTIES, RELATIONSHIP_SPECS, degree_property,
+                                     relationship_labels, relationship_types)
+from src.core.snapshot import export_snapshot
+from src.utils.database import DatabaseManager, split_list
+from src.utils.neo4j_pool import close_driver, get_driver, pool_stats
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tamanho padrão dos lotes enviados em cada UNWIND
+DEFAULT_BATCH_SIZE = 5000
+
+# Etapa → etapas que precisam terminar antes dela
+IMPORT_DEPENDENCIES = {
+    "species": [],
+    "planets": [],
+    "characters": ["species", "planets"],  # IS_SPECIES / BORN_ON
+    "starships": [],
+    "weapons": [],
+    "organizations": [],
+    "films": [],
+    "quotes": ["characters"],  # SAID
+    "relationships": list(ENTITY_SPECS),
+    "profiles": ["relationships"],
+}
+
+
+# Perfil desnormalizado de cada personagem, lido pelo intent "detail" do QA,
+# e os contadores por tipo de relacionamento lidos pelo intent "count".
+# Comprehensions de padrão percorrem cada relação separadamente, sem o
+# produto naves × citações de OPTIONAL MATCHes encadeados.
+PROFILE_QUERY = """
+UNWIND $rows AS row
+MATCH (c:Character {id: row.id})
+SET c.profile_species = head([(c)-[:IS_SPECIES]->(s:Species) | s.name]),
+    c.profile_planet = head([(c)-[:BORN_ON]->(p:Planet) | p.name]),
+    c.profile_ships = [(c)-[:PILOTS]->(x:Starship) | x.name],
+    c.profile_quotes = [(c)-[:SAID]->(q:Quote) | q.quote]""" + "".join(
+    f",\n    c.{degree_property(rel, label)} = size([(c)-[:{rel}]->(:{label}) | 1])"
+    for rel, label in CHARACTER_DEGREES
+) + "\n"
+
+# Labels lidos pelo perfil e pelos contadores: mudar ou remover um desses nós
+# muda o perfil dos personagens ligados a ele
+PROFILE_LABELS = {label for _, label in CHARACTER_DEGREES}
+
+
+def _row_hash(row: Dict[str, Any], properties: List[str]) -> str:
+    """Hash do conteúdo de uma linha, usado pela sincronização incremental"""
+    values = [row.get(prop) for prop in properties]
+    return hashlib.sha1(json.dumps(values, default=str).encode("utf-8")).hexdigest()
+
+
+def _merge_pairs_query(rel: str, source_label: str, target_label: str) -> str:
+    """MERGE em lote de pares {source, target} pelos ids"""
+    return f"""
+        UNWIND $rows AS row
+        MATCH (a:{source_label} {{id: row.source}})
+        MATCH (b:{target_label} {{id: row.target}})
+        MERGE (a)-[:{rel}]->(b)
+    """
+
+
+def _create_nodes_query(label: str, properties: List[str]) -> str:
+    """Monta o CREATE em lote (UNWIND) para um label"""
+    fields = ",\n        ".join(f"{prop}: row.{prop}" for prop in properties + ["row_hash"])
+    return (
+        "UNWIND $rows AS row\n"
+        f"CREATE (n:{label} {{\n        {fields}\n    }})"
+    )
+
+
+def _run_batch(tx, query: str, rows: List[Dict[str, Any]]):
+    """Executa um lote dentro de uma transação de escrita"""
+    tx.run(query, rows=rows).consume()
+
+
+def _read_records(tx, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Executa uma leitura e devolve os registros como dicts"""
+    return [record.data() for record in tx.run(query, params)]
+
+
 class StarWarsNeo4jImporter:
-    def __init__(self, neo4j_uri: str, neo4j_user: str, neo4j_password: str, sqlite_db: str):
+    def __init__(self, neo4j_uri: str, neo4j_user: str, neo4j_password: str, sqlite_db: str,
+                 batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1):
         """
         Inicializa o importador
         
@@ -19,20 +102,69 @@ class StarWarsNeo4jImporter:
             neo4j_user: Usuário do Neo4j
             neo4j_password: Senha do Neo4j
             sqlite_db: Caminho para o banco SQLite
+            batch_size: Linhas enviadas por transação no carregamento em lote
+            workers: Etapas independentes importadas em paralelo
         """
-        self.driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser maior que zero")
+        if workers < 1:
+            raise ValueError("workers deve ser maior que zero")
+        # Driver compartilhado, com o pool configurado em Settings
+        self.neo4j_uri = neo4j_uri
+        self.neo4j_user = neo4j_user
+        self.driver = get_driver(neo4j_uri, neo4j_user, neo4j_password)
         self.sqlite_db = sqlite_db
-        
+        self.db = DatabaseManager(sqlite_db)
+        self.batch_size = batch_size
+        self.workers = workers
+        # entidade → {"rows", "seconds", "rows_per_sec"}
+        self.import_stats: Dict[str, Dict[str, float]] = {}
+        # "Origem-TIPO->Destino" → {"edges", "seconds"}
+        self.relationship_stats: Dict[str, Dict[str, float]] = {}
+        # etapa → {"start", "seconds"} (start relativo ao início da importação)
+        self.stage_timings: Dict[str, Dict[str, float]] = {}
+        # entidade ou "Origem-TIPO->Destino" → contagens da última sync()
+        self.sync_stats: Dict[str, Dict[str, int]] = {}
+    
     def close(self):
         """Fecha a conexão com o Neo4j"""
-        self.driver.close()
-        
+        stats = pool_stats().get(self.neo4j_uri)
+        if stats:
+            logger.info(f"Pool Neo4j: {stats['max_in_use']} sessões simultâneas no pico "
+                        f"(pool de {stats['max_size']}), {stats['sessions']} sessões abertas, "
+                        f"{stats['connections_created']} conexões criadas, espera máxima de "
+                        f"{stats['acquisition_wait_max_ms']:.1f} ms")
+        close_driver(self.neo4j_uri, self.neo4j_user)
+        self.db.close()
+    
     def clear_database(self):
         """Limpa todos os dados do Neo4j"""
         with self.driver.session() as session:
             session.run("MATCH (n) DETACH DELETE n")
             logger.info("Banco de dados Neo4j limpo")
     
+    def graph_stats(self) -> Dict[str, Dict[str, int]]:
+        """Nós por label e relacionamentos por tipo, lidos do count store do Neo4j"""
+        def count(query: str) -> int:
+            records = self._read_graph(query)
+            return records[0]["count"] if records else 0
+        labels = [label for _, label, _ in ENTITY_SPECS.values()]
+        types = list(dict.fromkeys(rel for rel, _, _ in relationship_types()))
+        return {
+            "labels": {label: count(f"MATCH (:{label}) RETURN count(*) AS count") for label in labels},
+            "relationships": {rel: count(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS count")
+                              for rel in types},
+        }
+    
+    def mark_graph_version(self):
+        """Grava uma nova versão do grafo (invalida os caches do QA) e as contagens globais"""
+        stats = json.dumps(self.graph_stats())
+        with self.driver.session() as session:
+            session.run("MERGE (m:GraphMeta {id: 'graph'}) "
+                        "SET m.version = randomUUID(), m.updated_at = datetime(), m.stats = $stats",
+                        stats=stats)
+        logger.info("Versão do grafo atualizada")
+    
     def create_constraints(self):
         """Cria constraints únicos para evitar duplicatas"""
         constraints = [
@@ -47,7 +179,9 @@ class StarWarsNeo4jImporter:
             "CREATE CONSTRAINT city_id IF NOT EXISTS FOR (c:City) REQUIRE c.id IS UNIQUE",
             "CREATE CONSTRAINT droid_id IF NOT EXISTS FOR (d:Droid) REQUIRE d.id IS UNIQUE",
             "CREATE CONSTRAINT quote_id IF NOT EXISTS FOR (q:Quote) REQUIRE q.id IS UNIQUE",
-            "CREATE CONSTRAINT battle_id IF NOT EXISTS FOR (b:Battle) REQUIRE b.id IS UNIQUE"
+            "CREATE CONSTRAINT battle_id IF NOT EXISTS FOR (b:Battle) REQUIRE b.id IS UNIQUE",
+            # Consultas do QA buscam personagens pelo nome
+            "CREATE INDEX character_name IF NOT EXISTS FOR (c:Character) ON (c.name)"
         ]
         
         with self.driver.session() as session:
@@ -58,311 +192,458 @@ class StarWarsNeo4jImporter:
                 except Exception as e:
                     logger.warning(f"Constraint já existe ou erro: {e}")
     
-    def import_species(self):
-        """Importa espécies"""
-        conn = sqlite3.connect(self.sqlite_db)
-        df = pd.read_sql_query("SELECT * FROM species", conn)
-        conn.close()
-        
+    def _iter_batches(self, table: str) -> Iterator[List[Dict[str, Any]]]:
+        """Lê uma tabela do SQLite em lotes de batch_size (conexão de leitura da thread)"""
+        return self.db.iter_batches(table, self.batch_size)
+    
+    def _write_batches(self, query: str, rows: List[Dict[str, Any]]):
+        """Envia as linhas em lotes de batch_size, uma transação por lote"""
         with self.driver.session() as session:
-            for _, row in df.iterrows():
-                session.run("""
-                    CREATE (s:Species {
-                        id: $id,
-                        name: $name,
-                        classification: $classification,
-                        designation: $designation,
-                        average_height: $average_height,
-                        skin_colors: $skin_colors,
-                        hair_colors: $hair_colors,
-                        eye_colors: $eye_colors,
-                        average_lifespan: $average_lifespan,
-                        language: $language,
-                        homeworld: $homeworld
-                    })
-                """, dict(row))
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                session.execute_write(_run_batch, query, batch)
+    
+    def _node_row(self, row: Dict[str, Any], properties: List[str]) -> Dict[str, Any]:
+        """Seleciona as propriedades do nó e acrescenta o row_hash"""
+        node_row = {prop: row.get(prop) for prop in properties}
+        node_row["row_hash"] = _row_hash(row, properties)
+        return node_row
+    
+    def _load_nodes(self, entity: str) -> int:
+        """
+        Cria os nós da entidade lote a lote, direto do cursor SQLite
         
-        logger.info(f"Importadas {len(df)} espécies")
+        Os relacionamentos de ENTITY_RELATIONSHIP_SPECS cuja dona é esta entidade
+        são criados junto com cada lote. O nome do alvo é resolvido para ids pelo
+        _name_index (SQLite) e a escrita casa os dois lados pelo id, que tem
+        constraint: Species e Planet não têm índice de nome.
+        """
+        table, label, properties = ENTITY_SPECS[entity]
+        query = _create_nodes_query(label, properties)
+        links = []
+        for rel, owner, column, target, owner_is_source in ENTITY_RELATIONSHIP_SPECS:
+            if owner == entity:
+                source_label, target_label = relationship_labels(owner, target, owner_is_source)
+                links.append((column, owner_is_source, self._name_index(target),
+                              _merge_pairs_query(rel, source_label, target_label)))
+        
+        count = 0
+        with self.driver.session() as session:
+            for batch in self._iter_batches(table):
+                session.execute_write(_run_batch, query,
+                                      [self._node_row(row, properties) for row in batch])
+                for column, owner_is_source, name_index, link_query in links:
+                    pairs = []
+                    for row in batch:
+                        if row.get(column) is None:
+                            continue
+                        for target_id in name_index.get(str(row[column]).strip(), []):
+                            pair = (row["id"], target_id) if owner_is_source else (target_id, row["id"])
+                            pairs.append({"source": pair[0], "target": pair[1]})
+                    if pairs:
+                        session.execute_write(_run_batch, link_query, pairs)
+                count += len(batch)
+        return count
+    
+    def _record_stats(self, entity: str, count: int, started: float) -> float:
+        """Registra tempo e vazão (linhas/s) de uma entidade"""
+        seconds = time.perf_counter() - started
+        rate = count / seconds if seconds > 0 else float(count)
+        self.import_stats[entity] = {
+            "rows": count,
+            "seconds": seconds,
+            "rows_per_sec": rate,
+        }
+        return rate
+    
+    def import_species(self):
+        """Importa espécies"""
+        started = time.perf_counter()
+        count = self._load_nodes("species")
+        rate = self._record_stats("species", count, started)
+        logger.info(f"Importadas {count} espécies ({rate:.0f} linhas/s)")
     
     def import_planets(self):
         """Importa planetas"""
-        conn = sqlite3.connect(self.sqlite_db)
-        df = pd.read_sql_query("SELECT * FROM planets", conn)
-        conn.close()
-        
-        with self.driver.session() as session:
-            for _, row in df.iterrows():
-                session.run("""
-                    CREATE (p:Planet {
-                        id: $id,
-                        name: $name,
-                        diameter: $diameter,
-                        rotation_period: $rotation_period,
-                        orbital_period: $orbital_period,
-                        gravity: $gravity,
-                        population: $population,
-                        climate: $climate,
-                        terrain: $terrain,
-                        surface_water: $surface_water,
-                        residents: $residents,
-                        films: $films
-                    })
-                """, dict(row))
-        
-        logger.info(f"Importados {len(df)} planetas")
+        started = time.perf_counter()
+        count = self._load_nodes("planets")
+        rate = self._record_stats("planets", count, started)
+        logger.info(f"Importados {count} planetas ({rate:.0f} linhas/s)")
     
     def import_characters(self):
-        """Importa personagens"""
-        conn = sqlite3.connect(self.sqlite_db)
-        df = pd.read_sql_query("SELECT * FROM characters", conn)
-        conn.close()
-        
-        with self.driver.session() as session:
-            for _, row in df.iterrows():
-                # Criar personagem
-                session.run("""
-                    CREATE (c:Character {
-                        id: $id,
-                        name: $name,
-                        gender: $gender,
-                        height: $height,
-                        weight: $weight,
-                        hair_color: $hair_color,
-                        eye_color: $eye_color,
-                        skin_color: $skin_color,
-                        year_born: $year_born,
-                        year_died: $year_died,
-                        description: $description
-                    })
-                """, dict(row))
-                
-                # Relacionar com espécie
-                species_value = row.get('species')
-                if species_value is not None and pd.notna(species_value) and str(species_value) != 'nan':
-                    session.run("""
-                        MATCH (c:Character {id: $char_id})
-                        MATCH (s:Species {name: $species_name})
-                        CREATE (c)-[:IS_SPECIES]->(s)
-                    """, char_id=row['id'], species_name=str(species_value))
-                
-                # Relacionar com planeta natal
-                homeworld_value = row.get('homeworld')
-                if homeworld_value is not None and pd.notna(homeworld_value) and str(homeworld_value) != 'nan':
-                    session.run("""
-                        MATCH (c:Character {id: $char_id})
-                        MATCH (p:Planet {name: $planet_name})
-                        CREATE (c)-[:BORN_ON]->(p)
-                    """, char_id=row['id'], planet_name=str(homeworld_value))
-        
-        logger.info(f"Importados {len(df)} personagens")
+        """Importa personagens (com IS_SPECIES e BORN_ON)"""
+        started = time.perf_counter()
+        count = self._load_nodes("characters")
+        rate = self._record_stats("characters", count, started)
+        logger.info(f"Importados {count} personagens ({rate:.0f} linhas/s)")
     
     def import_starships(self):
         """Importa naves espaciais"""
-        conn = sqlite3.connect(self.sqlite_db)
-        df = pd.read_sql_query("SELECT * FROM starships", conn)
-        conn.close()
-        
-        with self.driver.session() as session:
-            for _, row in df.iterrows():
-                session.run("""
-                    CREATE (s:Starship {
-                        id: $id,
-                        name: $name,
-                        model: $model,
-                        manufacturer: $manufacturer,
-                        cost_in_credits: $cost_in_credits,
-                        length: $length,
-                        max_atmosphering_speed: $max_atmosphering_speed,
-                        crew: $crew,
-                        passengers: $passengers,
-                        cargo_capacity: $cargo_capacity,
-                        consumables: $consumables,
-                        hyperdrive_rating: $hyperdrive_rating,
-                        MGLT: $MGLT,
-                        starship_class: $starship_class,
-                        pilots: $pilots,
-                        films: $films
-                    })
-                """, dict(row))
-        
-        logger.info(f"Importadas {len(df)} naves espaciais")
+        started = time.perf_counter()
+        count = self._load_nodes("starships")
+        rate = self._record_stats("starships", count, started)
+        logger.info(f"Importadas {count} naves espaciais ({rate:.0f} linhas/s)")
     
     def import_weapons(self):
         """Importa armas"""
-        conn = sqlite3.connect(self.sqlite_db)
-        df = pd.read_sql_query("SELECT * FROM weapons", conn)
-        conn.close()
-        
-        with self.driver.session() as session:
-            for _, row in df.iterrows():
-                session.run("""
-                    CREATE (w:Weapon {
-                        id: $id,
-                        name: $name,
-                        model: $model,
-                        manufacturer: $manufacturer,
-                        cost_in_credits: $cost_in_credits,
-                        length: $length,
-                        type: $type,
-                        description: $description,
-                        films: $films
-                    })
-                """, dict(row))
-        
-        logger.info(f"Importadas {len(df)} armas")
+        started = time.perf_counter()
+        count = self._load_nodes("weapons")
+        rate = self._record_stats("weapons", count, started)
+        logger.info(f"Importadas {count} armas ({rate:.0f} linhas/s)")
     
     def import_organizations(self):
         """Importa organizações"""
-        conn = sqlite3.connect(self.sqlite_db)
-        df = pd.read_sql_query("SELECT * FROM organizations", conn)
-        conn.close()
-        
-        with self.driver.session() as session:
-            for _, row in df.iterrows():
-                session.run("""
-                    CREATE (o:Organization {
-                        id: $id,
-                        name: $name,
-                        founded: $founded,
-                        dissolved: $dissolved,
-                        leader: $leader,
-                        members: $members,
-                        affiliation: $affiliation,
-                        description: $description,
-                        films: $films
-                    })
-                """, dict(row))
-        
-        logger.info(f"Importadas {len(df)} organizações")
+        started = time.perf_counter()
+        count = self._load_nodes("organizations")
+        rate = self._record_stats("organizations", count, started)
+        logger.info(f"Importadas {count} organizações ({rate:.0f} linhas/s)")
     
     def import_films(self):
         """Importa filmes"""
-        conn = sqlite3.connect(self.sqlite_db)
-        df = pd.read_sql_query("SELECT * FROM films", conn)
-        conn.close()
+        started = time.perf_counter()
+        count = self._load_nodes("films")
+        rate = self._record_stats("films", count, started)
+        logger.info(f"Importados {count} filmes ({rate:.0f} linhas/s)")
+    
+    def import_quotes(self):
+        """Importa citações (com SAID)"""
+        started = time.perf_counter()
+        count = self._load_nodes("quotes")
+        rate = self._record_stats("quotes", count, started)
+        logger.info(f"Importadas {count} citações ({rate:.0f} linhas/s)")
+    
+    def _name_index(self, entity: str) -> Dict[str, List[Any]]:
+        """Mapeia nome (ou título) → ids da entidade, lendo só do SQLite"""
+        table, _, _ = ENTITY_SPECS[entity]
+        key = NAME_PROPERTIES.get(entity, "name")
+        index: Dict[str, List[Any]] = {}
+        for batch in self._iter_batches(table):
+            for row in batch:
+                if row.get(key) is not None:
+                    index.setdefault(str(row[key]).strip(), []).append(row["id"])
+        return index
+    
+    def _iter_pair_batches(self, owner: str, column: str, target: str, owner_is_source: bool,
+                           name_index: Dict[str, List[Any]],
+                           multi: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        """Gera, lote a lote, os pares (origem, destino) de uma coluna-lista (ou de valor único)"""
+        table, _, _ = ENTITY_SPECS[owner]
+        for batch in self._iter_batches(table):
+            pairs = set()
+            for row in batch:
+                value = row.get(column)
+                names = split_list(value) if multi else ([str(value).strip()] if value is not None else [])
+                for name in names:
+                    for target_id in name_index.get(name, []):
+                        if owner_is_source:
+                            pairs.add((row["id"], target_id))
+                        else:
+                            pairs.add((target_id, row["id"]))
+            if pairs:
+                yield [{"source": source, "target": target} for source, target in sorted(pairs)]
+    
+    def create_relationships(self):
+        """Cria relacionamentos entre entidades a partir das colunas-lista do SQLite"""
+        name_indexes: Dict[str, Dict[str, List[Any]]] = {}
         
-        with self.driver.session() as session:
-            for _, row in df.iterrows():
-                session.run("""
-                    CREATE (f:Film {
-                        id: $id,
-                        title: $title,
-                        release_date: $release_date,
-                        director: $director,
-                        producer: $producer,
-                        opening_crawl: $opening_crawl
-                    })
-                """, dict(row))
+        for rel, owner, column, target, owner_is_source in RELATIONSHIP_SPECS:
+            started = time.perf_counter()
+            if target not in name_indexes:
+                name_indexes[target] = self._name_index(target)
+            source_label, target_label = relationship_labels(owner, target, owner_is_source)
+            query = _merge_pairs_query(rel, source_label, target_label)
+            
+            edges = 0
+            for pairs in self._iter_pair_batches(owner, column, target, owner_is_source,
+                                                 name_indexes[target]):
+                self._write_batches(query, pairs)
+                edges += len(pairs)
+            
+            seconds = time.perf_counter() - started
+            key = f"{source_label}-{rel}->{target_label}"
+            self.relationship_stats[key] = {"edges": edges, "seconds": seconds}
+            logger.info(f"{key}: {edges} relacionamentos em {seconds:.2f}s")
         
-        logger.info(f"Importados {len(df)} filmes")
+        logger.info("Relacionamentos criados")
     
-    def import_quotes(self):
-        """Importa citações"""
-        conn = sqlite3.connect(self.sqlite_db)
-        df = pd.read_sql_query("SELECT * FROM quotes", conn)
-        conn.close()
+    def build_profiles(self, ids: Optional[Iterable[Any]] = None) -> int:
+        """
+        Grava o perfil desnormalizado (espécie, planeta, naves, citações) dos personagens
         
+        Sem ids (importação completa) percorre todos os personagens do SQLite;
+        com ids (sync) recalcula só os desses personagens.
+        """
+        started = time.perf_counter()
+        if ids is None:
+            batches = ([{"id": row["id"]} for row in batch] for batch in self._iter_batches("characters"))
+        else:
+            batches = iter([[{"id": character_id} for character_id in sorted(ids)]])
+        rows = 0
+        for batch in batches:
+            self._write_batches(PROFILE_QUERY, batch)
+            rows += len(batch)
+        logger.info(f"Perfis de {rows} personagens em {time.perf_counter() - started:.2f}s")
+        return rows
+    
+    def log_import_stats(self):
+        """Loga o resumo de vazão por entidade"""
+        for entity, stats in self.import_stats.items():
+            logger.info(
+                f"{entity}: {stats['rows']} linhas em {stats['seconds']:.2f}s "
+                f"({stats['rows_per_sec']:.0f} linhas/s)"
+            )
+    
+    def _read_graph(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Lê registros do Neo4j em uma transação de leitura"""
         with self.driver.session() as session:
-            for _, row in df.iterrows():
-                session.run("""
-                    CREATE (q:Quote {
-                        id: $id,
-                        quote: $quote,
-                        source: $source
-                    })
-                """, dict(row))
-                
-                # Relacionar com personagem
-                char_name_value = row.get('character_name')
-                if char_name_value is not None and pd.notna(char_name_value) and str(char_name_value) != 'nan':
-                    session.run("""
-                        MATCH (q:Quote {id: $quote_id})
-                        MATCH (c:Character {name: $char_name})
-                        CREATE (c)-[:SAID]->(q)
-                    """, quote_id=row['id'], char_name=str(char_name_value))
+            return session.execute_read(_read_records, query, params or {})
+    
+    def _sync_nodes(self, entity: str, touched: Optional[Set[Any]] = None) -> Dict[str, int]:
+        """
+        Aplica inserções, atualizações e remoções de uma entidade via MERGE no id
+        
+        Em touched são acrescentados os personagens cujo perfil muda: os
+        inseridos e os ligados a nós de PROFILE_LABELS atualizados ou removidos.
+        """
+        table, label, properties = ENTITY_SPECS[entity]
+        graph_hashes = {
+            record["id"]: record["hash"]
+            for record in self._read_graph(f"MATCH (n:{label}) RETURN n.id AS id, n.row_hash AS hash")
+        }
+        
+        upsert_query = f"""
+            UNWIND $rows AS row
+            MERGE (n:{label} {{id: row.id}})
+            SET n += row
+        """
+        source_ids = set()
+        inserted, updated = [], []
+        for batch in self._iter_batches(table):
+            upserts = []
+            for row in batch:
+                source_ids.add(row["id"])
+                node_row = self._node_row(row, properties)
+                if row["id"] not in graph_hashes:
+                    inserted.append(row["id"])
+                    upserts.append(node_row)
+                elif graph_hashes[row["id"]] != node_row["row_hash"]:
+                    updated.append(row["id"])
+                    upserts.append(node_row)
+            self._write_batches(upsert_query, upserts)
+        deleted = [{"id": node_id} for node_id in graph_hashes if node_id not in source_ids]
         
-        logger.info(f"Importadas {len(df)} citações")
+        if touched is not None:
+            if label == "Character":
+                touched.update(inserted)
+            changed = updated + [row["id"] for row in deleted]
+            if label in PROFILE_LABELS and changed:
+                # Antes do DETACH DELETE, enquanto as arestas ainda existem
+                touched.update(record["id"] for record in self._read_graph(
+                    f"MATCH (c:Character)-->(n:{label}) WHERE n.id IN $ids RETURN DISTINCT c.id AS id",
+                    {"ids": changed},
+                ))
+        
+        self._write_batches(f"""
+            UNWIND $rows AS row
+            MATCH (n:{label} {{id: row.id}})
+            DETACH DELETE n
+        """, deleted)
+        
+        return {"inserted": len(inserted), "updated": len(updated), "deleted": len(deleted)}
     
-    def create_relationships(self):
-        """Cria relacionamentos entre entidades"""
-        with self.driver.session() as session:
-            # Relacionar personagens com naves (baseado no campo pilots)
-            session.run("""
-                MATCH (c:Character), (s:Starship)
-                WHERE s.pilots CONTAINS c.name
-                CREATE (c)-[:PILOTS]->(s)
-            """)
-            
-            # Relacionar personagens com filmes (baseado no campo films)
-            session.run("""
-                MATCH (c:Character), (f:Film)
-                WHERE f.title IN split(c.films, ', ')
-                CREATE (c)-[:APPEARS_IN]->(f)
-            """)
-            
-            # Relacionar naves com filmes
-            session.run("""
-                MATCH (s:Starship), (f:Film)
-                WHERE f.title IN split(s.films, ', ')
-                CREATE (s)-[:APPEARS_IN]->(f)
-            """)
-            
-            # Relacionar armas com filmes
-            session.run("""
-                MATCH (w:Weapon), (f:Film)
-                WHERE f.title IN split(w.films, ', ')
-                CREATE (w)-[:APPEARS_IN]->(f)
-            """)
-            
-            # Relacionar organizações com filmes
-            session.run("""
-                MATCH (o:Organization), (f:Film)
-                WHERE f.title IN split(o.films, ', ')
-                CREATE (o)-[:APPEARS_IN]->(f)
+    def _sync_relationships(self, rel: str, owner: str, column: str, target: str,
+                            owner_is_source: bool, multi: bool,
+                            name_index: Dict[str, List[Any]],
+                            touched: Optional[Set[Any]] = None) -> Dict[str, int]:
+        """
+        Cria e remove arestas de um tipo comparando os pares desejados com o grafo
+        
+        Em touched são acrescentados os personagens de origem das arestas
+        criadas ou removidas (os perfis só leem arestas que saem do personagem).
+        """
+        source_label, target_label = relationship_labels(owner, target, owner_is_source)
+        wanted = {
+            (pair["source"], pair["target"])
+            for pairs in self._iter_pair_batches(owner, column, target, owner_is_source,
+                                                 name_index, multi=multi)
+            for pair in pairs
+        }
+        existing = {
+            (record["source"], record["target"])
+            for record in self._read_graph(f"""
+                MATCH (a:{source_label})-[:{rel}]->(b:{target_label})
+                RETURN a.id AS source, b.id AS target
             """)
+        }
         
-        logger.info("Relacionamentos criados")
+        created = [{"source": s, "target": t} for s, t in sorted(wanted - existing)]
+        removed = [{"source": s, "target": t} for s, t in sorted(existing - wanted)]
+        if touched is not None and source_label == "Character":
+            touched.update(row["source"] for row in created + removed)
+        self._write_batches(_merge_pairs_query(rel, source_label, target_label), created)
+        self._write_batches(f"""
+            UNWIND $rows AS row
+            MATCH (a:{source_label} {{id: row.source}})-[r:{rel}]->(b:{target_label} {{id: row.target}})
+            DELETE r
+        """, removed)
+        
+        return {"created": len(created), "deleted": len(removed)}
+    
+    def sync(self):
+        """
+        Sincronização incremental: aplica apenas as diferenças do SQLite no Neo4j
+        
+        Compara o row_hash de cada nó com o conteúdo atual da linha (MERGE no id)
+        e recalcula o conjunto de arestas derivadas de cada tipo, sem limpar o banco.
+        Perfis e contadores só são recalculados para os personagens afetados.
+        """
+        logger.info("Iniciando sincronização incremental...")
+        started = time.perf_counter()
+        self.sync_stats = {}
+        self.create_constraints()
+        touched: Set[Any] = set()
+        
+        for entity in ENTITY_SPECS:
+            stats = self._sync_nodes(entity, touched)
+            self.sync_stats[entity] = stats
+            logger.info(f"{entity}: {stats['inserted']} inseridos, {stats['updated']} atualizados, "
+                        f"{stats['deleted']} removidos")
+        
+        name_indexes: Dict[str, Dict[str, List[Any]]] = {}
+        specs = [(spec, False) for spec in ENTITY_RELATIONSHIP_SPECS]
+        specs += [(spec, True) for spec in RELATIONSHIP_SPECS]
+        for (rel, owner, column, target, owner_is_source), multi in specs:
+            if target not in name_indexes:
+                name_indexes[target] = self._name_index(target)
+            stats = self._sync_relationships(rel, owner, column, target, owner_is_source,
+                                             multi, name_indexes[target], touched)
+            source_label, target_label = relationship_labels(owner, target, owner_is_source)
+            key = f"{source_label}-{rel}->{target_label}"
+            self.sync_stats[key] = stats
+            logger.info(f"{key}: {stats['created']} criados, {stats['deleted']} removidos")
+        
+        self.build_profiles(touched)
+        self.mark_graph_version()
+        logger.info(f"Sincronização concluída em {time.perf_counter() - started:.2f}s")
+    
+    def _run_stage(self, stage: str, started: float):
+        """Executa uma etapa e registra sua duração"""
+        stage_start = time.perf_counter()
+        if stage == "relationships":
+            self.create_relationships()
+        elif stage == "profiles":
+            self.build_profiles()
+        else:
+            getattr(self, f"import_{stage}")()
+        seconds = time.perf_counter() - stage_start
+        self.stage_timings[stage] = {
+            "start": stage_start - started,
+            "seconds": seconds,
+        }
+        logger.info(f"Etapa {stage} concluída em {seconds:.2f}s "
+                    f"(início em +{stage_start - started:.2f}s)")
+    
+    def run_stages(self, workers: Optional[int] = None):
+        """
+        Executa as etapas respeitando IMPORT_DEPENDENCIES
+        
+        Etapas independentes rodam ao mesmo tempo em até `workers` threads,
+        cada uma com sua própria sessão do driver.
+        """
+        workers = workers or self.workers
+        started = time.perf_counter()
+        pending = {stage: set(deps) for stage, deps in IMPORT_DEPENDENCIES.items()}
+        done: Set[str] = set()
+        running: Dict[Future, str] = {}
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import") as pool:
+            while pending or running:
+                for stage in [s for s, deps in pending.items() if deps <= done]:
+                    del pending[stage]
+                    running[pool.submit(self._run_stage, stage, started)] = stage
+                if not running:
+                    raise RuntimeError(f"Dependências circulares entre etapas: {sorted(pending)}")
+                
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage = running.pop(future)
+                    future.result()
+                    done.add(stage)
     
     def import_all(self):
         """Executa toda a importação"""
         logger.info("Iniciando importação para Neo4j...")
+        self.import_stats = {}
+        self.relationship_stats = {}
+        self.stage_timings = {}
         
         # Limpar banco e criar constraints
         self.clear_database()
         self.create_constraints()
         
-        # Importar dados
-        self.import_species()
-        self.import_planets()
-        self.import_characters()
-        self.import_starships()
-        self.import_weapons()
-        self.import_organizations()
-        self.import_films()
-        self.import_quotes()
+        # Importar dados e criar relacionamentos
+        started = time.perf_counter()
+        self.run_stages()
+        self.mark_graph_version()
         
-        # Criar relacionamentos
-        self.create_relationships()
-        
-        logger.info("Importação concluída!")
+        self.log_import_stats()
+        logger.info(f"Importação concluída em {time.perf_counter() - started:.2f}s "
+                    f"com {self.workers} worker(s)!")
 
 if __name__ == "__main__":
     # Carregar configurações do arquivo .env
     from dotenv import load_dotenv
     load_dotenv()
     
+    parser = argparse.ArgumentParser(description="Importa o star_wars.db para o Neo4j")
+    parser.add_argument(
+        "--batch-size", type=int,
+        default=int(os.getenv("NEO4J_IMPORT_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+        help="Linhas por transação no carregamento em lote"
+    )
+    parser.add_argument(
+        "--workers", type=int,
+        default=int(os.getenv("NEO4J_IMPORT_WORKERS", 1)),
+        help="Etapas independentes importadas em paralelo"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Aplica só as diferenças do SQLite, sem limpar o Neo4j"
+    )
+    parser.add_argument(
+        "--snapshot", metavar="PATH",
+        help="Também grava o snapshot binário do grafo (QA_BACKEND=snapshot)"
+    )
+    parser.add_argument(
+        "--snapshot-only", action="store_true",
+        help="Só grava o snapshot, sem acessar o Neo4j"
+    )
+    args = parser.parse_args()
+    
     # Configurações do arquivo .env
     NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
     NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
     NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
     SQLITE_DB = "star_wars.db"
     
+    if args.snapshot_only:
+        if not args.snapshot:
+            parser.error("--snapshot-only exige --snapshot PATH")
+        export_snapshot(SQLITE_DB, args.snapshot)
+        raise SystemExit(0)
+    
     print(f"Conectando ao Neo4j: {NEO4J_URI}")
     print(f"Usuário: {NEO4J_USER}")
     
-    importer = StarWarsNeo4jImporter(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, SQLITE_DB)
+    importer = StarWarsNeo4jImporter(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, SQLITE_DB,
+                                     batch_size=args.batch_size, workers=args.workers)
     
     try:
-        importer.import_all()
+        if args.incremental:
+            importer.sync()
+        else:
+            importer.import_all()
+        if args.snapshot:
+            export_snapshot(SQLITE_DB, args.snapshot)
     finally:
-        importer.close() 
\ No newline at end of file
+        importer.close()
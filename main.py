@@ -1,3 +1,4 @@
+import argparse
 import logging
 import sys
 from src.core.qa_system import StarWarsDynamicQA
@@ -9,8 +10,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def warmup(qa_system: StarWarsDynamicQA):
+    """Aquece o grafo (índices e templates das entidades mais perguntadas) e mostra o resultado"""
+    stats = qa_system.start_warmup(wait=True)
+    print(f"🔥 Grafo aquecido: {stats['queries']} consultas em {stats['seconds']:.2f}s "
+          f"({stats['errors']} erros)")
+    if stats['errors']:
+        sys.exit(1)
+
 def main():
     """Função principal da aplicação"""
+    parser = argparse.ArgumentParser(description=Settings.APP_NAME)
+    parser.add_argument(
+        "--warmup", action="store_true",
+        help="Só aquece o grafo (após reiniciar o Neo4j ou importar) e sai"
+    )
+    args = parser.parse_args()
     try:
         Settings.validate()
         logger.info("Configurações validadas com sucesso")
@@ -18,6 +33,10 @@ def main():
         qa_system = StarWarsDynamicQA()
         logger.info("Sistema QA inicializado com sucesso")
         
+        if args.warmup:
+            warmup(qa_system)
+            return
+        
         # Exemplos de perguntas
         example_queries = [
             "Quantas naves Han Solo pilota?",
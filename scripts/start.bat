@@ -24,21 +24,12 @@ if not exist .env (
     echo ⚠️  Arquivo .env não encontrado. Criando a partir do exemplo...
     copy env.example .env
     echo 📝 Por favor, edite o arquivo .env com suas credenciais antes de continuar.
-    echo    Especialmente a GOOGLE_API_KEY é obrigatória.
+    echo    Especialmente NEO4J_URI, NEO4J_USER e NEO4J_PASSWORD.
     pause
     exit /b 1
 )
 
-REM Verificar se GOOGLE_API_KEY está configurada
-findstr "GOOGLE_API_KEY=sua_chave_api_do_google_aqui" .env >nul
-if not errorlevel 1 (
-    echo ❌ GOOGLE_API_KEY não configurada no .env
-    echo    Por favor, edite o arquivo .env e configure sua API key do Google.
-    pause
-    exit /b 1
-) else (
-    echo ✅ Configurações encontradas no .env
-)
+echo ✅ Configurações encontradas no .env
 
 echo 🚀 Iniciando serviços com Docker Compose...
 
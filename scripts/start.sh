@@ -21,18 +21,11 @@ if [ ! -f .env ]; then
     echo "⚠️  Arquivo .env não encontrado. Criando a partir do exemplo..."
     cp env.example .env
     echo "📝 Por favor, edite o arquivo .env com suas credenciais antes de continuar."
-    echo "   Especialmente a GOOGLE_API_KEY é obrigatória."
+    echo "   Especialmente NEO4J_URI, NEO4J_USER e NEO4J_PASSWORD."
     exit 1
 fi
 
-# Verificar se GOOGLE_API_KEY está configurada
-if ! grep -q "GOOGLE_API_KEY=sua_chave_api_do_google_aqui" .env; then
-    echo "✅ Configurações encontradas no .env"
-else
-    echo "❌ GOOGLE_API_KEY não configurada no .env"
-    echo "   Por favor, edite o arquivo .env e configure sua API key do Google."
-    exit 1
-fi
+echo "✅ Configurações encontradas no .env"
 
 echo "🚀 Iniciando serviços com Docker Compose..."
 
@@ -10,7 +10,7 @@ setup(
     name="star-wars-qa",
     version="1.0.0",
     author="Star Wars QA Team",
-    description="Sistema de perguntas e respostas sobre Star Wars usando Neo4j e LangChain",
+    description="Sistema de perguntas e respostas sobre Star Wars usando Neo4j",
     long_description=long_description,
     long_description_content_type="text/markdown",
     packages=find_packages(),
@@ -2,7 +2,7 @@
 Star Wars Knowledge Graph QA System
 ==================================
 
-Sistema de perguntas e respostas sobre Star Wars usando Neo4j e LangChain.
+Sistema de perguntas e respostas sobre Star Wars usando Neo4j.
 """
 
 __version__ = "1.0.0"
@@ -0,0 +1,85 @@
+from typing import List, Tuple
+
+# Map: entidade → (tabela SQLite, label Neo4j, propriedades do nó)
+ENTITY_SPECS = {
+    "species": ("species", "Species", [
+        "id", "name", "classification", "designation", "average_height",
+        "skin_colors", "hair_colors", "eye_colors", "average_lifespan",
+        "language", "homeworld",
+    ]),
+    "planets": ("planets", "Planet", [
+        "id", "name", "diameter", "rotation_period", "orbital_period",
+        "gravity", "population", "climate", "terrain", "surface_water",
+        "residents", "films",
+    ]),
+    "characters": ("characters", "Character", [
+        "id", "name", "gender", "height", "weight", "hair_color", "eye_color",
+        "skin_color", "year_born", "year_died", "description",
+    ]),
+    "starships": ("starships", "Starship", [
+        "id", "name", "model", "manufacturer", "cost_in_credits", "length",
+        "max_atmosphering_speed", "crew", "passengers", "cargo_capacity",
+        "consumables", "hyperdrive_rating", "MGLT", "starship_class",
+        "pilots", "films",
+    ]),
+    "weapons": ("weapons", "Weapon", [
+        "id", "name", "model", "manufacturer", "cost_in_credits", "length",
+        "type", "description", "films",
+    ]),
+    "organizations": ("organizations", "Organization", [
+        "id", "name", "founded", "dissolved", "leader", "members",
+        "affiliation", "description", "films",
+    ]),
+    "films": ("films", "Film", [
+        "id", "title", "release_date", "director", "producer", "opening_crawl",
+    ]),
+    "quotes": ("quotes", "Quote", [
+        "id", "quote", "source",
+    ]),
+}
+
+# Campo usado para casar nomes nas colunas-lista (padrão: name)
+NAME_PROPERTIES = {"films": "title"}
+
+# Relacionamentos derivados de colunas-lista:
+# (tipo, entidade dona da coluna, coluna, entidade citada, dona é a origem?)
+RELATIONSHIP_SPECS = [
+    ("PILOTS", "starships", "pilots", "characters", False),
+    ("APPEARS_IN", "characters", "films", "films", True),
+    ("APPEARS_IN", "starships", "films", "films", True),
+    ("APPEARS_IN", "weapons", "films", "films", True),
+    ("APPEARS_IN", "organizations", "films", "films", True),
+]
+
+
+# Relacionamentos criados junto com os nós (coluna de valor único), mesmo formato
+ENTITY_RELATIONSHIP_SPECS = [
+    ("IS_SPECIES", "characters", "species", "species", True),
+    ("BORN_ON", "characters", "homeworld", "planets", True),
+    ("SAID", "quotes", "character_name", "characters", False),
+]
+
+
+def relationship_labels(owner: str, target: str, owner_is_source: bool) -> Tuple[str, str]:
+    """Labels (origem, destino) de um relacionamento derivado"""
+    owner_label, target_label = ENTITY_SPECS[owner][1], ENTITY_SPECS[target][1]
+    return (owner_label, target_label) if owner_is_source else (target_label, owner_label)
+
+
+def relationship_types() -> List[Tuple[str, str, str]]:
+    """(tipo, label de origem, label de destino) de todos os relacionamentos, sem repetição"""
+    types = []
+    for rel, owner, _, target, owner_is_source in ENTITY_RELATIONSHIP_SPECS + RELATIONSHIP_SPECS:
+        key = (rel, *relationship_labels(owner, target, owner_is_source))
+        if key not in types:
+            types.append(key)
+    return types
+
+
+# Contadores mantidos em cada personagem: (tipo, label de destino)
+CHARACTER_DEGREES = [(rel, target) for rel, source, target in relationship_types() if source == "Character"]
+
+
+def degree_property(rel: str, target_label: str) -> str:
+    """Propriedade do personagem com o número de relacionamentos rel → target_label"""
+    return f"degree_{rel}_{target_label}"
@@ -13,31 +13,38 @@ class Settings:
     NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
     NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
     
-    # Google Gemini
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+    # Pool de conexões do driver Neo4j (compartilhado por QA, chat e importador)
+    NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "100"))
+    NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+    NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "60"))
+    NEO4J_FETCH_SIZE = int(os.getenv("NEO4J_FETCH_SIZE", "1000"))
     
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     
     # Database
     SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "star_wars.db")
+    # Conexões de leitura do SQLite (uma por thread)
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "32768"))
+    SQLITE_CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
     
     # App
     APP_NAME = "Star Wars Knowledge Graph QA"
     APP_VERSION = "1.0.0"
     
+    @classmethod
+    def required_vars(cls):
+        """Configurações obrigatórias: as do Neo4j, exceto com QA_BACKEND local ou snapshot"""
+        if os.getenv("QA_BACKEND", "neo4j") in ("local", "snapshot"):
+            return []
+        return ["NEO4J_URI", "NEO4J_USER", "NEO4J_PASSWORD"]
+    
     @classmethod
     def validate(cls):
         """Valida se todas as configurações necessárias estão presentes"""
-        required_vars = [
-            "NEO4J_URI",
-            "NEO4J_USER", 
-            "NEO4J_PASSWORD",
-            "GOOGLE_API_KEY"
-        ]
-        
         missing = []
-        for var in required_vars:
+        for var in cls.required_vars():
             if not getattr(cls, var):
                 missing.append(var)
         
@@ -1,3 +1,24 @@
-from .qa_system import StarWarsDynamicQA
+from importlib import import_module
 
-__all__ = ['StarWarsDynamicQA'] 
\ No newline at end of file
+# Classe → módulo: importados no primeiro acesso, para que `import src.core.x`
+# não carregue os demais módulos (AsyncStarWarsQA traz o pacote neo4j inteiro)
+_EXPORTS = {
+    'StarWarsDynamicQA': '.qa_system',
+    'AsyncStarWarsQA': '.async_qa_system',
+    'EntityResolver': '.entity_resolver',
+    'GraphBackend': '.backends',
+    'Neo4jBackend': '.backends',
+    'LocalGraphBackend': '.local_graph',
+    'SnapshotBackend': '.snapshot',
+    'GraphWarmup': '.warmup',
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['StarWarsDynamicQA', 'AsyncStarWarsQA', 'EntityResolver',
+           'GraphBackend', 'Neo4jBackend', 'LocalGraphBackend', 'SnapshotBackend', 'GraphWarmup']
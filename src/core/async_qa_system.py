@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from neo4j import RoutingControl
+
+from .cypher import (GRAPH_STATS_QUERY, GRAPH_VERSION_QUERY, Relation, batch_template, group_batch_rows,
+                     page_template, uses_name)
+from .entity_resolver import ENTITY_NAMES_QUERY
+from .qa_system import StarWarsDynamicQA
+from src.utils.metrics import ERRORS, METRICS, observe_query, timer
+from src.utils.neo4j_pool import create_async_driver
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncStarWarsQA(StarWarsDynamicQA):
+    """
+    Variante assíncrona do QA sobre o AsyncDriver do Neo4j
+    
+    Reaproveita intent detection, templates Cypher, caches e formatação
+    da classe síncrona; só o acesso ao Neo4j vira corrotina, então um
+    único event loop atende várias perguntas ao mesmo tempo.
+    O índice de nomes é carregado na primeira pergunta (ou em start()).
+    """
+    
+    def _create_backend(self):
+        # As consultas vão direto ao AsyncDriver, sem backend síncrono
+        self._setup_neo4j()
+        return None
+    
+    def _setup_neo4j(self):
+        self.driver = create_async_driver(self.neo4j_uri, self.neo4j_user, self.neo4j_password)
+        # Recargas do índice disparadas por corrotinas concorrentes
+        self._refresh_lock = asyncio.Lock()
+    
+    def _initial_load(self):
+        # O índice é carregado pelo loop, não pelo construtor
+        self.resolver.loader = None
+    
+    def start_warmup(self, wait: bool = False):
+        # O aquecimento consulta o backend síncrono, que esta variante não tem
+        self.warmup.skip()
+        return self.warmup.stats()
+    
+    def _ranked_entities(self, limit: int) -> List[str]:
+        return []
+    
+    async def start(self):
+        """Valida a conexão e carrega o índice de nomes e a versão do grafo"""
+        await self.driver.verify_connectivity()
+        logger.info("Conectado ao Neo4j (async) com sucesso")
+        await self._refresh_entities()
+        self._graph_version = await self._read_graph_version()
+    
+    async def close(self):
+        """Fecha o driver assíncrono"""
+        await self.driver.close()
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+    
+    async def _query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        started = time.perf_counter() if METRICS.enabled else None
+        try:
+            records, _, _ = await self.driver.execute_query(
+                cypher, params or {}, routing_=RoutingControl.READ
+            )
+        except Exception:
+            observe_query(started, failed=True)
+            raise
+        observe_query(started)
+        return [record.data() for record in records]
+    
+    async def _refresh_entities(self):
+        try:
+            self.resolver.index(await self._query(ENTITY_NAMES_QUERY))
+            logger.info(f"Índice de entidades carregado: {len(self.resolver)} nomes")
+        except Exception as e:
+            logger.error(f"Falha ao carregar nomes de entidades: {e}")
+    
+    async def _refresh_entities_if_stale(self):
+        """Recarrega o índice vencido (uma corrotina recarrega, as outras aguardam)"""
+        if not self.resolver.is_stale():
+            return
+        async with self._refresh_lock:
+            if self.resolver.is_stale():
+                await self._refresh_entities()
+    
+    async def _read_graph_version(self):
+        try:
+            data = await self._query(GRAPH_VERSION_QUERY)
+            return data[0].get("version") if data else None
+        except Exception as e:
+            logger.warning(f"Não foi possível ler a versão do grafo: {e}")
+            return None
+    
+    async def _check_graph_version(self):
+        """Invalida os caches quando o importador recarregou o grafo"""
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        version = await self._read_graph_version()
+        if version != self._graph_version:
+            logger.info("Grafo recarregado; invalidando caches")
+            self._graph_version = version
+            self.invalidate_cache()
+    
+    def invalidate_cache(self):
+        """Descarta respostas em cache; o índice é recarregado na próxima pergunta"""
+        self.answer_cache.invalidate()
+        self.resolver.expire()
+    
+    async def ask(self, question: str) -> str:
+        await self._refresh_entities_if_stale()
+        stopwatch = timer()
+        intent, entity, relation = self._parse(question, stopwatch)
+        
+        await self._check_graph_version()
+        cache_key = (intent, entity, relation)
+        answer = self.answer_cache.get(cache_key)
+        if answer is not None:
+            stopwatch.done(intent, "hit")
+            return answer
+        
+        cypher, params = self._build_cypher(intent, entity or "", relation)
+        stopwatch.lap("build")
+        try:
+            data = await self._query(cypher, params)
+            stopwatch.lap("query")
+            answer = self._format_response(intent, data)
+            stopwatch.lap("format")
+            self.answer_cache.set(cache_key, answer)
+            stopwatch.done(intent, "miss")
+            return answer
+        except Exception as e:
+            logger.error(f"Erro na consulta: {e}")
+            ERRORS.inc("query")
+            stopwatch.done(intent, "error")
+            return f"Erro ao executar consulta: {e}"
+    
+    async def ask_page(self, question: str, cursor: Any = None,
+                       limit: Optional[int] = None) -> Dict[str, Any]:
+        """Versão assíncrona de StarWarsDynamicQA.ask_page"""
+        await self._refresh_entities_if_stale()
+        intent, entity, relation = self._parse(question)
+        if intent != "list" or not relation:
+            return {"answer": await self.ask(question), "values": None, "cursor": None}
+        
+        await self._check_graph_version()
+        limit = self.page_limit(limit)
+        cursor = self.page_cursor(cursor)
+        params = {"name": entity or "", "after": cursor, "limit": limit + 1}
+        try:
+            return self._page(await self._query(page_template(relation), params), limit)
+        except Exception as e:
+            logger.error(f"Erro na consulta paginada: {e}")
+            ERRORS.inc("page")
+            return {"answer": f"Erro ao executar consulta: {e}", "values": None, "cursor": None}
+    
+    async def stream(self, question: str, page_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Páginas de ask_page em sequência, buscadas sob demanda"""
+        cursor = None
+        while True:
+            page = await self.ask_page(question, cursor, page_size)
+            yield page
+            cursor = page["cursor"]
+            if cursor is None:
+                return
+    
+    async def _run_batch(self, intent: str, relation: Optional[Relation],
+                         entities: Iterable[Optional[str]]) -> Dict[tuple, str]:
+        """Versão assíncrona de StarWarsDynamicQA._run_batch (uma consulta UNWIND $names)"""
+        entities = list(entities)
+        cypher = batch_template(intent, relation)
+        if uses_name(cypher):
+            names = list(dict.fromkeys(entity or "" for entity in entities))
+            rows = group_batch_rows(entities, await self._query(cypher, {"names": names}))
+        else:
+            data = await self._query(cypher)
+            rows = {entity: data for entity in entities}
+        return {
+            (intent, entity, relation): self._format_response(intent, rows[entity])
+            for entity in entities
+        }
+    
+    async def ask_many(self, questions: List[str]) -> List[Dict[str, Any]]:
+        """Versão assíncrona de StarWarsDynamicQA.ask_many"""
+        await self._refresh_entities_if_stale()
+        await self._check_graph_version()
+        keys, answers, pending = self._plan_batch(questions)
+        errors: Dict[tuple, str] = {}
+        for (intent, relation), entities in pending.items():
+            try:
+                batch = await self._run_batch(intent, relation, entities)
+            except Exception as e:
+                errors.update(self._batch_errors(e, intent, relation, entities))
+                continue
+            self._store_batch(batch, answers)
+        return self._batch_results(questions, keys, answers, errors)
+    
+    async def graph_stats(self) -> Dict[str, Dict[str, int]]:
+        """Versão assíncrona de StarWarsDynamicQA.graph_stats"""
+        await self._check_graph_version()
+        stats = self.answer_cache.get(("stats",))
+        if stats is None:
+            data = await self._query(GRAPH_STATS_QUERY)
+            raw = data[0].get("stats") if data else None
+            stats = json.loads(raw) if raw else {"labels": {}, "relationships": {}}
+            self.answer_cache.set(("stats",), stats)
+        return stats
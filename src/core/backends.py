@@ -0,0 +1,115 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional
+
+from .cypher import (GRAPH_STATS_QUERY, GRAPH_VERSION_QUERY, INDEX_WARMUP_QUERIES, TOP_CHARACTERS_QUERY,
+                     Relation, batch_template, build_cypher, group_batch_rows, page_template, uses_name)
+from .entity_resolver import ENTITY_NAMES_QUERY
+from src.utils.metrics import NULL_TIMER
+
+Rows = List[Dict[str, Any]]
+
+
+class GraphBackend(ABC):
+    """
+    Fonte dos dados consultados pelo QA
+    
+    Cada execução devolve as mesmas linhas que a consulta Cypher do intent
+    devolveria ({"count"}, {"value"} ou o perfil do personagem), então a
+    formatação das respostas não depende do backend.
+    """
+    
+    @abstractmethod
+    def entity_names(self) -> Iterable[Dict[str, Any]]:
+        """Registros {"label", "name"} para o índice de entidades"""
+    
+    @abstractmethod
+    def graph_version(self) -> Optional[str]:
+        """Identificador que muda quando os dados são recarregados"""
+    
+    @abstractmethod
+    def run(self, intent: str, entity: Optional[str], relation: Optional[Relation],
+            stopwatch=NULL_TIMER) -> Rows:
+        """Linhas de um intent para uma entidade (stopwatch recebe as etapas internas, como "build")"""
+    
+    def run_many(self, intent: str, relation: Optional[Relation],
+                 entities: Iterable[Optional[str]]) -> Dict[Optional[str], Rows]:
+        """Linhas de um intent para várias entidades (padrão: uma execução por entidade)"""
+        return {entity: self.run(intent, entity, relation) for entity in entities}
+    
+    def run_page(self, entity: Optional[str], relation: Relation, after: Any, limit: int) -> Rows:
+        """
+        Até `limit` linhas {"id", "value"} da lista de uma relação, com id > after
+        
+        O id é o cursor da página seguinte e só precisa ser crescente dentro
+        do backend; por padrão é a posição na lista completa.
+        """
+        rows = self.run("list", entity, relation)
+        start = 0 if after is None else after + 1
+        return [{"id": position, "value": row.get("value")}
+                for position, row in enumerate(rows[start:start + limit], start)]
+    
+    def graph_stats(self) -> Dict[str, Dict[str, int]]:
+        """{"labels": nós por label, "relationships": arestas por tipo}, sem percorrer o grafo"""
+        return {"labels": {}, "relationships": {}}
+    
+    def refresh(self):
+        """Recarrega dados mantidos em memória (nada a fazer por padrão)"""
+    
+    def top_entities(self, limit: int) -> List[str]:
+        """Até `limit` personagens com mais relacionamentos (nenhum por padrão)"""
+        return []
+    
+    def warm_indexes(self) -> int:
+        """Lê os índices de id e nome para o cache de páginas; devolve o número de consultas"""
+        return 0
+
+
+class Neo4jBackend(GraphBackend):
+    """Consultas Cypher parametrizadas sobre um cliente com query(cypher, params)"""
+    
+    def __init__(self, graph):
+        self.graph = graph
+    
+    def entity_names(self) -> Iterable[Dict[str, Any]]:
+        return self.graph.query(ENTITY_NAMES_QUERY)
+    
+    def graph_version(self) -> Optional[str]:
+        data = self.graph.query(GRAPH_VERSION_QUERY)
+        return data[0].get("version") if data else None
+    
+    def graph_stats(self) -> Dict[str, Dict[str, int]]:
+        """Contagens gravadas pelo importador no nó GraphMeta"""
+        data = self.graph.query(GRAPH_STATS_QUERY)
+        stats = data[0].get("stats") if data else None
+        return json.loads(stats) if stats else super().graph_stats()
+    
+    def top_entities(self, limit: int) -> List[str]:
+        return [row["name"] for row in self.graph.query(TOP_CHARACTERS_QUERY, {"limit": limit})]
+    
+    def warm_indexes(self) -> int:
+        for query in INDEX_WARMUP_QUERIES:
+            self.graph.query(query)
+        return len(INDEX_WARMUP_QUERIES)
+    
+    def run(self, intent: str, entity: Optional[str], relation: Optional[Relation],
+            stopwatch=NULL_TIMER) -> Rows:
+        cypher, params = build_cypher(intent, entity or "", relation)
+        stopwatch.lap("build")
+        return self.graph.query(cypher, params)
+    
+    def run_page(self, entity: Optional[str], relation: Relation, after: Any, limit: int) -> Rows:
+        params = {"name": entity or "", "after": after, "limit": limit}
+        return self.graph.query(page_template(relation), params)
+    
+    def run_many(self, intent: str, relation: Optional[Relation],
+                 entities: Iterable[Optional[str]]) -> Dict[Optional[str], Rows]:
+        """Uma única consulta UNWIND $names para todas as entidades"""
+        entities = list(entities)
+        cypher = batch_template(intent, relation)
+        if not uses_name(cypher):
+            rows = self.graph.query(cypher)
+            return {entity: rows for entity in entities}
+        
+        names = list(dict.fromkeys(entity or "" for entity in entities))
+        return group_batch_rows(entities, self.graph.query(cypher, {"names": names}))
@@ -0,0 +1,133 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.config.graph_schema import CHARACTER_DEGREES, ENTITY_SPECS, degree_property
+
+# (relacionamento, label, propriedade), como no relation_map do QA
+Relation = Tuple[str, str, str]
+
+# Lista padrão quando a pergunta não cita entidade nem relação
+DEFAULT_QUERY = "MATCH (c:Character) RETURN c.name AS value LIMIT 10"
+
+# Versão do grafo gravada pelo importador a cada carga/sincronização
+GRAPH_VERSION_QUERY = "MATCH (m:GraphMeta {id: 'graph'}) RETURN m.version AS version"
+
+# Contagens por label e por tipo de relacionamento gravadas pelo importador (JSON)
+GRAPH_STATS_QUERY = "MATCH (m:GraphMeta {id: 'graph'}) RETURN m.stats AS stats"
+
+# Personagens com mais relacionamentos, usados no aquecimento quando não há perguntas registradas
+TOP_CHARACTERS_QUERY = (
+    "MATCH (c:Character) WHERE c.name IS NOT NULL\n"
+    "RETURN c.name AS name ORDER BY COUNT { (c)--() } DESC, c.name LIMIT $limit"
+)
+
+# Varreduras dos índices de id (constraints do importador) e do índice de nome dos personagens
+INDEX_WARMUP_QUERIES = [
+    f"MATCH (n:{label}) WHERE n.id IS NOT NULL RETURN count(n) AS count"
+    for _, label, _ in ENTITY_SPECS.values()
+] + ["MATCH (c:Character) WHERE c.name IS NOT NULL RETURN count(c) AS count"]
+
+
+@lru_cache(maxsize=64)
+def cypher_template(intent: str, relation: Optional[Relation]) -> str:
+    """
+    Consulta parametrizada ($name) para um par (intent, relação)
+    
+    O texto só depende da intenção e da relação, então o conjunto de
+    consultas é pequeno e fixo: o cache local evita remontar strings e o
+    Neo4j reaproveita o mesmo plano para qualquer personagem.
+    """
+    if intent == "count" and relation:
+        rel, lbl, prop = relation
+        if (rel, lbl) in CHARACTER_DEGREES:
+            # Contador gravado pelo importador; a travessia só cobre grafos
+            # importados antes de os contadores existirem
+            return (
+                "MATCH (c:Character {name: $name})\n"
+                f"RETURN sum(coalesce(c.{degree_property(rel, lbl)}, "
+                f"size([(c)-[:{rel}]->(:{lbl}) | 1]))) AS count"
+            )
+        return (
+            "MATCH (c:Character {name: $name})"
+            f"-[:{rel}]->(x:{lbl}) RETURN count(x) AS count"
+        )
+    if intent == "list" and relation:
+        rel, lbl, prop = relation
+        return (
+            "MATCH (c:Character {name: $name})"
+            f"-[:{rel}]->(x:{lbl}) RETURN x.{prop} AS value"
+        )
+    if intent == "detail":
+        # Perfil gravado pelo importador (build_profiles): uma busca pelo índice de nome
+        return (
+            "MATCH (c:Character {name: $name})\n"
+            "RETURN c.name AS name, c.gender AS gender, c.year_born AS birth_year, "
+            "c.profile_species AS species, c.profile_planet AS planet, "
+            "coalesce(c.profile_ships, []) AS ships, coalesce(c.profile_quotes, []) AS quotes"
+        )
+    return DEFAULT_QUERY
+
+
+@lru_cache(maxsize=64)
+def page_template(relation: Relation) -> str:
+    """
+    Página de uma lista (intent "list"), paginada por keyset no id do nó
+    
+    $after é o id do último item da página anterior (null na primeira) e
+    $limit o número de linhas; ORDER BY usa o id único criado pelo importador.
+    """
+    rel, lbl, prop = relation
+    return (
+        "MATCH (c:Character {name: $name})"
+        f"-[:{rel}]->(x:{lbl})\n"
+        "WHERE $after IS NULL OR x.id > $after\n"
+        f"RETURN DISTINCT x.id AS id, x.{prop} AS value\n"
+        "ORDER BY id LIMIT $limit"
+    )
+
+
+def build_cypher(intent: str, entity: str, relation: Optional[Relation]) -> Tuple[str, Dict[str, Any]]:
+    """Template do intent e seus parâmetros"""
+    cypher = cypher_template(intent, relation)
+    params = {"name": entity} if uses_name(cypher) else {}
+    return cypher, params
+
+
+@lru_cache(maxsize=64)
+def batch_template(intent: str, relation: Optional[Relation]) -> str:
+    """
+    Versão de cypher_template para vários personagens ($names)
+    
+    Cada linha devolvida traz a coluna `key` com o nome consultado, seguida
+    das mesmas colunas da consulta individual; consultas sem $name são
+    devolvidas sem alteração.
+    """
+    query = cypher_template(intent, relation)
+    if not uses_name(query):
+        return query
+    return "UNWIND $names AS key\n" + query.replace("$name", "key").replace("RETURN ", "RETURN key, ", 1)
+
+
+def group_batch_rows(entities: List[Optional[str]], rows: Iterable[Dict[str, Any]]) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    """Linhas de uma consulta de batch_template separadas pela coluna `key`, por entidade"""
+    by_name: Dict[str, List[Dict[str, Any]]] = {entity or "": [] for entity in entities}
+    for row in rows:
+        row = dict(row)
+        by_name.setdefault(row.pop("key"), []).append(row)
+    return {entity: by_name[entity or ""] for entity in entities}
+
+
+def uses_name(query: str) -> bool:
+    """Indica se a consulta espera o parâmetro $name"""
+    return "$name" in query
+
+
+def template_cache_info() -> dict:
+    """Acertos, faltas e tamanho do cache de templates"""
+    info = cypher_template.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+    }
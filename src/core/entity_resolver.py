@@ -0,0 +1,218 @@
+import logging
+import re
+import threading
+import time
+import unicodedata
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .fuzzy_matcher import FuzzyMatcher, levenshtein
+
+logger = logging.getLogger(__name__)
+
+# Label → propriedade com o nome exibido
+ENTITY_LABELS = {
+    "Character": "name",
+    "Planet": "name",
+    "Species": "name",
+    "Starship": "name",
+    "Film": "title",
+}
+
+# Carrega todos os nomes indexados em uma única consulta
+ENTITY_NAMES_QUERY = "\nUNION ALL\n".join(
+    f"MATCH (n:{label}) WHERE n.{prop} IS NOT NULL RETURN '{label}' AS label, n.{prop} AS name"
+    for label, prop in ENTITY_LABELS.items()
+)
+
+# Palavras que nunca viram apelido de uma entidade
+STOPWORDS = {
+    "a", "o", "as", "os", "de", "da", "do", "das", "dos", "e", "em", "no", "na",
+    "um", "uma", "the", "of", "and", "in", "on", "quem", "qual", "quais", "sobre",
+}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sem acentos e sem pontuação ("Padmé!" → "padme")"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    ascii_text = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", ascii_text).strip()
+
+
+def _same_edges(window: Sequence[str], name_tokens: Sequence[str]) -> bool:
+    """Primeiro e último tokens parecidos, para não absorver palavras vizinhas"""
+    def similar(a: str, b: str) -> bool:
+        return levenshtein(a, b) <= max(len(a), len(b)) // 2
+    return similar(window[0], name_tokens[0]) and similar(window[-1], name_tokens[-1])
+
+
+class EntityMatch(NamedTuple):
+    """Entidade encontrada na pergunta (start/end em posições de token)"""
+    name: str
+    label: str
+    start: int
+    end: int
+
+
+class EntityResolver:
+    """
+    Índice em memória dos nomes do grafo para resolver entidades nas perguntas
+    
+    Nomes completos ficam em um dict de chaves normalizadas; tokens que
+    identificam uma única entidade ("luke", "chewbacca") viram apelidos.
+    A busca só olha as janelas de tokens da pergunta, então o custo não
+    depende do número de nomes indexados.
+    """
+    
+    def __init__(self, loader: Optional[Callable[[], Iterable[Dict]]] = None, ttl: float = 300.0,
+                 fuzzy_threshold: Optional[float] = 0.8):
+        """
+        Args:
+            loader: Função que devolve registros {"label", "name"}
+            ttl: Segundos até o índice ser recarregado na próxima consulta
+            fuzzy_threshold: Similaridade mínima para aceitar nomes com erros
+                de digitação (None desliga a busca aproximada)
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.fuzzy_threshold = fuzzy_threshold
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._phrases: Dict[str, List[Tuple[str, str]]] = {}
+        self._aliases: Dict[str, List[Tuple[str, str]]] = {}
+        self._max_tokens = 1
+        self._fuzzy = FuzzyMatcher()
+    
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._phrases.values())
+    
+    def index(self, records: Iterable[Dict]):
+        """(Re)constrói o índice a partir de registros {"label", "name"}"""
+        phrases: Dict[str, List[Tuple[str, str]]] = {}
+        tokens: Dict[str, set] = {}
+        max_tokens = 1
+        for record in records:
+            name, label = record.get("name"), record.get("label")
+            key = normalize(str(name)) if name else ""
+            if not key:
+                continue
+            entries = phrases.setdefault(key, [])
+            if (name, label) not in entries:
+                entries.append((name, label))
+            parts = key.split()
+            max_tokens = max(max_tokens, len(parts))
+            for token in parts:
+                tokens.setdefault(token, set()).add(key)
+        
+        aliases = {
+            token: phrases[next(iter(keys))]
+            for token, keys in tokens.items()
+            if len(keys) == 1 and len(token) > 2 and token not in STOPWORDS
+            and token not in phrases
+        }
+        
+        fuzzy = FuzzyMatcher(phrases) if self.fuzzy_threshold is not None else FuzzyMatcher()
+        
+        # Troca atômica: leitores concorrentes veem o índice antigo ou o novo
+        self._phrases, self._aliases, self._fuzzy = phrases, aliases, fuzzy
+        self._max_tokens = max_tokens
+        self._loaded_at = time.monotonic()
+    
+    def is_stale(self) -> bool:
+        """Indica se o índice nunca foi carregado ou passou do TTL"""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+    
+    def _load(self):
+        """Chama o loader, mantendo o índice anterior em caso de erro"""
+        try:
+            self.index(self.loader())
+            logger.info(f"Índice de entidades carregado: {len(self)} nomes")
+        except Exception as e:
+            logger.error(f"Falha ao carregar nomes de entidades: {e}")
+    
+    def expire(self):
+        """Marca o índice como vencido (recarregado na próxima consulta)"""
+        self._loaded_at = None
+    
+    def refresh(self):
+        """Recarrega o índice pelo loader"""
+        if self.loader is None:
+            return
+        with self._lock:
+            self._load()
+    
+    def refresh_if_stale(self):
+        """Recarrega só se o TTL expirou (uma thread recarrega, as outras aguardam)"""
+        if self.loader is None or not self.is_stale():
+            return
+        with self._lock:
+            if self.is_stale():
+                self._load()
+    
+    def _pick(self, entries: List[Tuple[str, str]],
+              labels: Optional[Sequence[str]]) -> Optional[Tuple[str, str]]:
+        """Escolhe a entrada com o label mais prioritário"""
+        if not labels:
+            return entries[0]
+        for label in labels:
+            for entry in entries:
+                if entry[1] == label:
+                    return entry
+        return None
+    
+    def resolve_tokens(self, tokens: Sequence[str],
+                       labels: Optional[Sequence[str]] = None) -> Optional[EntityMatch]:
+        """Resolve a entidade a partir de tokens já normalizados"""
+        self.refresh_if_stale()
+        
+        phrases = self._phrases
+        # Nome completo mais longo primeiro
+        for size in range(min(self._max_tokens, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                entries = phrases.get(" ".join(tokens[start:start + size]))
+                entry = self._pick(entries, labels) if entries else None
+                if entry:
+                    return EntityMatch(entry[0], entry[1], start, start + size)
+        
+        # Apelidos de um token ("luke" → Luke Skywalker)
+        aliases = self._aliases
+        for position, token in enumerate(tokens):
+            entries = aliases.get(token)
+            entry = self._pick(entries, labels) if entries else None
+            if entry:
+                return EntityMatch(entry[0], entry[1], position, position + 1)
+        
+        if self.fuzzy_threshold is not None:
+            return self._resolve_fuzzy(tokens, labels)
+        return None
+    
+    def _resolve_fuzzy(self, tokens: Sequence[str],
+                       labels: Optional[Sequence[str]]) -> Optional[EntityMatch]:
+        """Nome mais parecido entre as janelas de tokens ("luk skywalkr")"""
+        phrases, fuzzy = self._phrases, self._fuzzy
+        best = None
+        for size in range(min(self._max_tokens, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                window = tokens[start:start + size]
+                text = " ".join(window)
+                if len(text) < 4 or all(token in STOPWORDS for token in window):
+                    continue
+                for key, similarity in fuzzy.search(text, limit=3,
+                                                    min_similarity=self.fuzzy_threshold):
+                    entry = self._pick(phrases[key], labels)
+                    if entry and _same_edges(window, key.split()):
+                        if best is None or similarity > best[0]:
+                            best = (similarity, EntityMatch(entry[0], entry[1], start, start + size))
+                        break
+        return best[1] if best else None
+    
+    def resolve(self, question: str, labels: Optional[Sequence[str]] = None) -> Optional[EntityMatch]:
+        """
+        Encontra a entidade citada na pergunta
+        
+        Args:
+            question: Pergunta em linguagem natural
+            labels: Labels aceitos, em ordem de prioridade (padrão: todos)
+        """
+        return self.resolve_tokens(normalize(question).split(), labels)
@@ -0,0 +1,113 @@
+import math
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+def levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    Distância de edição entre a e b
+    
+    Com max_distance, para assim que a distância certamente o ultrapassa
+    e devolve max_distance + 1.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Trigramas com bordas ("luke" → "  l", " lu", "luk", "uke", "ke ")"""
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class FuzzyMatcher:
+    """
+    Índice invertido de trigramas para nomes com erros de digitação
+    
+    Os nomes ficam ordenados por comprimento, então cada lista de trigramas
+    também está; a janela de comprimentos compatíveis com a similaridade
+    mínima vira um intervalo contínuo em cada lista (bisect). Candidatos
+    saem só das listas dos trigramas mais raros da consulta (filtro de
+    prefixo); os que mais compartilham trigramas são ordenados por
+    Levenshtein.
+    """
+    
+    def __init__(self, names: Iterable[str] = (), min_overlap: float = 0.4):
+        """
+        Args:
+            names: Nomes indexados (já normalizados pelo chamador, se for o caso)
+            min_overlap: Fração mínima dos trigramas da consulta presentes no nome
+        """
+        self.min_overlap = min_overlap
+        self._names = sorted(set(names), key=lambda name: (len(name), name))
+        self._lengths = [len(name) for name in self._names]
+        self._postings: Dict[str, List[int]] = {}
+        for position, name in enumerate(self._names):
+            for gram in trigrams(name):
+                self._postings.setdefault(gram, []).append(position)
+    
+    def __len__(self) -> int:
+        return len(self._names)
+    
+    def search(self, query: str, limit: int = 5,
+               min_similarity: float = 0.7) -> List[Tuple[str, float]]:
+        """
+        Nomes parecidos com a consulta, do mais para o menos similar
+        
+        A similaridade é 1 - distância / maior comprimento (1.0 = idêntico).
+        """
+        if not query or not self._names:
+            return []
+        grams = trigrams(query)
+        required = max(1, math.ceil(len(grams) * self.min_overlap))
+        
+        # Comprimentos que ainda podem atingir min_similarity
+        first = bisect_left(self._lengths, math.ceil(len(query) * min_similarity))
+        last = bisect_right(self._lengths, int(len(query) / max(min_similarity, 0.01)))
+        windows = []
+        for gram in grams:
+            posting = self._postings.get(gram, ())
+            windows.append(posting[bisect_left(posting, first):bisect_left(posting, last)])
+        windows.sort(key=len)
+        
+        # Quem tem `required` trigramas em comum aparece em alguma das listas mais raras
+        prefix = len(grams) - required + 1
+        candidates = set()
+        shared = Counter()
+        for window in windows[:prefix]:
+            candidates.update(window)
+            shared.update(window)
+        for window in windows[prefix:]:
+            shared.update(candidates.intersection(window))
+        ranked = sorted(shared.items(), key=itemgetter(1), reverse=True)
+        
+        results = []
+        for position, count in ranked[:limit * 8]:
+            if count < required:
+                break
+            name = self._names[position]
+            longest = max(len(name), len(query))
+            max_distance = int(longest * (1 - min_similarity))
+            distance = levenshtein(query, name, max_distance)
+            similarity = 1 - distance / longest
+            if similarity >= min_similarity:
+                results.append((name, similarity))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:limit]
@@ -0,0 +1,104 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .cypher import Relation
+
+# Intent → pistas no início da pergunta ("prefix") ou em qualquer posição
+# ("anywhere"); a ordem das intents é a prioridade quando há mais de uma pista
+INTENT_CUES: Dict[str, Dict[str, Sequence[str]]] = {
+    "count": {"prefix": ("quant",), "anywhere": ("quantos", "quantas", "how many")},
+    "list": {"prefix": ("quais", "listar", "which", "list"), "anywhere": ()},
+}
+
+# Prioridade de "nenhuma pista"
+_NONE = 1 << 30
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex que casa qualquer uma das palavras, fatorada por prefixo comum
+    
+    "nave|naves|navio" vira "nav(?:e(?:s)?|io)": em cada posição o motor
+    segue um único ramo da trie, então o custo não cresce com o número de
+    palavras, e o ramo mais longo é tentado primeiro.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+    
+    return build(trie) if trie else "(?!)"
+
+
+class Recognition(NamedTuple):
+    """Pista de intent, relação e palavras-chave encontradas (início, fim, palavra)"""
+    intent: Optional[str]
+    relation: Optional[Relation]
+    spans: Tuple[Tuple[int, int, str], ...]
+    
+    def intent_for(self, entity: Optional[str]) -> str:
+        """Intent final: a pista encontrada, ou detail/list conforme haja entidade"""
+        return self.intent or ("detail" if entity else "list")
+
+
+class IntentRecognizer:
+    """
+    Reconhece intent e relação de uma pergunta com um único regex compilado
+    
+    Palavras-chave de relação e pistas de intent viram uma trie de literais;
+    a pergunta é convertida para minúsculas uma vez e uma passada de finditer
+    encontra todas as palavras, sem um laço por palavra-chave.
+    """
+    
+    def __init__(self, relations: Dict[str, Relation],
+                 cues: Dict[str, Dict[str, Sequence[str]]] = INTENT_CUES):
+        """
+        Args:
+            relations: Palavra-chave → relação; a ordem é a prioridade
+            cues: Intent → pistas "prefix" e "anywhere" (ver INTENT_CUES)
+        """
+        # Prioridades: menor vence; _NONE fica atrás de qualquer palavra
+        self._prefix_cues: Dict[str, Tuple[int, str]] = {}
+        # palavra → (prioridade da intent, intent, prioridade da relação, relação)
+        self._words: Dict[str, Tuple[int, Optional[str], int, Optional[Relation]]] = {}
+        for rank, (intent, kinds) in enumerate(cues.items()):
+            for cue in kinds.get("prefix", ()):
+                self._prefix_cues.setdefault(cue.lower(), (rank, intent))
+            for cue in kinds.get("anywhere", ()):
+                self._words.setdefault(cue.lower(), (rank, intent, _NONE, None))
+        for rank, (keyword, relation) in enumerate(relations.items()):
+            keyword = keyword.lower()
+            intent_rank, intent, relation_rank, _ = self._words.get(keyword, (_NONE, None, _NONE, None))
+            if relation_rank == _NONE:
+                self._words[keyword] = (intent_rank, intent, rank, relation)
+        
+        self.prefix_pattern = re.compile(trie_pattern(self._prefix_cues))
+        self.pattern = re.compile(trie_pattern(self._words))
+    
+    def recognize(self, question: str) -> Recognition:
+        text = question.lower()
+        intent_rank, intent, relation_rank, relation = _NONE, None, _NONE, None
+        spans: List[Tuple[int, int, str]] = []
+        prefix = self.prefix_pattern.match(text)
+        if prefix:
+            spans.append((0, prefix.end(), prefix.group()))
+            intent_rank, intent = self._prefix_cues[prefix.group()]
+        words = self._words
+        for match in self.pattern.finditer(text):
+            keyword = match.group()
+            spans.append((*match.span(), keyword))
+            word_intent_rank, word_intent, word_relation_rank, word_relation = words[keyword]
+            if word_intent_rank < intent_rank:
+                intent_rank, intent = word_intent_rank, word_intent
+            if word_relation_rank < relation_rank:
+                relation_rank, relation = word_relation_rank, word_relation
+        return Recognition(intent, relation, tuple(spans))
@@ -0,0 +1,231 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .backends import GraphBackend, Rows
+from .cypher import Relation
+from .entity_resolver import ENTITY_LABELS
+from src.config.graph_schema import (ENTITY_RELATIONSHIP_SPECS, ENTITY_SPECS, NAME_PROPERTIES,
+                                     RELATIONSHIP_SPECS, relationship_labels)
+from src.utils.database import DatabaseManager, split_list
+from src.utils.metrics import NULL_TIMER
+
+logger = logging.getLogger(__name__)
+
+# Personagens listados quando a pergunta não cita entidade nem relação (DEFAULT_QUERY)
+DEFAULT_LIMIT = 10
+
+
+class CSR(NamedTuple):
+    """Adjacência compacta: vizinhos do nó i em targets[offsets[i]:offsets[i + 1]]"""
+    offsets: array
+    targets: array
+    
+    def neighbors(self, node: int) -> Sequence[int]:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+
+def build_csr(size: int, pairs: Iterable[Tuple[int, int]]) -> CSR:
+    """Monta o CSR de `size` nós de origem a partir de pares (origem, destino) únicos"""
+    pairs = list(pairs)
+    # Cada par vira um inteiro origem * stride + destino: ordenar e deduplicar
+    # inteiros é bem mais barato que tuplas
+    stride = max((target for _, target in pairs), default=0) + 1
+    keys = sorted({source * stride + target for source, target in pairs})
+    offsets = array("i", [0]) * (size + 1)
+    for key in keys:
+        offsets[key // stride + 1] += 1
+    for node in range(size):
+        offsets[node + 1] += offsets[node]
+    return CSR(offsets, array("i", (key % stride for key in keys)))
+
+
+class LocalGraph(NamedTuple):
+    """Nós e arestas carregados do SQLite"""
+    # label → propriedade → valores, na ordem dos nós
+    columns: Dict[str, Dict[str, List[Any]]]
+    # label → nome (ou título) → índices dos nós
+    names: Dict[str, Dict[str, List[int]]]
+    # (tipo, label de origem, label de destino) → adjacência
+    edges: Dict[Tuple[str, str, str], CSR]
+
+
+def load_graph(db: DatabaseManager) -> LocalGraph:
+    """Lê as tabelas do star_wars.db e monta nós e CSRs como o importador montaria o grafo"""
+    specs = [(spec, False) for spec in ENTITY_RELATIONSHIP_SPECS]
+    specs += [(spec, True) for spec in RELATIONSHIP_SPECS]
+    link_columns: Dict[str, Set[str]] = {}
+    for (_, owner, column, _, _), _ in specs:
+        link_columns.setdefault(owner, set()).add(column)
+    
+    columns: Dict[str, Dict[str, List[Any]]] = {}
+    raw: Dict[str, Dict[str, List[Any]]] = {}
+    names: Dict[str, Dict[str, List[int]]] = {}
+    for entity, (table, label, properties) in ENTITY_SPECS.items():
+        wanted = list(dict.fromkeys(properties + sorted(link_columns.get(entity, ()))))
+        values = db.read_columns(table, wanted)
+        columns[label] = {prop: values[prop] for prop in properties}
+        raw[entity] = values
+        
+        key = NAME_PROPERTIES.get(entity, "name")
+        index: Dict[str, List[int]] = {}
+        for node, value in enumerate(values.get(key, ())):
+            if value is not None:
+                index.setdefault(str(value).strip(), []).append(node)
+        names[label] = index
+    
+    edges: Dict[Tuple[str, str, str], CSR] = {}
+    for (rel, owner, column, target, owner_is_source), multi in specs:
+        target_index = names[ENTITY_SPECS[target][1]]
+        pairs = []
+        for node, value in enumerate(raw[owner][column]):
+            linked = split_list(value) if multi else ([str(value).strip()] if value is not None else [])
+            for name in linked:
+                for other in target_index.get(name, ()):
+                    pairs.append((node, other) if owner_is_source else (other, node))
+        source_label, target_label = relationship_labels(owner, target, owner_is_source)
+        size = len(raw[owner if owner_is_source else target]["id"])
+        edges[(rel, source_label, target_label)] = build_csr(size, pairs)
+    return LocalGraph(columns, names, edges)
+
+
+class LocalGraphBackend(GraphBackend):
+    """
+    Grafo em memória lido do star_wars.db, para servir o QA sem Neo4j
+    
+    Cada label guarda suas propriedades em colunas indexadas pela posição
+    do nó, e cada tipo de relacionamento vira um CSR de inteiros; count,
+    list e detail são respondidos percorrendo esses arrays no processo.
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db = DatabaseManager(db_path)
+        self._lock = threading.Lock()
+        self.graph: Optional[LocalGraph] = None
+        self._version: Optional[str] = None
+        self.load()
+    
+    def _file_version(self) -> Optional[str]:
+        try:
+            stat = os.stat(self.db.db_path)
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+    
+    def _read_graph(self) -> LocalGraph:
+        return load_graph(self.db)
+    
+    def load(self):
+        """(Re)carrega o grafo; a troca é atômica para leitores concorrentes"""
+        with self._lock:
+            started = time.perf_counter()
+            version = self._file_version()
+            graph = self._read_graph()
+            self.graph, self._version = graph, version
+            nodes = sum(len(column["id"]) for column in graph.columns.values())
+            edges = sum(len(csr.targets) for csr in graph.edges.values())
+            logger.info(f"Grafo local carregado: {nodes} nós e {edges} arestas "
+                        f"em {time.perf_counter() - started:.3f}s")
+    
+    def refresh(self):
+        if self._file_version() != self._version:
+            self.load()
+    
+    def graph_version(self) -> Optional[str]:
+        return self._file_version()
+    
+    def graph_stats(self) -> Dict[str, Dict[str, int]]:
+        graph = self.graph
+        relationships: Dict[str, int] = {}
+        for (rel, _, _), csr in graph.edges.items():
+            relationships[rel] = relationships.get(rel, 0) + len(csr.targets)
+        return {
+            "labels": {label: len(columns["id"]) for label, columns in graph.columns.items()},
+            "relationships": relationships,
+        }
+    
+    def entity_names(self) -> Iterable[Dict[str, Any]]:
+        graph = self.graph
+        for label, prop in ENTITY_LABELS.items():
+            for name in graph.columns.get(label, {}).get(prop, ()):
+                if name is not None:
+                    yield {"label": label, "name": name}
+    
+    def top_entities(self, limit: int) -> List[str]:
+        """Grau de saída de cada personagem somado sobre os CSRs com origem Character"""
+        graph = self.graph
+        names = graph.columns.get("Character", {}).get("name", [])
+        degrees = [0] * len(names)
+        for (_, source, _), csr in graph.edges.items():
+            if source == "Character":
+                offsets = csr.offsets
+                for node in range(len(degrees)):
+                    degrees[node] += offsets[node + 1] - offsets[node]
+        ranked = heapq.nsmallest(limit, (node for node in range(len(names)) if names[node] is not None),
+                                 key=lambda node: (-degrees[node], names[node]))
+        return [names[node] for node in ranked]
+    
+    def _value(self, label: str, prop: str, node: int) -> Any:
+        values = self.graph.columns.get(label, {}).get(prop)
+        return values[node] if values is not None else None
+    
+    def _neighbors(self, rel: str, source: str, target: str, node: int) -> Sequence[int]:
+        csr = self.graph.edges.get((rel, source, target))
+        return csr.neighbors(node) if csr else ()
+    
+    def _profile(self, node: int) -> Dict[str, Any]:
+        """Mesmas colunas do detail (perfil gravado por build_profiles no importador)"""
+        def names(rel, label, prop="name"):
+            return [self._value(label, prop, other)
+                    for other in self._neighbors(rel, "Character", label, node)]
+        species, planets = names("IS_SPECIES", "Species"), names("BORN_ON", "Planet")
+        return {
+            "name": self._value("Character", "name", node),
+            "gender": self._value("Character", "gender", node),
+            "birth_year": self._value("Character", "year_born", node),
+            "species": species[0] if species else None,
+            "planet": planets[0] if planets else None,
+            "ships": names("PILOTS", "Starship"),
+            "quotes": names("SAID", "Quote", "quote"),
+        }
+    
+    def run_page(self, entity: Optional[str], relation: Relation, after: Any, limit: int) -> Rows:
+        """Cursor = índice do nó: os vizinhos já estão ordenados no CSR"""
+        rel, label, prop = relation
+        characters = self.graph.names.get("Character", {}).get(entity or "", [])
+        
+        def tail(others: Sequence[int]) -> Iterator[int]:
+            for i in range(0 if after is None else bisect_right(others, after), len(others)):
+                yield others[i]
+        
+        tails = [tail(self._neighbors(rel, "Character", label, node)) for node in characters]
+        rows: Rows = []
+        for other in heapq.merge(*tails):
+            if rows and rows[-1]["id"] == other:
+                continue
+            if len(rows) == limit:
+                break
+            rows.append({"id": other, "value": self._value(label, prop, other)})
+        return rows
+    
+    def run(self, intent: str, entity: Optional[str], relation: Optional[Relation],
+            stopwatch=NULL_TIMER) -> Rows:
+        characters = self.graph.names.get("Character", {}).get(entity or "", [])
+        if intent == "count" and relation:
+            rel, label, _ = relation
+            return [{"count": sum(len(self._neighbors(rel, "Character", label, node))
+                                  for node in characters)}]
+        if intent == "list" and relation:
+            rel, label, prop = relation
+            return [{"value": self._value(label, prop, other)}
+                    for node in characters
+                    for other in self._neighbors(rel, "Character", label, node)]
+        if intent == "detail":
+            return [self._profile(node) for node in characters]
+        names = self.graph.columns.get("Character", {}).get("name", [])
+        return [{"value": name} for name in names[:DEFAULT_LIMIT]]
@@ -1,8 +1,18 @@
 import os
 from dotenv import load_dotenv
-from langchain_neo4j import Neo4jGraph
 import logging
-from difflib import get_close_matches
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .backends import GraphBackend, Neo4jBackend
+from .cache import TTLCache
+from .cypher import Relation, build_cypher, template_cache_info
+from .entity_resolver import EntityResolver
+from .intent import IntentRecognizer
+from .warmup import GraphWarmup
+from src.utils.metrics import ERRORS, NULL_TIMER, timer
+from src.utils.neo4j_pool import GraphClient, close_driver, get_driver
 
 # Carrega variáveis de ambiente
 dotenv_path = os.getenv('DOTENV_PATH', '.env')
@@ -17,73 +27,171 @@ class StarWarsDynamicQA:
     Sistema de QA dinâmico para Star Wars,
     com intent detection e formatação amigável
     """
-    def __init__(self):
+    def __init__(self, backend: Optional[GraphBackend] = None):
+        """
+        Args:
+            backend: Fonte dos dados; por padrão escolhida por QA_BACKEND
+                ("neo4j"; "local", o grafo em memória lido do star_wars.db; ou
+                "snapshot", o snapshot binário de QA_SNAPSHOT_PATH mapeado em memória)
+        """
         # Config Neo4j
         self.neo4j_uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
         self.neo4j_user = os.getenv("NEO4J_USER", "neo4j")
         self.neo4j_password = os.getenv("NEO4J_PASSWORD", "password")
-        self._setup_neo4j()
+        self.backend = backend if backend is not None else self._create_backend()
+
+        # Índice de nomes do grafo, carregado na inicialização e renovado pelo TTL
+        self.resolver = EntityResolver(
+            loader=self._load_entity_names,
+            ttl=float(os.getenv("QA_ENTITY_TTL", "300"))
+        )
+
+        # Cache de respostas por (intent, entidade, relação)
+        self.answer_cache = TTLCache(
+            max_size=int(os.getenv("QA_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("QA_CACHE_TTL", "300"))
+        )
+        # Intervalo entre verificações da versão do grafo (recarga do importador)
+        self.version_check_interval = float(os.getenv("QA_GRAPH_VERSION_CHECK", "30"))
+        self._graph_version = None
+        self._version_checked_at = time.monotonic()
+        # Itens por página em ask_page/stream quando o limite não é informado
+        self.page_size = int(os.getenv("QA_PAGE_SIZE", "100"))
+        # Maior limite aceito por página (limites acima são reduzidos a ele)
+        self.page_size_max = int(os.getenv("QA_PAGE_SIZE_MAX", "1000"))
+        # Perguntas por personagem neste processo; as mais frequentes entram no aquecimento
+        self.asked_entities: Counter = Counter()
+        self.warmup_size = int(os.getenv("QA_WARMUP_SIZE", "20"))
 
         # Map: palavra-chave → (relacionamento, label, propriedade)
         self.relation_map = {
             "naves": ("PILOTS", "Starship", "name"),
             "ship": ("PILOTS", "Starship", "name"),
-            "citações": ("SAID", "Quote", "text"),
-            "quotes": ("SAID", "Quote", "text"),
+            "citações": ("SAID", "Quote", "quote"),
+            "quotes": ("SAID", "Quote", "quote"),
             "espécies": ("IS_SPECIES", "Species", "name"),
             "espécie": ("IS_SPECIES", "Species", "name"),
             "planeta": ("BORN_ON", "Planet", "name"),
             "filmes": ("APPEARS_IN", "Film", "title"),
             "filme": ("APPEARS_IN", "Film", "title"),
         }
+        # Regex único com as palavras-chave acima e as pistas de intent
+        self.recognizer = IntentRecognizer(self.relation_map)
+        self._initial_load()
+
+        # Templates × entidades mais perguntadas, executados em segundo plano
+        self.warmup = GraphWarmup(self.backend, list(dict.fromkeys(self.relation_map.values())),
+                                  self._warmup_entities, self.page_size)
+        if os.getenv("QA_WARMUP", "1") != "0":
+            self.start_warmup()
+        else:
+            self.warmup.skip()
+
+    def _create_backend(self) -> GraphBackend:
+        backend = os.getenv("QA_BACKEND", "neo4j")
+        if backend == "local":
+            from .local_graph import LocalGraphBackend
+            return LocalGraphBackend(os.getenv("SQLITE_DB_PATH", "star_wars.db"))
+        if backend == "snapshot":
+            from .snapshot import SnapshotBackend
+            return SnapshotBackend(os.getenv("QA_SNAPSHOT_PATH", "star_wars.graph"))
+        self._setup_neo4j()
+        return Neo4jBackend(self.graph)
 
     def _setup_neo4j(self):
         try:
-            self.graph = Neo4jGraph(
-                url=self.neo4j_uri,
-                username=self.neo4j_user,
-                password=self.neo4j_password
-            )
+            # Driver compartilhado pelo processo (pool configurado em Settings)
+            driver = get_driver(self.neo4j_uri, self.neo4j_user, self.neo4j_password)
+            driver.verify_connectivity()
+            self.graph = GraphClient(driver)
             logger.info("Conectado ao Neo4j com sucesso")
         except Exception as e:
             logger.error(f"Falha ao conectar Neo4j: {e}")
             raise
 
+    def close(self):
+        """Fecha o driver compartilhado do Neo4j, se o backend for o Neo4j"""
+        if isinstance(self.backend, Neo4jBackend):
+            close_driver(self.neo4j_uri, self.neo4j_user)
+            logger.info("Driver Neo4j fechado")
+
+    def _initial_load(self):
+        """Carrega o índice de nomes e a versão atual do grafo"""
+        self.resolver.refresh()
+        self._graph_version = self._read_graph_version()
+
+    def _warmup_entities(self) -> List[str]:
+        """QA_WARMUP_ENTITIES, depois os mais perguntados e os de mais relacionamentos"""
+        configured = [name.strip() for name in os.getenv("QA_WARMUP_ENTITIES", "").split(",") if name.strip()]
+        asked = [name for name, _ in self.asked_entities.most_common(self.warmup_size)]
+        entities = list(dict.fromkeys(configured + asked + self._ranked_entities(self.warmup_size)))
+        return entities[:max(self.warmup_size, len(configured))]
+
+    def _ranked_entities(self, limit: int) -> List[str]:
+        return self.backend.top_entities(limit)
+
+    def start_warmup(self, wait: bool = False) -> Dict[str, Any]:
+        """Inicia o aquecimento do grafo (com wait, espera terminar) e devolve seu estado"""
+        self.warmup.start()
+        if wait:
+            self.warmup.wait()
+        return self.warmup.stats()
+
+    def _load_entity_names(self):
+        return self.backend.entity_names()
+
+    def _read_graph_version(self):
+        try:
+            return self.backend.graph_version()
+        except Exception as e:
+            logger.warning(f"Não foi possível ler a versão do grafo: {e}")
+            return None
+
+    def _check_graph_version(self):
+        """Invalida os caches quando o importador recarregou o grafo"""
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        version = self._read_graph_version()
+        if version != self._graph_version:
+            logger.info("Grafo recarregado; invalidando caches")
+            self._graph_version = version
+            self.invalidate_cache()
+            if self.warmup.state != "disabled":
+                self.warmup.start()
+
+    def invalidate_cache(self):
+        """Descarta respostas em cache e recarrega o backend e o índice de entidades"""
+        self.backend.refresh()
+        self.answer_cache.invalidate()
+        self.resolver.refresh()
+
+    def graph_stats(self) -> Dict[str, Dict[str, int]]:
+        """Nós por label e relacionamentos por tipo (contagens mantidas na carga)"""
+        self._check_graph_version()
+        stats = self.answer_cache.get(("stats",))
+        if stats is None:
+            stats = self.backend.graph_stats()
+            self.answer_cache.set(("stats",), stats)
+        return stats
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Estatísticas dos caches de respostas e de templates"""
+        return {
+            "answers": self.answer_cache.stats(),
+            "cypher_templates": self.cypher_cache_info(),
+        }
+
     def _determine_intent(self, question: str, entity: str) -> str:
-        ql = question.lower()
-        if ql.startswith("quant") or "quantos" in ql or "quantas" in ql:
-            return "count"
-        if ql.startswith("quais") or ql.startswith("listar"):
-            return "list"
-        if entity:
-            return "detail"
-        return "list"
-
-    def _build_cypher(self, intent: str, entity: str, relation) -> str:
-        if intent == "count" and relation:
-            rel, lbl, prop = relation
-            return (
-                f"MATCH (c:Character {{name: \"{entity}\"}})"
-                f"-[:{rel}]->(x:{lbl}) RETURN count(x) AS count"
-            )
-        if intent == "list" and relation:
-            rel, lbl, prop = relation
-            return (
-                f"MATCH (c:Character {{name: \"{entity}\"}})"
-                f"-[:{rel}]->(x:{lbl}) RETURN x.{prop} AS value"
-            )
-        if intent == "detail":
-            return (
-                f"MATCH (c:Character {{name: \"{entity}\"}})\n"
-                f"OPTIONAL MATCH (c)-[:IS_SPECIES]->(s:Species)\n"
-                f"OPTIONAL MATCH (c)-[:BORN_ON]->(p:Planet)\n"
-                f"OPTIONAL MATCH (c)-[:PILOTS]->(ship:Starship)\n"
-                f"OPTIONAL MATCH (c)-[:SAID]->(q:Quote)\n"
-                "RETURN c.name AS name, c.gender AS gender, c.birth_year AS birth_year, "
-                "s.name AS species, p.name AS planet, collect(ship.name) AS ships, collect(q.text) AS quotes"
-            )
-        # Default list characters
-        return "MATCH (c:Character) RETURN c.name AS value LIMIT 10"
+        return self.recognizer.recognize(question).intent_for(entity)
+
+    def _build_cypher(self, intent: str, entity: str, relation) -> Tuple[str, Dict[str, Any]]:
+        return build_cypher(intent, entity, relation)
+
+    def cypher_cache_info(self) -> Dict[str, int]:
+        """Estatísticas do cache de templates Cypher"""
+        return template_cache_info()
 
     def _format_response(self, intent: str, data) -> str:
         if intent == "count":
@@ -113,25 +221,196 @@ class StarWarsDynamicQA:
         # Fallback generic
         return "\n".join([row.get("value", "") for row in data])
 
+    def _parse(self, question: str, stopwatch=NULL_TIMER) -> Tuple[str, Optional[str], Optional[Relation]]:
+        """Intent, entidade e relação citadas na pergunta"""
+        # Extrair entidade pelo índice de nomes
+        match = self.resolver.resolve(question, labels=("Character",))
+        entity = match.name if match else None
+        stopwatch.lap("resolve")
+        # Intent e relação em uma passada do regex compilado
+        recognition = self.recognizer.recognize(question)
+        stopwatch.lap("intent")
+        return recognition.intent_for(entity), entity, recognition.relation
+
     def ask(self, question: str) -> str:
-        # Extrair entidade simples (pode ser melhorado)
-        entity = None
-        sample_chars = ["Luke Skywalker", "Han Solo", "Darth Vader", "Leia Organa", "Yoda"]
-        for name in sample_chars:
-            if name.lower() in question.lower():
-                entity = name
-                break
-        # Detectar relação
-        relation = None
-        for key, val in self.relation_map.items():
-            if key in question.lower():
-                relation = val
-                break
-        intent = self._determine_intent(question, entity or "")
-        cypher = self._build_cypher(intent, entity or "", relation)
+        stopwatch = timer()
+        intent, entity, relation = self._parse(question, stopwatch)
+        if entity:
+            self.asked_entities[entity] += 1
+
+        self._check_graph_version()
+        cache_key = (intent, entity, relation)
+        answer = self.answer_cache.get(cache_key)
+        if answer is not None:
+            stopwatch.done(intent, "hit")
+            return answer
+
         try:
-            data = self.graph.query(cypher)
-            return self._format_response(intent, data)
+            data = self.backend.run(intent, entity, relation, stopwatch)
+            stopwatch.lap("query")
+            answer = self._format_response(intent, data)
+            stopwatch.lap("format")
+            self.answer_cache.set(cache_key, answer)
+            stopwatch.done(intent, "miss")
+            return answer
         except Exception as e:
             logger.error(f"Erro na consulta: {e}")
-            return f"Erro ao executar consulta: {e}" 
\ No newline at end of file
+            ERRORS.inc("query")
+            stopwatch.done(intent, "error")
+            return f"Erro ao executar consulta: {e}" 
+
+    def _page(self, rows: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+        """Página a partir de até limit + 1 linhas (a linha extra indica que há mais)"""
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "answer": self._format_response("list", rows),
+            "values": [row.get("value") for row in rows],
+            "cursor": rows[-1]["id"] if more else None,
+        }
+
+    def page_limit(self, limit: Any = None) -> int:
+        """
+        Itens por página a partir do limit recebido (JSON ou query string)
+
+        None ou "" usam page_size; o valor é convertido para int e limitado a
+        1..page_size_max. ValueError se não for um inteiro.
+        """
+        if limit is None or limit == "":
+            return self.page_size
+        if isinstance(limit, bool):
+            raise ValueError(f"limit inválido: {limit!r}")
+        try:
+            value = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError(f"limit inválido: {limit!r}") from None
+        return max(1, min(value, self.page_size_max))
+
+    def page_cursor(self, cursor: Any = None) -> Optional[int]:
+        """
+        Cursor recebido (JSON ou query string) como id inteiro >= 0
+
+        None ou "" indicam a primeira página. ValueError se não for um
+        inteiro não negativo: os backends comparam o cursor com ids inteiros.
+        """
+        if cursor is None or cursor == "":
+            return None
+        if isinstance(cursor, bool) or (isinstance(cursor, float) and not cursor.is_integer()):
+            raise ValueError(f"cursor inválido: {cursor!r}")
+        try:
+            value = int(cursor)
+        except (TypeError, ValueError):
+            raise ValueError(f"cursor inválido: {cursor!r}") from None
+        if value < 0:
+            raise ValueError(f"cursor inválido: {cursor!r}")
+        return value
+
+    def ask_page(self, question: str, cursor: Any = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Uma página da resposta: {"answer", "values", "cursor"}
+
+        Listas de uma relação ("Quais filmes Luke aparece?") são paginadas
+        por keyset: cursor é o valor devolvido pela página anterior (None na
+        primeira) e volta None na última. As demais perguntas vêm inteiras em
+        uma única página, com values None. Páginas não passam pelo cache.
+        """
+        intent, entity, relation = self._parse(question)
+        if intent != "list" or not relation:
+            return {"answer": self.ask(question), "values": None, "cursor": None}
+
+        self._check_graph_version()
+        limit = self.page_limit(limit)
+        cursor = self.page_cursor(cursor)
+        try:
+            return self._page(self.backend.run_page(entity, relation, cursor, limit + 1), limit)
+        except Exception as e:
+            logger.error(f"Erro na consulta paginada: {e}")
+            ERRORS.inc("page")
+            return {"answer": f"Erro ao executar consulta: {e}", "values": None, "cursor": None}
+
+    def stream(self, question: str, page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Páginas de ask_page em sequência, buscadas sob demanda (uma página em memória)"""
+        cursor = None
+        while True:
+            page = self.ask_page(question, cursor, page_size)
+            yield page
+            cursor = page["cursor"]
+            if cursor is None:
+                return
+
+    def _run_batch(self, intent: str, relation: Optional[Relation],
+                   entities: Iterable[Optional[str]]) -> Dict[tuple, str]:
+        """Responde todas as entidades de um template com uma única execução no backend"""
+        rows = self.backend.run_many(intent, relation, entities)
+        return {
+            (intent, entity, relation): self._format_response(intent, rows[entity])
+            for entity in entities
+        }
+
+    def ask_many(self, questions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Responde várias perguntas com o mínimo de idas ao Neo4j
+
+        Perguntas que resolvem para a mesma consulta são respondidas uma vez,
+        e as que compartilham um template viram uma única consulta UNWIND
+        $names. O resultado segue a ordem de entrada, com erro por item.
+        """
+        self._check_graph_version()
+        keys, answers, pending = self._plan_batch(questions)
+        errors: Dict[tuple, str] = {}
+        for (intent, relation), entities in pending.items():
+            try:
+                batch = self._run_batch(intent, relation, entities)
+            except Exception as e:
+                errors.update(self._batch_errors(e, intent, relation, entities))
+                continue
+            self._store_batch(batch, answers)
+        return self._batch_results(questions, keys, answers, errors)
+
+    def _plan_batch(self, questions: List[str]) -> Tuple[List[Optional[tuple]], Dict[tuple, str],
+                                                        Dict[Tuple[str, Optional[Relation]], set]]:
+        """Chave de cada pergunta, respostas já em cache e entidades pendentes por template"""
+        keys: List[Optional[tuple]] = []
+        answers: Dict[tuple, str] = {}
+        pending: Dict[Tuple[str, Optional[Relation]], set] = {}
+        for question in questions:
+            if not isinstance(question, str) or not question.strip():
+                keys.append(None)
+                continue
+            key = self._parse(question)
+            keys.append(key)
+            intent, entity, relation = key
+            if key in answers or entity in pending.get((intent, relation), ()):
+                continue
+            cached = self.answer_cache.get(key)
+            if cached is not None:
+                answers[key] = cached
+            else:
+                pending.setdefault((intent, relation), set()).add(entity)
+        return keys, answers, pending
+
+    def _batch_errors(self, error: Exception, intent: str, relation: Optional[Relation],
+                      entities: Iterable[Optional[str]]) -> Dict[tuple, str]:
+        """Mesmo erro para todas as entidades de um template que falhou"""
+        entities = list(entities)
+        logger.error(f"Erro na consulta em lote: {error}")
+        ERRORS.inc("batch", amount=len(entities))
+        return {(intent, entity, relation): f"Erro ao executar consulta: {error}" for entity in entities}
+
+    def _store_batch(self, batch: Dict[tuple, str], answers: Dict[tuple, str]):
+        for key, answer in batch.items():
+            answers[key] = answer
+            self.answer_cache.set(key, answer)
+
+    def _batch_results(self, questions: List[str], keys: List[Optional[tuple]],
+                       answers: Dict[tuple, str], errors: Dict[tuple, str]) -> List[Dict[str, Any]]:
+        """Resultados na ordem de entrada, com erro por item"""
+        results = []
+        for question, key in zip(questions, keys):
+            if key is None:
+                results.append({"question": question, "success": False, "error": "Pergunta vazia"})
+            elif key in errors:
+                results.append({"question": question, "success": False, "error": errors[key]})
+            else:
+                results.append({"question": question, "success": True, "answer": answers[key]})
+        return results
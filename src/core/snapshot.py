@@ -0,0 +1,324 @@
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .local_graph import CSR, LocalGraph, LocalGraphBackend, load_graph
+from src.utils.database import DatabaseManager
+
+# Arquivo: MAGIC | versão do formato (u32) | reservado (u32) | tamanho do cabeçalho (u64)
+# | cabeçalho JSON | seções binárias alinhadas em 8 bytes (offsets absolutos no cabeçalho)
+MAGIC = b"SWGRAPH\0"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sIIQ")
+
+logger = logging.getLogger(__name__)
+
+# Valor ausente em colunas inteiras
+INT_NULL = -2 ** 63
+
+
+class SnapshotError(ValueError):
+    """Arquivo que não é um snapshot válido nesta versão do formato"""
+
+
+class StringTable:
+    """Dicionário de strings ordenado pelos bytes UTF-8 (busca binária sem decodificar tudo)"""
+    
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def raw(self, index: int) -> bytes:
+        return bytes(self.data[self.offsets[index]:self.offsets[index + 1]])
+    
+    def __getitem__(self, index: int) -> str:
+        return self.raw(index).decode("utf-8")
+    
+    def find(self, text: str) -> Optional[int]:
+        """Posição da string no dicionário, ou None"""
+        key = text.encode("utf-8")
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.raw(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(self) and self.raw(low) == key else None
+
+
+class StrColumn:
+    """Coluna de ids do dicionário de strings (-1 = ausente)"""
+    
+    def __init__(self, ids: memoryview, strings: StringTable):
+        self.ids = ids
+        self.strings = strings
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def _decode(self, string_id: int) -> Optional[str]:
+        return None if string_id < 0 else self.strings[string_id]
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(string_id) for string_id in self.ids[index]]
+        return self._decode(self.ids[index])
+    
+    def __iter__(self) -> Iterator[Optional[str]]:
+        return (self._decode(string_id) for string_id in self.ids)
+
+
+class NumberColumn:
+    """Coluna int64 (INT_NULL = ausente) ou float64 (NaN = ausente)"""
+    
+    def __init__(self, values: memoryview):
+        self.values = values
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    @staticmethod
+    def _value(value):
+        if value == INT_NULL or (isinstance(value, float) and math.isnan(value)):
+            return None
+        return value
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._value(value) for value in self.values[index]]
+        return self._value(self.values[index])
+    
+    def __iter__(self):
+        return (self._value(value) for value in self.values)
+
+
+class NameIndex:
+    """Nome → nós de um label, por busca binária em (id da string, nó) ordenados"""
+    
+    def __init__(self, ids: memoryview, nodes: memoryview, strings: StringTable):
+        self.ids = ids
+        self.nodes = nodes
+        self.strings = strings
+    
+    def get(self, name: str, default=None) -> Optional[List[int]]:
+        string_id = self.strings.find(name)
+        if string_id is None:
+            return default
+        low = bisect_left(self.ids, string_id)
+        high = bisect_right(self.ids, string_id, low)
+        return list(self.nodes[low:high]) if high > low else default
+    
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+    
+    def __iter__(self) -> Iterator[str]:
+        previous = None
+        for string_id in self.ids:
+            if string_id != previous:
+                previous = string_id
+                yield self.strings[string_id]
+
+
+def _column_kind(values: Sequence[Any]) -> str:
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return "int"
+    if present and all(isinstance(value, (int, float)) and not isinstance(value, bool)
+                       for value in present):
+        return "float"
+    return "str"
+
+
+def write_snapshot(graph: LocalGraph, path: str, version: Optional[str] = None) -> str:
+    """
+    Grava o grafo em um snapshot binário e devolve a versão gravada
+    
+    O arquivo é escrito ao lado e trocado com os.replace, então réplicas
+    que já mapearam a versão anterior continuam lendo um arquivo íntegro.
+    """
+    version = version or uuid.uuid4().hex
+    strings = set()
+    kinds: Dict[Tuple[str, str], str] = {}
+    for label, columns in graph.columns.items():
+        for prop, values in columns.items():
+            kinds[(label, prop)] = kind = _column_kind(values)
+            if kind == "str":
+                strings.update(str(value) for value in values if value is not None)
+    for label, index in graph.names.items():
+        strings.update(index)
+    encoded = sorted(text.encode("utf-8") for text in strings)
+    string_ids = {text.decode("utf-8"): position for position, text in enumerate(encoded)}
+    
+    sections: List[bytes] = []
+    header: Dict[str, Any] = {
+        "format": FORMAT_VERSION, "version": version, "created_at": time.time(),
+        "labels": {}, "edges": [],
+    }
+    
+    def add(data: array) -> List[int]:
+        sections.append(data.tobytes())
+        return [len(sections) - 1, len(data)]
+    
+    string_offsets = array("q", [0])
+    for text in encoded:
+        string_offsets.append(string_offsets[-1] + len(text))
+    header["strings"] = {"offsets": add(string_offsets), "data": add(array("B", b"".join(encoded)))}
+    
+    for label, columns in graph.columns.items():
+        entry: Dict[str, Any] = {"columns": {}}
+        for prop, values in columns.items():
+            kind = kinds[(label, prop)]
+            if kind == "int":
+                data = array("q", (INT_NULL if value is None else value for value in values))
+            elif kind == "float":
+                data = array("d", (math.nan if value is None else float(value) for value in values))
+            else:
+                data = array("i", (-1 if value is None else string_ids[str(value)] for value in values))
+            entry["columns"][prop] = {"kind": kind, "data": add(data)}
+        pairs = sorted((string_ids[name], node)
+                       for name, nodes in graph.names.get(label, {}).items() for node in nodes)
+        entry["names"] = {"ids": add(array("i", (sid for sid, _ in pairs))),
+                          "nodes": add(array("i", (node for _, node in pairs)))}
+        header["labels"][label] = entry
+    
+    for (rel, source, target), csr in graph.edges.items():
+        header["edges"].append({"rel": rel, "source": source, "target": target,
+                                "offsets": add(csr.offsets), "targets": add(csr.targets)})
+    
+    # Posições das seções só são conhecidas depois do cabeçalho: 2 passadas
+    def layout(header_size: int) -> List[int]:
+        position = _PREAMBLE.size + header_size
+        positions = []
+        for data in sections:
+            position += -position % 8
+            positions.append(position)
+            position += len(data)
+        return positions
+    
+    def resolve(positions: List[int]) -> bytes:
+        def fix(ref):
+            return [positions[ref[0]], ref[1]]
+        resolved = json.loads(json.dumps(header))
+        strings_ref = resolved["strings"]
+        strings_ref["offsets"], strings_ref["data"] = fix(strings_ref["offsets"]), fix(strings_ref["data"])
+        for entry in resolved["labels"].values():
+            for column in entry["columns"].values():
+                column["data"] = fix(column["data"])
+            entry["names"] = {key: fix(ref) for key, ref in entry["names"].items()}
+        for edge in resolved["edges"]:
+            edge["offsets"], edge["targets"] = fix(edge["offsets"]), fix(edge["targets"])
+        return json.dumps(resolved).encode("utf-8")
+    
+    header_bytes = resolve(layout(0))
+    while True:
+        positions = layout(len(header_bytes))
+        candidate = resolve(positions)
+        if len(candidate) <= len(header_bytes):
+            header_bytes = candidate.ljust(len(header_bytes))
+            break
+        header_bytes = candidate
+    
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as out:
+        out.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes)))
+        out.write(header_bytes)
+        for position, data in zip(positions, sections):
+            out.write(b"\0" * (position - out.tell()))
+            out.write(data)
+    os.replace(temp_path, path)
+    return version
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    """Cabeçalho do snapshot, sem mapear as seções"""
+    with open(path, "rb") as source:
+        preamble = source.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise SnapshotError(f"{path}: arquivo truncado")
+        magic, format_version, _, header_size = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path}: não é um snapshot do grafo")
+        if format_version != FORMAT_VERSION:
+            raise SnapshotError(f"{path}: formato {format_version} não suportado")
+        return json.loads(source.read(header_size))
+
+
+def load_snapshot(path: str) -> Tuple[LocalGraph, Dict[str, Any]]:
+    """
+    Mapeia o snapshot em memória (somente leitura) e devolve o grafo e o cabeçalho
+    
+    Colunas, índices de nomes e CSRs são memoryviews sobre o mmap: nada é
+    copiado, e processos que mapeiam o mesmo arquivo dividem as páginas.
+    """
+    if sys.byteorder != "little":
+        raise SnapshotError("snapshots são little-endian")
+    header = read_header(path)
+    with open(path, "rb") as source:
+        mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    buffer = memoryview(mapped)
+    
+    def view(ref, fmt: str) -> memoryview:
+        position, count = ref
+        size = struct.calcsize(fmt)
+        return buffer[position:position + count * size].cast(fmt)
+    
+    strings = StringTable(view(header["strings"]["offsets"], "q"), view(header["strings"]["data"], "B"))
+    columns: Dict[str, Dict[str, Any]] = {}
+    names: Dict[str, NameIndex] = {}
+    for label, entry in header["labels"].items():
+        columns[label] = {}
+        for prop, column in entry["columns"].items():
+            if column["kind"] == "str":
+                columns[label][prop] = StrColumn(view(column["data"], "i"), strings)
+            else:
+                columns[label][prop] = NumberColumn(view(column["data"], "q" if column["kind"] == "int" else "d"))
+        names[label] = NameIndex(view(entry["names"]["ids"], "i"), view(entry["names"]["nodes"], "i"), strings)
+    edges = {
+        (edge["rel"], edge["source"], edge["target"]): CSR(view(edge["offsets"], "i"), view(edge["targets"], "i"))
+        for edge in header["edges"]
+    }
+    return LocalGraph(columns, names, edges), header
+
+
+def export_snapshot(db_path: str, path: str) -> str:
+    """Monta o grafo do star_wars.db (mesmas entidades do importador) e grava o snapshot"""
+    started = time.perf_counter()
+    version = write_snapshot(load_graph(DatabaseManager(db_path)), path)
+    logger.info(f"Snapshot {version} gravado em {path} ({os.path.getsize(path)} bytes) "
+                f"em {time.perf_counter() - started:.3f}s")
+    return version
+
+
+class SnapshotBackend(LocalGraphBackend):
+    """
+    LocalGraphBackend servido por um snapshot mapeado em memória
+    
+    A carga só lê o cabeçalho e cria memoryviews; a versão do grafo é a
+    gravada pelo exportador, e refresh() remapeia quando o arquivo é trocado.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        super().__init__()
+    
+    def _file_version(self) -> Optional[str]:
+        try:
+            return read_header(self.path)["version"]
+        except (OSError, SnapshotError):
+            return None
+    
+    def _read_graph(self) -> LocalGraph:
+        return load_snapshot(self.path)[0]
@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .backends import GraphBackend
+from .cypher import Relation
+
+logger = logging.getLogger(__name__)
+
+# (intent, entidade, relação) de uma consulta do aquecimento; intent "page" é a
+# primeira página de ask_page
+Step = Tuple[str, Optional[str], Optional[Relation]]
+
+
+class GraphWarmup:
+    """
+    Aquecimento do grafo após reinício do Neo4j ou nova importação
+    
+    Percorre os índices de id e nome e executa, para cada entidade
+    escolhida, todos os templates que o QA monta (contagem e lista por
+    relação, perfil, primeira página e a lista padrão). Assim as páginas
+    que as primeiras perguntas leriam já estão no page cache e os planos
+    compilados. `ready` é marcado ao fim da primeira execução, mesmo com
+    erros: o aquecimento nunca impede o QA de responder.
+    """
+    
+    def __init__(self, backend: GraphBackend, relations: Sequence[Relation],
+                 entities: Callable[[], List[str]], page_size: int = 100):
+        self.backend = backend
+        self.relations = list(relations)
+        self.entities = entities
+        self.page_size = page_size
+        self.ready = threading.Event()
+        self.state = "pending"
+        self.queries = 0
+        self.errors = 0
+        self.seconds: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def plan(self, entities: Sequence[str]) -> List[Step]:
+        """Consultas do aquecimento: a lista padrão e cada template por entidade"""
+        steps: List[Step] = [("list", None, None)]
+        for entity in entities:
+            steps.append(("detail", entity, None))
+            for relation in self.relations:
+                steps.append(("count", entity, relation))
+                steps.append(("list", entity, relation))
+                steps.append(("page", entity, relation))
+        return steps
+    
+    def _execute(self, intent: str, entity: Optional[str], relation: Optional[Relation]):
+        if intent == "page":
+            self.backend.run_page(entity, relation, None, self.page_size + 1)
+        else:
+            self.backend.run(intent, entity, relation)
+    
+    def run(self) -> Dict[str, Any]:
+        """Executa o aquecimento nesta thread e devolve stats()"""
+        started = time.perf_counter()
+        self.state = "running"
+        self.queries = self.errors = 0
+        try:
+            self.queries += self.backend.warm_indexes()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Falha ao aquecer os índices: {e}")
+        
+        try:
+            entities = self.entities()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Falha ao escolher as entidades do aquecimento: {e}")
+            entities = []
+        for step in self.plan(entities):
+            try:
+                self._execute(*step)
+                self.queries += 1
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Falha no aquecimento {step[:2]}: {e}")
+        
+        self.seconds = time.perf_counter() - started
+        self.state = "done"
+        self.ready.set()
+        logger.info(f"Grafo aquecido: {self.queries} consultas ({len(entities)} entidades, "
+                    f"{self.errors} erros) em {self.seconds:.2f}s")
+        return self.stats()
+    
+    def start(self) -> bool:
+        """Inicia run() em uma thread daemon; False se já houver uma em andamento"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self.run, name="qa-warmup", daemon=True)
+            self._thread.start()
+            return True
+    
+    def skip(self):
+        """Marca o QA como pronto sem aquecer (QA_WARMUP=0)"""
+        self.state = "disabled"
+        self.ready.set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a execução em andamento (ou a primeira); False se o tempo acabar antes"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                return False
+        return self.ready.wait(timeout)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready.is_set(),
+            "state": self.state,
+            "queries": self.queries,
+            "errors": self.errors,
+            "seconds": self.seconds,
+        }
@@ -1,3 +1,4 @@
 from .database import DatabaseManager
+from .neo4j_pool import GraphClient, get_driver, pool_stats
 
-__all__ = ['DatabaseManager'] 
\ No newline at end of file
+__all__ = ['DatabaseManager', 'GraphClient', 'get_driver', 'pool_stats'] 
\ No newline at end of file
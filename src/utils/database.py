@@ -1,72 +1,269 @@
+import ast
+import copy
+import os
 import sqlite3
 import logging
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from urllib.parse import quote
 from src.config.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# Bancos a partir deste tamanho contam as linhas das tabelas em paralelo
+PARALLEL_COUNT_BYTES = 64 * 1024 * 1024
+SUMMARY_WORKERS = 4
+
+# Colunas de todas as tabelas em uma única consulta ao catálogo
+CATALOG_QUERY = """
+SELECT m.name, p.name, p.type, p."notnull", p.dflt_value, p.pk
+FROM sqlite_master AS m JOIN pragma_table_info(m.name) AS p
+WHERE m.type = 'table'
+ORDER BY m.rowid, p.cid
+"""
+
+# Linhas estimadas pelo ANALYZE: o primeiro número de cada stat é o total da tabela
+STAT1_QUERY = "SELECT tbl, MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 GROUP BY tbl"
+
+# (caminho, estimate) → (assinatura do arquivo, resumo)
+_summaries: Dict[Tuple[str, bool], Tuple[tuple, Dict[str, Any]]] = {}
+_summaries_lock = threading.Lock()
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def split_list(value: Any) -> List[str]:
+    """Converte uma coluna-lista ("a, b" ou "['a', 'b']") em nomes"""
+    if value is None:
+        return []
+    text = str(value).strip()
+    if text.startswith("[") and text.endswith("]"):
+        try:
+            items = ast.literal_eval(text)
+            return [str(item).strip() for item in items if str(item).strip()]
+        except (ValueError, SyntaxError):
+            text = text[1:-1]
+    return [item.strip().strip("'\"") for item in text.split(",") if item.strip()]
+
+
 class DatabaseManager:
-    """Gerenciador de banco de dados SQLite"""
+    """
+    Gerenciador de banco de dados SQLite
+    
+    Leituras usam uma conexão somente leitura por thread, reaproveitada entre
+    chamadas (o sqlite3 mantém as instruções preparadas em cache por conexão)
+    e reaberta se o arquivo for trocado ou o processo fizer fork. Tabelas e
+    colunas só entram no SQL depois de conferidas no catálogo do banco.
+    """
     
     def __init__(self, db_path: str | None = None):
         self.db_path = db_path or Settings.SQLITE_DB_PATH
+        self._local = threading.local()
+        # Incrementada por close(): conexões de gerações anteriores são reabertas
+        self._generation = 0
+        self._catalog: Tuple[tuple, Dict[str, List[str]]] = ((), {})
     
     def get_connection(self):
-        """Retorna conexão com o banco"""
+        """Retorna conexão com o banco (leitura e escrita, nova a cada chamada)"""
         return sqlite3.connect(self.db_path)
     
+    def get_read_connection(self):
+        """Conexão somente leitura (mode=ro): não cria o arquivo nem bloqueia escritores em WAL"""
+        uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                               cached_statements=Settings.SQLITE_CACHED_STATEMENTS)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA mmap_size = {int(Settings.SQLITE_MMAP_SIZE)}")
+        conn.execute(f"PRAGMA cache_size = {-int(Settings.SQLITE_CACHE_SIZE_KB)}")
+        return conn
+    
+    def read_connection(self) -> sqlite3.Connection:
+        """Conexão de leitura desta thread, aberta na primeira chamada"""
+        stat = os.stat(self.db_path)
+        identity = (os.getpid(), stat.st_dev, stat.st_ino, self._generation)
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is not None and local.identity == identity:
+            return conn
+        # A conexão anterior não é fechada aqui: cursores ainda abertos (um
+        # iter_batches em andamento) terminam nela, e o GC a fecha depois
+        local.conn, local.identity = self.get_read_connection(), identity
+        return local.conn
+    
+    def close(self):
+        """Fecha a conexão de leitura desta thread; as das demais são reabertas no próximo uso"""
+        self._generation += 1
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+    
+    def file_signature(self) -> tuple:
+        """
+        Tamanho, mtime, inode e ctime do banco e do -wal
+        
+        O inode pega a troca do arquivo por outro (os.replace de um banco novo)
+        e o ctime uma regravação do mesmo tamanho dentro da resolução do mtime
+        ou com o mtime restaurado.
+        """
+        signature = []
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_size, stat.st_mtime_ns, stat.st_ino, stat.st_ctime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def _columns_by_table(self) -> Dict[str, List[str]]:
+        """Tabela → colunas, relido do catálogo quando o arquivo muda"""
+        signature = self.file_signature()
+        if self._catalog[0] != signature:
+            columns: Dict[str, List[str]] = {}
+            for table, name, *_ in self.read_connection().execute(CATALOG_QUERY):
+                columns.setdefault(table, []).append(name)
+            self._catalog = (signature, columns)
+        return self._catalog[1]
+    
+    def _table(self, table_name: str) -> str:
+        """Nome da tabela entre aspas, se ela existir no banco"""
+        if table_name not in self._columns_by_table():
+            raise ValueError(f"Tabela desconhecida: {table_name!r}")
+        return _quote_identifier(table_name)
+    
+    def _select(self, table_name: str, columns: Optional[List[str]]) -> str:
+        """SELECT das colunas (todas se None), conferidas no catálogo"""
+        table = self._table(table_name)
+        if not columns:
+            return f"SELECT * FROM {table}"
+        unknown = set(columns) - set(self._columns_by_table()[table_name])
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas em {table_name}: {sorted(unknown)}")
+        return f"SELECT {', '.join(_quote_identifier(column) for column in columns)} FROM {table}"
+    
+    def iter_batches(self, table_name: str, batch_size: int = 5000,
+                     columns: Optional[List[str]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Lê uma tabela em lotes de até batch_size linhas (fetchmany, memória limitada)"""
+        cursor = self.read_connection().execute(self._select(table_name, columns))
+        try:
+            names = [description[0] for description in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [dict(zip(names, row)) for row in rows]
+        finally:
+            cursor.close()
+    
+    def iter_rows(self, table_name: str, batch_size: int = 5000,
+                  columns: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Percorre uma tabela linha a linha (fetchmany, memória limitada)"""
+        for batch in self.iter_batches(table_name, batch_size, columns):
+            yield from batch
+    
+    def read_columns(self, table_name: str, columns: List[str]) -> Dict[str, List[Any]]:
+        """Lê colunas inteiras de uma tabela, na ordem das linhas (colunas ausentes viram None)"""
+        table = self._table(table_name)
+        existing = set(self._columns_by_table()[table_name])
+        present = [column for column in columns if column in existing]
+        conn = self.read_connection()
+        if present:
+            rows = conn.execute(self._select(table_name, present)).fetchall()
+            count = len(rows)
+        else:
+            rows, count = [], conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        values = {column: list(items) for column, items in zip(present, zip(*rows))}
+        return {column: values.get(column, [None] * count) for column in columns}
+    
     def get_tables(self) -> List[str]:
         """Retorna lista de tabelas no banco"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            return [row[0] for row in cursor.fetchall()]
+        rows = self.read_connection().execute("SELECT name FROM sqlite_master WHERE type='table'")
+        return [row[0] for row in rows]
     
     def get_table_info(self, table_name: str) -> List[Dict[str, Any]]:
         """Retorna informações sobre uma tabela"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = cursor.fetchall()
-            return [
-                {
-                    "name": col[1],
-                    "type": col[2],
-                    "not_null": bool(col[3]),
-                    "default": col[4],
-                    "primary_key": bool(col[5])
-                }
-                for col in columns
-            ]
+        columns = self.read_connection().execute(
+            'SELECT cid, name, type, "notnull", dflt_value, pk FROM pragma_table_info(?) ORDER BY cid',
+            (table_name,)
+        )
+        return [
+            {
+                "name": col[1],
+                "type": col[2],
+                "not_null": bool(col[3]),
+                "default": col[4],
+                "primary_key": bool(col[5])
+            }
+            for col in columns
+        ]
     
     def get_sample_data(self, table_name: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Retorna dados de exemplo de uma tabela"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM {table_name} LIMIT {limit};")
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            return [dict(zip(columns, row)) for row in rows]
+        cursor = self.read_connection().execute(f"{self._select(table_name, None)} LIMIT ?", (int(limit),))
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
     def get_table_count(self, table_name: str) -> int:
         """Retorna número de registros em uma tabela"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
-            return cursor.fetchone()[0]
-    
-    def get_database_summary(self) -> Dict[str, Any]:
-        """Retorna resumo do banco de dados"""
-        tables = self.get_tables()
+        return self.read_connection().execute(f"SELECT COUNT(*) FROM {self._table(table_name)}").fetchone()[0]
+    
+    def _count_rows(self, tables: List[str]) -> Dict[str, int]:
+        """COUNT(*) de cada tabela; em bancos grandes, em paralelo (uma conexão por tabela)"""
+        def count(conn, table: str) -> int:
+            return conn.execute(f"SELECT COUNT(*) FROM {_quote_identifier(table)}").fetchone()[0]
+        
+        def count_alone(table: str) -> int:
+            with closing(self.get_read_connection()) as conn:
+                return count(conn, table)
+        
+        if len(tables) > 1 and os.path.getsize(self.db_path) >= PARALLEL_COUNT_BYTES:
+            with ThreadPoolExecutor(max_workers=min(SUMMARY_WORKERS, len(tables))) as pool:
+                return dict(zip(tables, pool.map(count_alone, tables)))
+        conn = self.read_connection()
+        return {table: count(conn, table) for table in tables}
+    
+    def get_database_summary(self, estimate: bool = False) -> Dict[str, Any]:
+        """
+        Retorna resumo do banco de dados
+        
+        O catálogo vem de uma única consulta (sqlite_master × pragma_table_info)
+        na conexão de leitura da thread, e o resumo fica em cache enquanto o arquivo
+        não muda. Tabelas internas (sqlite_*) ficam de fora nos dois modos. Com
+        estimate=True, tabelas analisadas (sqlite_stat1) usam a contagem do
+        ANALYZE em vez de COUNT(*).
+        """
+        key = (os.path.abspath(self.db_path), estimate)
+        signature = self.file_signature()
+        with _summaries_lock:
+            cached = _summaries.get(key)
+        if cached and cached[0] == signature:
+            return copy.deepcopy(cached[1])
+        
+        columns: Dict[str, List[Dict[str, Any]]] = {}
+        estimated: Dict[str, int] = {}
+        conn = self.read_connection()
+        for table, name, col_type, not_null, default, primary_key in conn.execute(CATALOG_QUERY):
+            columns.setdefault(table, []).append({
+                "name": name,
+                "type": col_type,
+                "not_null": bool(not_null),
+                "default": default,
+                "primary_key": bool(primary_key)
+            })
+        if estimate and "sqlite_stat1" in columns:
+            estimated = {table: rows for table, rows in conn.execute(STAT1_QUERY) if rows is not None}
+        
+        tables = [table for table in columns if not table.startswith("sqlite_")]
+        counts = self._count_rows([table for table in tables if table not in estimated])
+        counts.update(estimated)
         summary = {
-            "tables": {},
+            "tables": {table: {"count": counts[table], "columns": columns[table]} for table in tables},
             "total_tables": len(tables)
         }
-        
-        for table in tables:
-            summary["tables"][table] = {
-                "count": self.get_table_count(table),
-                "columns": self.get_table_info(table)
-            }
-        
-        return summary 
\ No newline at end of file
+        with _summaries_lock:
+            _summaries[key] = (signature, summary)
+        return copy.deepcopy(summary) 
\ No newline at end of file
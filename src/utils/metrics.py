@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Limites (segundos) dos buckets de latência: de 250 µs a 10 s
+DEFAULT_BUCKETS = (0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Contador monotônico por combinação de labels"""
+    kind = "counter"
+    
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, labels)} {value:g}" for labels, value in items]
+
+
+class Histogram:
+    """Histograma com buckets fixos por combinação de labels (formato do Prometheus)"""
+    kind = "histogram"
+    
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels → [contagem por bucket (+Inf no fim), soma]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        lines = []
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Métricas do processo e sua exposição no formato texto do Prometheus"""
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: List = []
+    
+    def counter(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, description, labelnames)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(self, name: str, description: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, description, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# QA_METRICS=0 desliga a coleta: timer() devolve um cronômetro vazio
+METRICS = MetricsRegistry(enabled=os.getenv("QA_METRICS", "1") != "0")
+
+REQUEST_SECONDS = METRICS.histogram(
+    "qa_request_seconds", "Latência de ask() por intent e resultado do cache", ["intent", "cache"])
+STAGE_SECONDS = METRICS.histogram(
+    "qa_stage_seconds", "Tempo de cada etapa de ask() (resolve, intent, build, query, format)", ["stage"])
+ERRORS = METRICS.counter("qa_errors_total", "Erros por etapa", ["stage"])
+NEO4J_QUERIES = METRICS.counter("neo4j_queries_total", "Consultas de leitura enviadas ao Neo4j")
+NEO4J_QUERY_SECONDS = METRICS.counter("neo4j_query_seconds_total", "Tempo total das consultas ao Neo4j")
+NEO4J_QUERY_ERRORS = METRICS.counter("neo4j_query_errors_total", "Consultas ao Neo4j que falharam")
+
+
+def observe_query(started: Optional[float], failed: bool = False):
+    """Registra uma consulta ao Neo4j iniciada em `started` (None: métricas desligadas)"""
+    if started is None:
+        return
+    NEO4J_QUERIES.inc()
+    NEO4J_QUERY_SECONDS.inc(amount=time.perf_counter() - started)
+    if failed:
+        NEO4J_QUERY_ERRORS.inc()
+
+
+class Timer:
+    """Cronômetro de uma pergunta: lap(etapa) mede o tempo desde a marca anterior"""
+    __slots__ = ("started", "last")
+    
+    def __init__(self):
+        self.started = self.last = time.perf_counter()
+    
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        STAGE_SECONDS.observe(now - self.last, stage)
+        self.last = now
+    
+    def done(self, intent: str, cache: str):
+        REQUEST_SECONDS.observe(time.perf_counter() - self.started, intent, cache)
+
+
+class _NullTimer:
+    """Cronômetro usado com as métricas desligadas"""
+    __slots__ = ()
+    
+    def lap(self, stage: str):
+        pass
+    
+    def done(self, intent: str, cache: str):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def timer():
+    """Cronômetro para uma pergunta (vazio se as métricas estiverem desligadas)"""
+    return Timer() if METRICS.enabled else NULL_TIMER
@@ -0,0 +1,450 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config.settings import Settings
+from src.utils.metrics import METRICS, observe_query
+
+logger = logging.getLogger(__name__)
+
+# Nomes do pacote neo4j (meio segundo de importação) carregados só no primeiro
+# uso: QA sobre o grafo local, CLI e workers ainda sem conexão não pagam por ele
+_NEO4J_NAMES = ("GraphDatabase", "AsyncGraphDatabase", "RoutingControl")
+
+
+def _neo4j(name: str):
+    """Atributo do pacote neo4j, importado na primeira chamada (ou o substituto em testes)"""
+    value = globals().get(name)
+    if value is None:
+        import neo4j
+        value = getattr(neo4j, name)
+    return value
+
+
+def __getattr__(name: str):
+    if name in _NEO4J_NAMES:
+        return _neo4j(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def driver_config() -> Dict[str, Any]:
+    """Parâmetros do pool de conexões definidos em Settings"""
+    return {
+        "max_connection_pool_size": Settings.NEO4J_MAX_POOL_SIZE,
+        "max_connection_lifetime": Settings.NEO4J_MAX_CONNECTION_LIFETIME,
+        "connection_acquisition_timeout": Settings.NEO4J_ACQUISITION_TIMEOUT,
+        "fetch_size": Settings.NEO4J_FETCH_SIZE,
+    }
+
+
+class PoolMetrics:
+    """
+    Uso do pool: sessões em uso, espera na aquisição e conexões criadas
+    
+    `in_use` é o número de sessões abertas e de execute_query em andamento
+    pelos drivers desta fábrica: um limite superior das conexões ocupadas
+    (a sessão só pega a conexão na primeira transação). As conexões de
+    roteamento dos URIs neo4j:// e as ociosas no pool não entram na conta.
+    
+    A espera na aquisição é medida em execute_read/execute_write: do início
+    da chamada até a primeira execução da função de trabalho, quando a
+    conexão já foi obtida (execute_query não expõe esse ponto e fica de
+    fora). As conexões novas são contadas pelos registros do logger
+    neo4j.pool (ver _PoolLogFilter).
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.sessions = 0
+        self.queries = 0
+        self.failures = 0
+        self.acquisitions = 0
+        self.acquisition_failures = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.created = 0
+    
+    def opened(self, kind: str):
+        with self._lock:
+            if kind == "session":
+                self.sessions += 1
+            else:
+                self.queries += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+    
+    def closed(self, failed: bool = False):
+        with self._lock:
+            self.in_use -= 1
+            if failed:
+                self.failures += 1
+    
+    def waited(self, seconds: float, acquired: bool = True):
+        with self._lock:
+            if acquired:
+                self.acquisitions += 1
+            else:
+                self.acquisition_failures += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+    
+    def connection_created(self):
+        with self._lock:
+            self.created += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Métricas atuais do pool"""
+        with self._lock:
+            attempts = self.acquisitions + self.acquisition_failures
+            uptime = time.monotonic() - self._started_at
+            return {
+                "max_size": self.max_size,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "sessions": self.sessions,
+                "queries": self.queries,
+                "failures": self.failures,
+                "acquisitions": self.acquisitions,
+                "acquisition_failures": self.acquisition_failures,
+                "acquisition_wait_avg_ms": self.wait_seconds * 1000 / attempts if attempts else 0.0,
+                "acquisition_wait_max_ms": self.max_wait_seconds * 1000,
+                "connections_created": self.created,
+                "connections_created_per_min": self.created * 60 / uptime if uptime else 0.0,
+            }
+
+
+# Métricas do driver cuja sessão ou execute_query está em andamento nesta
+# thread ou task: o driver cria conexões nela, então o log é atribuído a ele
+_current: contextvars.ContextVar[Optional[PoolMetrics]] = contextvars.ContextVar(
+    "neo4j_pool_metrics", default=None)
+
+# Mensagem do logger neo4j.pool emitida a cada conexão aberta pelo pool
+_NEW_CONNECTION = "<POOL> trying to hand out new connection"
+
+
+class _PoolLogFilter(logging.Filter):
+    """
+    Conta conexões novas nos registros DEBUG do logger neo4j.pool
+    
+    O logger passa a DEBUG para que o driver emita esses registros; o filtro
+    só deixa seguir (para os handlers e a propagação) os registros a partir
+    do nível que o logger teria sem isso: o próprio, se estava definido, ou
+    o efetivo do logger neo4j. Assim o log da aplicação não muda.
+    """
+    
+    def __init__(self, level: int):
+        super().__init__()
+        self.level = level
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno == logging.DEBUG and _NEW_CONNECTION in str(record.msg):
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.connection_created()
+        level = self.level or logging.getLogger("neo4j").getEffectiveLevel()
+        return record.levelno >= level
+
+
+def _watch_pool_log():
+    """Instala _PoolLogFilter no logger neo4j.pool (uma vez por processo)"""
+    pool_logger = logging.getLogger("neo4j.pool")
+    if any(isinstance(f, _PoolLogFilter) for f in pool_logger.filters):
+        return
+    pool_logger.addFilter(_PoolLogFilter(pool_logger.level))
+    pool_logger.setLevel(logging.DEBUG)
+
+
+class _Tracked:
+    """Marca as métricas do driver como atuais enquanto a sessão ou consulta está aberta"""
+    
+    def __init__(self, metrics: PoolMetrics, kind: str):
+        self._metrics = metrics
+        self._kind = kind
+        self._token = None
+    
+    def open(self):
+        self._metrics.opened(self._kind)
+        self._token = _current.set(self._metrics)
+    
+    def close(self, failed: bool):
+        _current.reset(self._token)
+        self._metrics.closed(failed)
+
+
+class CountedSession:
+    """Sessão que conta como em uso entre a entrada e a saída do with e mede a aquisição"""
+    
+    def __init__(self, session, metrics: PoolMetrics):
+        self._session = session
+        self._metrics = metrics
+        self._tracked = _Tracked(metrics, "session")
+    
+    def __getattr__(self, name: str):
+        return getattr(self._session, name)
+    
+    def __enter__(self):
+        self._session.__enter__()
+        self._tracked.open()
+        return self
+    
+    def __exit__(self, *exc):
+        try:
+            return self._session.__exit__(*exc)
+        finally:
+            self._tracked.close(failed=exc[0] is not None)
+    
+    def _measure(self, execute: Callable, work: Callable, args, kwargs):
+        started = time.perf_counter()
+        ran = False
+        
+        def timed_work(tx, *work_args, **work_kwargs):
+            nonlocal ran
+            if not ran:
+                ran = True
+                self._metrics.waited(time.perf_counter() - started)
+            return work(tx, *work_args, **work_kwargs)
+        
+        try:
+            return execute(timed_work, *args, **kwargs)
+        except Exception:
+            if not ran:
+                self._metrics.waited(time.perf_counter() - started, acquired=False)
+            raise
+    
+    def execute_read(self, work: Callable, *args, **kwargs):
+        return self._measure(self._session.execute_read, work, args, kwargs)
+    
+    def execute_write(self, work: Callable, *args, **kwargs):
+        return self._measure(self._session.execute_write, work, args, kwargs)
+
+
+class AsyncCountedSession(CountedSession):
+    """CountedSession para a AsyncSession (async with e funções de trabalho corrotinas)"""
+    
+    async def __aenter__(self):
+        await self._session.__aenter__()
+        self._tracked.open()
+        return self
+    
+    async def __aexit__(self, *exc):
+        try:
+            return await self._session.__aexit__(*exc)
+        finally:
+            self._tracked.close(failed=exc[0] is not None)
+    
+    async def _measure(self, execute: Callable, work: Callable, args, kwargs):
+        started = time.perf_counter()
+        ran = False
+        
+        async def timed_work(tx, *work_args, **work_kwargs):
+            nonlocal ran
+            if not ran:
+                ran = True
+                self._metrics.waited(time.perf_counter() - started)
+            return await work(tx, *work_args, **work_kwargs)
+        
+        try:
+            return await execute(timed_work, *args, **kwargs)
+        except Exception:
+            if not ran:
+                self._metrics.waited(time.perf_counter() - started, acquired=False)
+            raise
+    
+    async def execute_read(self, work: Callable, *args, **kwargs):
+        return await self._measure(self._session.execute_read, work, args, kwargs)
+    
+    async def execute_write(self, work: Callable, *args, **kwargs):
+        return await self._measure(self._session.execute_write, work, args, kwargs)
+
+
+class PooledDriver:
+    """
+    Driver Neo4j devolvido pela fábrica, com o uso contado pela API pública
+    
+    session() e execute_query() passam por PoolMetrics; o resto (close,
+    verify_connectivity...) vai direto ao driver, cujos internos não são tocados.
+    """
+    
+    session_class = CountedSession
+    
+    def __init__(self, driver, metrics: PoolMetrics):
+        self._driver = driver
+        self.metrics = metrics
+    
+    def __getattr__(self, name: str):
+        return getattr(self._driver, name)
+    
+    def session(self, **kwargs) -> CountedSession:
+        return self.session_class(self._driver.session(**kwargs), self.metrics)
+    
+    def execute_query(self, *args, **kwargs):
+        tracked = _Tracked(self.metrics, "query")
+        tracked.open()
+        failed = True
+        try:
+            result = self._driver.execute_query(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            tracked.close(failed)
+
+
+class AsyncPooledDriver(PooledDriver):
+    """PooledDriver para o AsyncDriver (execute_query e close são corrotinas)"""
+    
+    session_class = AsyncCountedSession
+    
+    def __init__(self, driver, metrics: PoolMetrics, on_close: Optional[Callable[[], None]] = None):
+        super().__init__(driver, metrics)
+        self._on_close = on_close
+    
+    async def execute_query(self, *args, **kwargs):
+        tracked = _Tracked(self.metrics, "query")
+        tracked.open()
+        failed = True
+        try:
+            result = await self._driver.execute_query(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            tracked.close(failed)
+    
+    async def close(self):
+        try:
+            await self._driver.close()
+        finally:
+            on_close, self._on_close = self._on_close, None
+            if on_close:
+                on_close()
+
+
+# (uri, usuário) → (driver, métricas), compartilhados pelo processo
+_drivers: Dict[Tuple[str, str], Tuple[Any, PoolMetrics]] = {}
+# (uri, usuário) → (métricas, AsyncDrivers abertos), somadas entre os event loops
+_async_metrics: Dict[Tuple[str, str], Tuple[PoolMetrics, int]] = {}
+_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """
+    Esquece os drivers herdados no processo filho (workers do gunicorn)
+    
+    As conexões do pai seriam compartilhadas entre processos; elas não são
+    fechadas aqui, para não derrubar o pai, e cada filho cria o próprio pool.
+    """
+    global _lock
+    _lock = threading.Lock()
+    _drivers.clear()
+    _async_metrics.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _credentials(uri: Optional[str], user: Optional[str],
+                 password: Optional[str]) -> Tuple[str, str, str]:
+    return (uri or Settings.NEO4J_URI, user or Settings.NEO4J_USER,
+            password or Settings.NEO4J_PASSWORD)
+
+
+def get_driver(uri: Optional[str] = None, user: Optional[str] = None,
+               password: Optional[str] = None):
+    """
+    Driver Neo4j compartilhado por (uri, usuário), com pool configurado por Settings
+    
+    A primeira chamada cria o driver; as seguintes devolvem o mesmo objeto,
+    então QA, chat web e importador no mesmo processo dividem um único pool.
+    """
+    uri, user, password = _credentials(uri, user, password)
+    with _lock:
+        entry = _drivers.get((uri, user))
+        if entry is None:
+            config = driver_config()
+            metrics = PoolMetrics(config["max_connection_pool_size"])
+            _watch_pool_log()
+            driver = PooledDriver(_neo4j("GraphDatabase").driver(uri, auth=(user, password), **config),
+                                  metrics)
+            entry = _drivers[(uri, user)] = (driver, metrics)
+            logger.info(f"Driver Neo4j criado para {uri} (pool de "
+                        f"{config['max_connection_pool_size']} conexões)")
+        return entry[0]
+
+
+def create_async_driver(uri: Optional[str] = None, user: Optional[str] = None,
+                        password: Optional[str] = None):
+    """
+    AsyncDriver com o mesmo pool configurado (um por event loop)
+    
+    Os AsyncDrivers abertos de um (uri, usuário) somam as métricas em uma
+    entrada de pool_stats ("async:uri"), descartada quando o último fecha.
+    """
+    uri, user, password = _credentials(uri, user, password)
+    config = driver_config()
+    size = config["max_connection_pool_size"]
+    raw = _neo4j("AsyncGraphDatabase").driver(uri, auth=(user, password), **config)
+    with _lock:
+        metrics, count = _async_metrics.get((uri, user), (None, 0))
+        if metrics is None:
+            metrics = PoolMetrics(0)
+        metrics.max_size += size
+        _async_metrics[(uri, user)] = (metrics, count + 1)
+        _watch_pool_log()
+    
+    def closed():
+        with _lock:
+            entry = _async_metrics.get((uri, user))
+            if entry is None or entry[0] is not metrics:
+                return
+            metrics.max_size -= size
+            if entry[1] > 1:
+                _async_metrics[(uri, user)] = (metrics, entry[1] - 1)
+            else:
+                del _async_metrics[(uri, user)]
+    
+    return AsyncPooledDriver(raw, metrics, on_close=closed)
+
+
+def close_driver(uri: Optional[str] = None, user: Optional[str] = None):
+    """Fecha e descarta o driver compartilhado de (uri, usuário)"""
+    uri, user, _ = _credentials(uri, user, None)
+    with _lock:
+        entry = _drivers.pop((uri, user), None)
+    if entry:
+        entry[0].close()
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Métricas de todos os pools criados pela fábrica, por URI"""
+    with _lock:
+        stats = {uri: metrics.snapshot() for (uri, _), (_, metrics) in _drivers.items()}
+        for (uri, _), (metrics, _) in _async_metrics.items():
+            stats[f"async:{uri}"] = metrics.snapshot()
+    return stats
+
+
+class GraphClient:
+    """Consultas de leitura sobre o driver compartilhado, devolvendo dicts"""
+    
+    def __init__(self, driver, database: Optional[str] = None):
+        self.driver = driver
+        self.database = database
+    
+    def query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        started = time.perf_counter() if METRICS.enabled else None
+        try:
+            records, _, _ = self.driver.execute_query(
+                cypher, params or {}, database_=self.database, routing_=_neo4j("RoutingControl").READ
+            )
+        except Exception:
+            observe_query(started, failed=True)
+            raise
+        observe_query(started)
+        return [record.data() for record in records]
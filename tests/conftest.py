@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Configuração comum dos testes
+"""
+
+import os
+
+# O aquecimento em segundo plano consultaria os mocks junto com os testes;
+# test_warmup.py o liga explicitamente
+os.environ.setdefault("QA_WARMUP", "0")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Testes para o resumo do banco SQLite (catálogo, cache e contagens estimadas)
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import pytest
+from unittest.mock import patch
+
+from src.utils import database
+from src.utils.database import DatabaseManager
+from test_importer import create_sample_db
+
+
+class TestDatabaseSummary:
+    """Testes para DatabaseManager.get_database_summary"""
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        """star_wars.db de exemplo, sem resumos em cache de outros testes"""
+        path = str(tmp_path / "star_wars.db")
+        create_sample_db(path)
+        database._summaries.clear()
+        return DatabaseManager(path)
+    
+    def test_summary_matches_table_queries(self, db):
+        """Testa contagens e colunas iguais às de get_table_count/get_table_info"""
+        summary = db.get_database_summary()
+        assert summary["total_tables"] == len(db.get_tables())
+        for table in db.get_tables():
+            assert summary["tables"][table]["count"] == db.get_table_count(table)
+            assert summary["tables"][table]["columns"] == db.get_table_info(table)
+    
+    def test_summary_cached_until_file_changes(self, db):
+        """Testa que o catálogo só é relido quando o arquivo muda"""
+        count = db.get_database_summary()["tables"]["species"]["count"]
+        with patch.object(db, "get_read_connection", side_effect=AssertionError("sem cache")):
+            assert db.get_database_summary()["tables"]["species"]["count"] == count
+        
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("INSERT INTO species (id, name) VALUES (3, 'Twi''lek')")
+        conn.commit()
+        conn.close()
+        os.utime(db.db_path, ns=(0, os.stat(db.db_path).st_mtime_ns + 1))
+        assert db.get_database_summary()["tables"]["species"]["count"] == count + 1
+    
+    def test_estimate_uses_sqlite_stat1(self, db):
+        """Testa contagens do ANALYZE sem expor a tabela sqlite_stat1"""
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.close()
+        counted = []
+        with patch.object(DatabaseManager, "_count_rows",
+                          side_effect=lambda tables: counted.extend(tables) or dict.fromkeys(tables, 0)):
+            summary = db.get_database_summary(estimate=True)
+        assert "sqlite_stat1" not in summary["tables"]
+        assert summary["tables"]["characters"]["count"] == 5
+        # Só tabelas vazias (sem linha no sqlite_stat1) são contadas
+        assert "characters" not in counted
+        
+        exact = db.get_database_summary()
+        assert "sqlite_stat1" not in exact["tables"]
+        assert exact["total_tables"] == summary["total_tables"]
+    
+    def test_signature_changes_when_file_is_replaced(self, db, tmp_path):
+        """Testa a troca do banco por outro do mesmo tamanho e mtime (inode e ctime mudam)"""
+        before = db.file_signature()
+        stat = os.stat(db.db_path)
+        copy = tmp_path / "copia.db"
+        shutil.copyfile(db.db_path, copy)
+        os.utime(copy, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(copy, db.db_path)
+        
+        after = db.file_signature()
+        assert after[0][:2] == before[0][:2]
+        assert after != before
+    
+    def test_parallel_counts_for_large_files(self, db):
+        """Testa as mesmas contagens quando o banco passa do limite de contagem paralela"""
+        expected = db.get_database_summary()
+        database._summaries.clear()
+        with patch.object(database, "PARALLEL_COUNT_BYTES", 0):
+            assert db.get_database_summary() == expected
+
+
+class TestDatabaseManager:
+    """Testes para as conexões de leitura por thread e os identificadores conferidos"""
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        """star_wars.db de exemplo"""
+        path = str(tmp_path / "star_wars.db")
+        create_sample_db(path)
+        return DatabaseManager(path)
+    
+    def test_read_connection_reused_per_thread(self, db):
+        """Testa uma conexão somente leitura por thread, reaproveitada entre chamadas"""
+        conn = db.read_connection()
+        assert db.read_connection() is conn
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM species")
+        
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db.read_connection()))
+        thread.start()
+        thread.join()
+        assert other[0] is not conn
+    
+    def test_reopens_after_file_replaced(self, db, tmp_path):
+        """Testa que a troca do arquivo (os.replace) abre uma nova conexão"""
+        db.get_table_count("species")
+        replacement = str(tmp_path / "novo.db")
+        create_sample_db(replacement)
+        conn = sqlite3.connect(replacement)
+        conn.execute("INSERT INTO species (id, name) VALUES (3, 'Twi''lek')")
+        conn.commit()
+        conn.close()
+        os.replace(replacement, db.db_path)
+        assert db.get_table_count("species") == 3
+    
+    def test_rejects_unknown_identifiers(self, db):
+        """Testa que tabelas e colunas fora do catálogo não chegam ao SQL"""
+        with pytest.raises(ValueError):
+            db.get_table_count("species; DROP TABLE species")
+        with pytest.raises(ValueError):
+            next(db.iter_rows("characters", columns=["name", "1; --"]))
+        assert [row["name"] for row in db.get_sample_data("species", limit=1)] == ["Human"]
+    
+    def test_iter_batches(self, db):
+        """Testa lotes de até batch_size linhas com as colunas pedidas"""
+        batches = list(db.iter_batches("characters", batch_size=2, columns=["id", "name"]))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert batches[0][0] == {"id": 1, "name": "Luke Skywalker"}
+        assert [row["id"] for row in db.iter_rows("characters", batch_size=2)] == [1, 2, 3, 4, 5]
+    
+    def test_iter_rows_positional_arguments(self, db):
+        """Testa iter_rows(tabela, batch_size, colunas) na mesma ordem de iter_batches"""
+        rows = list(db.iter_rows("characters", 2, ["id"]))
+        assert rows == [{"id": i} for i in range(1, 6)]
+        assert len(list(db.iter_rows("characters", 1000))) == 5
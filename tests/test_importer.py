@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Testes para o importador SQLite → Neo4j
+"""
+
+import json
+import sqlite3
+import pytest
+from unittest.mock import MagicMock, patch
+
+from import_to_neo4j import StarWarsNeo4jImporter, ENTITY_SPECS, IMPORT_DEPENDENCIES, _row_hash, split_list
+from src.config.graph_schema import ENTITY_RELATIONSHIP_SPECS, RELATIONSHIP_SPECS, relationship_labels
+
+
+def create_sample_db(path):
+    """Cria um star_wars.db mínimo com o schema lido pelo importador"""
+    conn = sqlite3.connect(path)
+    for entity, (table, _, properties) in ENTITY_SPECS.items():
+        columns = list(properties)
+        if table == "characters":
+            columns += ["species", "homeworld", "films"]
+        if table == "quotes":
+            columns += ["character_name"]
+        conn.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+    conn.executemany(
+        "INSERT INTO species (id, name) VALUES (?, ?)",
+        [(1, "Human"), (2, "Wookiee")]
+    )
+    conn.executemany(
+        "INSERT INTO planets (id, name) VALUES (?, ?)",
+        [(1, "Tatooine"), (2, "Corellia")]
+    )
+    conn.executemany(
+        "INSERT INTO characters (id, name, species, homeworld, films, year_born) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (1, "Luke Skywalker", "Human", "Tatooine", "A New Hope, The Empire Strikes Back", "19BBY"),
+            (2, "Han Solo", "Human", "Corellia", "A New Hope", None),
+            (3, "Chewbacca", "Wookiee", None, None, None),
+            (4, "Leia Organa", "Human", None, "A New Hope", None),
+            (5, "Darth Vader", None, "Tatooine", "The Empire Strikes Back", "41.9BBY"),
+        ]
+    )
+    conn.executemany(
+        "INSERT INTO starships (id, name, pilots, films) VALUES (?, ?, ?, ?)",
+        [
+            (1, "Millennium Falcon", "Han Solo, Chewbacca", "A New Hope"),
+            (2, "X-wing", "Luke Skywalker", "A New Hope, The Empire Strikes Back"),
+        ]
+    )
+    conn.executemany(
+        "INSERT INTO films (id, title) VALUES (?, ?)",
+        [(1, "A New Hope"), (2, "The Empire Strikes Back")]
+    )
+    conn.executemany(
+        "INSERT INTO quotes (id, quote, character_name) VALUES (?, ?, ?)",
+        [(1, "I am your father", "Darth Vader"), (2, "Never tell me the odds", "Han Solo")]
+    )
+    conn.commit()
+    conn.close()
+
+
+class TestStarWarsNeo4jImporter:
+    """Testes para o carregamento em lote"""
+    
+    @pytest.fixture
+    def sqlite_db(self, tmp_path):
+        """Banco SQLite de exemplo"""
+        path = tmp_path / "star_wars.db"
+        create_sample_db(str(path))
+        return str(path)
+    
+    @pytest.fixture
+    def session(self):
+        """Sessão Neo4j mockada"""
+        return MagicMock()
+    
+    @pytest.fixture
+    def importer(self, sqlite_db, session):
+        """Importador com driver Neo4j mockado"""
+        with patch('import_to_neo4j.get_driver') as get_driver:
+            driver = MagicMock()
+            driver.session.return_value.__enter__.return_value = session
+            get_driver.return_value = driver
+            yield StarWarsNeo4jImporter(
+                'bolt://localhost:7687', 'neo4j', 'password', sqlite_db, batch_size=2
+            )
+    
+    def written_batches(self, session, marker):
+        """Lotes enviados via execute_write para queries que contêm marker"""
+        return [
+            call.args[2] for call in session.execute_write.call_args_list
+            if marker in call.args[1]
+        ]
+    
+    def test_invalid_batch_size(self, sqlite_db):
+        """Testa rejeição de batch_size inválido"""
+        with patch('import_to_neo4j.get_driver'):
+            with pytest.raises(ValueError):
+                StarWarsNeo4jImporter('bolt://x', 'u', 'p', sqlite_db, batch_size=0)
+    
+    def test_import_characters_batches(self, importer, session):
+        """Testa envio dos personagens em lotes via UNWIND"""
+        importer.import_characters()
+        
+        batches = self.written_batches(session, "CREATE (n:Character")
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert batches[0][0]["name"] == "Luke Skywalker"
+        assert "species" not in batches[0][0]
+        
+        species = self.written_batches(session, "IS_SPECIES")
+        assert sum(len(batch) for batch in species) == 4
+        assert {"source": 1, "target": 1} in species[0]
+        
+        # Alvos resolvidos no cliente: a escrita casa Species e Planet pelo id
+        link_queries = [call.args[1] for call in session.execute_write.call_args_list
+                        if "IS_SPECIES" in call.args[1] or "BORN_ON" in call.args[1]]
+        assert all("{id: row.target}" in query and "row.name" not in query for query in link_queries)
+    
+    def test_iter_batches_streams_rows(self, importer):
+        """Testa leitura do SQLite em lotes limitados a batch_size"""
+        batches = importer._iter_batches("characters")
+        first = next(batches)
+        assert len(first) == 2
+        assert first[0]["homeworld"] == "Tatooine"
+        assert [len(batch) for batch in batches] == [2, 1]
+    
+    def test_import_stats(self, importer):
+        """Testa registro de linhas/s por entidade"""
+        importer.import_species()
+        stats = importer.import_stats["species"]
+        assert stats["rows"] == 2
+        assert stats["rows_per_sec"] > 0
+    
+    def test_missing_values_become_none(self, importer, session):
+        """Testa conversão de valores ausentes em None"""
+        importer.import_quotes()
+        batches = self.written_batches(session, "CREATE (n:Quote")
+        assert batches[0][0]["source"] is None
+    
+    def test_create_relationships_pairs(self, importer, session):
+        """Testa geração client-side dos pares por id (sem produto cartesiano)"""
+        importer.create_relationships()
+        
+        pilots = self.written_batches(session, "MERGE (a)-[:PILOTS]->(b)")
+        pairs = {(row["source"], row["target"]) for batch in pilots for row in batch}
+        assert pairs == {(1, 2), (2, 1), (3, 1)}
+        
+        stats = importer.relationship_stats
+        assert stats["Character-PILOTS->Starship"]["edges"] == 3
+        assert stats["Character-APPEARS_IN->Film"]["edges"] == 5
+        assert stats["Starship-APPEARS_IN->Film"]["edges"] == 3
+        assert stats["Weapon-APPEARS_IN->Film"]["edges"] == 0
+    
+    def test_build_profiles(self, importer, session):
+        """Testa o perfil desnormalizado por personagem, sem OPTIONAL MATCH encadeado"""
+        assert importer.build_profiles() == 5
+        
+        batches = self.written_batches(session, "profile_ships")
+        assert [row["id"] for batch in batches for row in batch] == [1, 2, 3, 4, 5]
+        query = session.execute_write.call_args_list[0].args[1]
+        assert "OPTIONAL MATCH" not in query
+        assert "[(c)-[:PILOTS]->(x:Starship) | x.name]" in query
+        assert "c.degree_PILOTS_Starship = size([(c)-[:PILOTS]->(:Starship) | 1])" in query
+    
+    def test_split_list(self):
+        """Testa leitura das colunas-lista"""
+        assert split_list(None) == []
+        assert split_list("Han Solo, Chewbacca") == ["Han Solo", "Chewbacca"]
+        assert split_list("['Han Solo', 'Chewbacca']") == ["Han Solo", "Chewbacca"]
+    
+    def test_run_stages_respects_dependencies(self, importer):
+        """Testa o agendamento paralelo respeitando o DAG de dependências"""
+        importer.run_stages(workers=4)
+        
+        timings = importer.stage_timings
+        assert set(timings) == set(IMPORT_DEPENDENCIES)
+        for stage, deps in IMPORT_DEPENDENCIES.items():
+            for dep in deps:
+                dep_end = timings[dep]["start"] + timings[dep]["seconds"]
+                assert timings[stage]["start"] >= dep_end
+    
+    def test_run_stages_propagates_errors(self, importer):
+        """Testa propagação de falhas de uma etapa"""
+        with patch.object(importer, 'import_species', side_effect=RuntimeError("falhou")):
+            with pytest.raises(RuntimeError):
+                importer.run_stages(workers=2)
+        assert "characters" not in importer.stage_timings
+    
+    def test_sync_applies_only_differences(self, importer, session):
+        """Testa a sincronização incremental por hash de linha e diff de arestas"""
+        human = {"id": 1, "name": "Human"}
+        human_hash = _row_hash(human, ENTITY_SPECS["species"][2])
+        
+        def graph_state(fn, query, params):
+            if "MATCH (n:Species)" in query:
+                return [{"id": 1, "hash": human_hash}, {"id": 3, "hash": "antigo"}]
+            if "[:IS_SPECIES]" in query:
+                return [{"source": 1, "target": 1}, {"source": 9, "target": 9}]
+            if "(c:Character)-->(n:Species)" in query:
+                assert params == {"ids": [3]}
+                return [{"id": 7}]
+            return []
+        session.execute_read.side_effect = graph_state
+        
+        with patch.object(importer, "build_profiles", wraps=importer.build_profiles) as build_profiles:
+            importer.sync()
+        # Personagens inseridos, origens das arestas alteradas e o ligado à espécie removida
+        assert build_profiles.call_args.args[0] == {1, 2, 3, 4, 5, 7, 9}
+        
+        stats = importer.sync_stats
+        assert stats["species"] == {"inserted": 1, "updated": 0, "deleted": 1}
+        assert stats["characters"]["inserted"] == 5
+        assert stats["Character-IS_SPECIES->Species"] == {"created": 3, "deleted": 1}
+        assert stats["Character-SAID->Quote"] == {"created": 2, "deleted": 0}
+        
+        upserts = self.written_batches(session, "MERGE (n:Species")
+        assert [row["id"] for batch in upserts for row in batch] == [2]
+        removed = self.written_batches(session, "DETACH DELETE")
+        assert [row["id"] for batch in removed for row in batch] == [3]
+        clear_calls = [c for c in session.run.call_args_list if "DETACH DELETE" in c.args[0]]
+        assert clear_calls == []
+    
+    def test_sync_rebuilds_only_touched_profiles(self, importer, session):
+        """Testa perfis recalculados só para personagens com arestas ou vizinhos alterados"""
+        graph = {}
+        for table, label, properties in ENTITY_SPECS.values():
+            graph[f"MATCH (n:{label}) RETURN"] = [
+                {"id": row["id"], "hash": importer._node_row(row, properties)["row_hash"]}
+                for row in importer.db.iter_rows(table)
+            ]
+        specs = [(spec, False) for spec in ENTITY_RELATIONSHIP_SPECS]
+        specs += [(spec, True) for spec in RELATIONSHIP_SPECS]
+        for (rel, owner, column, target, owner_is_source), multi in specs:
+            source_label, target_label = relationship_labels(owner, target, owner_is_source)
+            graph[f"MATCH (a:{source_label})-[:{rel}]->(b:{target_label})"] = [
+                pair for pairs in importer._iter_pair_batches(owner, column, target, owner_is_source,
+                                                               importer._name_index(target), multi=multi)
+                for pair in pairs
+            ]
+        # Han Solo (2) perdeu a aresta de espécie; o Millennium Falcon (1) mudou
+        graph["MATCH (a:Character)-[:IS_SPECIES]->(b:Species)"].remove({"source": 2, "target": 1})
+        graph["MATCH (n:Starship) RETURN"][0]["hash"] = "antigo"
+        
+        def graph_state(fn, query, params):
+            if "(c:Character)-->(n:Starship)" in query:
+                assert params == {"ids": [1]}
+                return [{"id": 3}]
+            return next((rows for marker, rows in graph.items() if marker in query), [])
+        session.execute_read.side_effect = graph_state
+        
+        importer.sync()
+        profiles = self.written_batches(session, "profile_ships")
+        assert [row["id"] for batch in profiles for row in batch] == [2, 3]
+        
+        session.execute_write.reset_mock()
+        assert importer.build_profiles() == 5
+    
+    def test_import_all_marks_graph_version(self, importer, session):
+        """Testa gravação da versão do grafo ao fim da carga (invalida caches do QA)"""
+        session.execute_read.return_value = [{"count": 3}]
+        importer.import_all()
+        queries = [c.args[0] for c in session.run.call_args_list]
+        assert "GraphMeta" in queries[-1]
+        assert "randomUUID()" in queries[-1]
+        
+        stats = json.loads(session.run.call_args_list[-1].kwargs["stats"])
+        assert stats["labels"]["Character"] == 3
+        assert set(stats["relationships"]) == {"IS_SPECIES", "BORN_ON", "SAID", "PILOTS", "APPEARS_IN"}
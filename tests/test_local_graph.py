@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Testes para o backend de grafo em memória (sem Neo4j)
+"""
+
+import sqlite3
+import pytest
+
+from src.core.local_graph import LocalGraphBackend, build_csr
+from src.core.snapshot import SnapshotBackend, SnapshotError, export_snapshot, load_snapshot
+from src.core.qa_system import StarWarsDynamicQA
+from test_importer import create_sample_db
+
+
+class TestLocalGraphBackend:
+    """Testes para o grafo CSR carregado do SQLite"""
+    
+    @pytest.fixture
+    def backend(self, tmp_path):
+        """Backend lendo o star_wars.db de exemplo"""
+        path = tmp_path / "star_wars.db"
+        create_sample_db(str(path))
+        return LocalGraphBackend(str(path))
+    
+    @pytest.fixture
+    def qa_system(self, backend):
+        """QA servido pelo grafo local"""
+        return StarWarsDynamicQA(backend=backend)
+    
+    def test_build_csr(self):
+        """Testa offsets e vizinhos, com pares repetidos descartados"""
+        csr = build_csr(3, [(2, 0), (0, 1), (0, 2), (0, 1)])
+        assert list(csr.offsets) == [0, 2, 2, 3]
+        assert list(csr.neighbors(0)) == [1, 2]
+        assert list(csr.neighbors(1)) == []
+    
+    def test_edges_match_importer(self, backend):
+        """Testa os mesmos relacionamentos que o importador cria no Neo4j"""
+        edges = backend.graph.edges
+        assert len(edges[("PILOTS", "Character", "Starship")].targets) == 3
+        assert len(edges[("APPEARS_IN", "Character", "Film")].targets) == 5
+        assert len(edges[("IS_SPECIES", "Character", "Species")].targets) == 4
+        assert len(edges[("SAID", "Character", "Quote")].targets) == 2
+    
+    def test_run_intents(self, backend):
+        """Testa as linhas devolvidas por count, list e detail"""
+        pilots = ("PILOTS", "Starship", "name")
+        assert backend.run("count", "Han Solo", pilots) == [{"count": 1}]
+        assert backend.run("list", "Chewbacca", pilots) == [{"value": "Millennium Falcon"}]
+        assert backend.run("count", "Yoda", pilots) == [{"count": 0}]
+        
+        profile = backend.run("detail", "Darth Vader", None)[0]
+        assert profile["planet"] == "Tatooine"
+        assert profile["species"] is None
+        assert profile["quotes"] == ["I am your father"]
+        assert profile["birth_year"] == "41.9BBY"
+    
+    def test_graph_stats(self, backend):
+        """Testa contagens por label e por tipo a partir das colunas e dos CSRs"""
+        stats = backend.graph_stats()
+        assert stats["labels"]["Character"] == 5
+        assert stats["relationships"]["APPEARS_IN"] == 8
+        assert stats["relationships"]["PILOTS"] == 3
+    
+    def test_qa_without_neo4j(self, qa_system):
+        """Testa o QA completo sobre o backend local"""
+        assert qa_system.ask("Quantas naves Han Solo pilota?") == "Total: 1"
+        assert qa_system.ask("Quais filmes Luke aparece?") == "A New Hope, The Empire Strikes Back"
+        
+        detail = qa_system.ask("Quem é Luke Skywalker?")
+        assert "Espécie: Human" in detail
+        assert "Naves: X-wing" in detail
+        assert "Ano de nascimento: 19BBY" in detail
+        
+        results = qa_system.ask_many(["Quais naves Han Solo pilota?", "Quais naves Chewbacca pilota?"])
+        assert [r["answer"] for r in results] == ["Millennium Falcon", "Millennium Falcon"]
+    
+    def test_stream_pages(self, qa_system):
+        """Testa páginas por cursor sobre o CSR até a última"""
+        pages = list(qa_system.stream("Quais filmes Luke aparece?", page_size=1))
+        assert [page["values"] for page in pages] == [["A New Hope"], ["The Empire Strikes Back"]]
+        assert pages[-1]["cursor"] is None
+        assert qa_system.ask_page("Quais naves Yoda pilota?")["values"] == []
+    
+    def test_quotes_use_schema_property(self, qa_system):
+        """Testa citações listadas e paginadas pela propriedade `quote` do schema"""
+        assert qa_system.ask("Listar citações de Darth Vader") == "I am your father"
+        assert qa_system.ask_page("Quais citações Darth Vader tem?")["values"] == ["I am your father"]
+    
+    def test_refresh_reloads_changed_file(self, backend):
+        """Testa recarga quando o star_wars.db muda"""
+        version = backend.graph_version()
+        conn = sqlite3.connect(backend.db.db_path)
+        conn.execute("INSERT INTO species (id, name) VALUES (3, 'Twi''lek')")
+        conn.commit()
+        conn.close()
+        
+        assert backend.graph_version() != version
+        backend.refresh()
+        assert "Twi'lek" in backend.graph.names["Species"]
+
+
+class TestSnapshot:
+    """Testes para o snapshot binário mapeado em memória"""
+    
+    @pytest.fixture
+    def paths(self, tmp_path):
+        """star_wars.db de exemplo e o snapshot exportado dele"""
+        db_path, snapshot_path = str(tmp_path / "star_wars.db"), str(tmp_path / "star_wars.graph")
+        create_sample_db(db_path)
+        export_snapshot(db_path, snapshot_path)
+        return db_path, snapshot_path
+    
+    def test_roundtrip_matches_local_graph(self, paths):
+        """Testa colunas, nomes e CSRs iguais aos carregados do SQLite"""
+        db_path, snapshot_path = paths
+        expected = LocalGraphBackend(db_path).graph
+        graph, header = load_snapshot(snapshot_path)
+        
+        assert header["format"] == 1
+        for label, columns in expected.columns.items():
+            for prop, values in columns.items():
+                assert list(graph.columns[label][prop]) == values
+            assert sorted(graph.names[label]) == sorted(expected.names[label])
+        for key, csr in expected.edges.items():
+            assert list(graph.edges[key].offsets) == list(csr.offsets)
+            assert list(graph.edges[key].targets) == list(csr.targets)
+        assert graph.names["Character"].get("Luke Skywalker") == [0]
+        assert graph.names["Character"].get("Jar Jar") is None
+    
+    def test_qa_over_snapshot(self, paths):
+        """Testa o QA completo servido pelo snapshot"""
+        qa_system = StarWarsDynamicQA(backend=SnapshotBackend(paths[1]))
+        assert qa_system.ask("Quantas naves Han Solo pilota?") == "Total: 1"
+        assert "Planeta natal: Tatooine" in qa_system.ask("Quem é Darth Vader?")
+    
+    def test_refresh_remaps_new_export(self, paths):
+        """Testa nova versão após reexportar, sem invalidar o mapeamento antigo"""
+        db_path, snapshot_path = paths
+        backend = SnapshotBackend(snapshot_path)
+        old_graph, version = backend.graph, backend.graph_version()
+        
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO species (id, name) VALUES (3, 'Twi''lek')")
+        conn.commit()
+        conn.close()
+        export_snapshot(db_path, snapshot_path)
+        
+        assert backend.graph_version() != version
+        backend.refresh()
+        assert "Twi'lek" in backend.graph.names["Species"]
+        assert "Twi'lek" not in old_graph.names["Species"]
+    
+    def test_rejects_other_files(self, paths):
+        """Testa erro claro para arquivos que não são snapshots"""
+        with pytest.raises(SnapshotError):
+            load_snapshot(paths[0])
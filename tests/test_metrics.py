@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Testes para as métricas de latência e o formato exposto em /metrics
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.utils import metrics
+from src.utils.metrics import NULL_TIMER, MetricsRegistry, Timer
+from src.core.backends import Neo4jBackend
+from src.core.local_graph import LocalGraphBackend
+from src.core.qa_system import StarWarsDynamicQA
+from src.utils.neo4j_pool import GraphClient
+from test_importer import create_sample_db
+
+
+class TestMetrics:
+    """Testes para contadores, histogramas e instrumentação do ask()"""
+    
+    def test_histogram_renders_cumulative_buckets(self):
+        """Testa buckets acumulados, soma e contagem no formato do Prometheus"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latência", ["intent"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, "count")
+        registry.counter("errors_total", "Erros", ["stage"]).inc("query")
+        
+        text = registry.render()
+        assert '# TYPE latency_seconds histogram' in text
+        assert 'latency_seconds_bucket{intent="count",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{intent="count",le="1"} 2' in text
+        assert 'latency_seconds_bucket{intent="count",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{intent="count"} 3' in text
+        assert 'errors_total{stage="query"} 1' in text
+    
+    def test_disabled_metrics_use_null_timer(self):
+        """Testa que, desligadas, nenhuma medição é feita"""
+        with patch.object(metrics.METRICS, "enabled", False):
+            assert metrics.timer() is NULL_TIMER
+        with patch.object(metrics.METRICS, "enabled", True):
+            assert isinstance(metrics.timer(), Timer)
+    
+    def test_ask_records_stages_and_cache(self, tmp_path):
+        """Testa etapas resolve/intent/query/format e o resultado do cache por intent"""
+        path = str(tmp_path / "star_wars.db")
+        create_sample_db(path)
+        qa_system = StarWarsDynamicQA(backend=LocalGraphBackend(path))
+        stages = {stage: metrics.STAGE_SECONDS.count(stage) for stage in ("resolve", "intent", "query", "format")}
+        misses = metrics.REQUEST_SECONDS.count("count", "miss")
+        hits = metrics.REQUEST_SECONDS.count("count", "hit")
+        
+        with patch.object(metrics.METRICS, "enabled", True):
+            qa_system.ask("Quantas naves Han Solo pilota?")
+            qa_system.ask("Quantas naves Han Solo pilota?")
+        
+        assert metrics.REQUEST_SECONDS.count("count", "miss") == misses + 1
+        assert metrics.REQUEST_SECONDS.count("count", "hit") == hits + 1
+        assert metrics.STAGE_SECONDS.count("resolve") == stages["resolve"] + 2
+        assert metrics.STAGE_SECONDS.count("format") == stages["format"] + 1
+    
+    def test_build_stage_not_counted_in_query(self):
+        """Testa o build do backend Neo4j como etapa própria, fora do lap de query"""
+        graph = MagicMock()
+        graph.query.return_value = [{"count": 2}]
+        qa_system = StarWarsDynamicQA(backend=Neo4jBackend(graph))
+        stopwatch = MagicMock()
+        
+        with patch('src.core.qa_system.timer', return_value=stopwatch):
+            qa_system.ask("Quantas naves Han Solo pilota?")
+        
+        laps = [c.args[0] for c in stopwatch.lap.call_args_list]
+        assert laps[-3:] == ["build", "query", "format"]
+    
+    def test_neo4j_query_counters(self):
+        """Testa consultas, tempo e falhas contados no GraphClient"""
+        driver = MagicMock()
+        driver.execute_query.side_effect = [([], None, None), RuntimeError("sem conexão")]
+        client = GraphClient(driver)
+        queries = metrics.NEO4J_QUERIES.value()
+        errors = metrics.NEO4J_QUERY_ERRORS.value()
+        
+        with patch.object(metrics.METRICS, "enabled", True):
+            client.query("RETURN 1")
+            with pytest.raises(RuntimeError):
+                client.query("RETURN 1")
+        
+        assert metrics.NEO4J_QUERIES.value() == queries + 2
+        assert metrics.NEO4J_QUERY_ERRORS.value() == errors + 1
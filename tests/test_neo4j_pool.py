@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Testes para a fábrica de drivers Neo4j e as métricas de pool
+"""
+
+import asyncio
+import logging
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.utils import neo4j_pool
+from src.utils.neo4j_pool import (AsyncPooledDriver, PoolMetrics, PooledDriver, create_async_driver,
+                                  get_driver, pool_stats)
+
+
+class TestNeo4jPool:
+    """Testes para o driver compartilhado"""
+    
+    @pytest.fixture(autouse=True)
+    def clean_registry(self):
+        """Isola o cache de drivers entre os testes"""
+        neo4j_pool._drivers.clear()
+        neo4j_pool._async_metrics.clear()
+        yield
+        neo4j_pool._drivers.clear()
+        neo4j_pool._async_metrics.clear()
+    
+    def test_metrics_count_sessions_and_queries(self):
+        """Testa sessões e consultas em uso contadas pela API pública do driver"""
+        raw = MagicMock()
+        raw.execute_query.side_effect = [([], None, None), RuntimeError("sem conexão")]
+        metrics = PoolMetrics(max_size=2)
+        driver = PooledDriver(raw, metrics)
+        
+        with driver.session(database="neo4j"):
+            with driver.session():
+                assert metrics.snapshot()["in_use"] == 2
+            driver.execute_query("RETURN 1")
+            with pytest.raises(RuntimeError):
+                driver.execute_query("RETURN 1")
+        
+        stats = metrics.snapshot()
+        assert stats["in_use"] == 0
+        assert stats["max_in_use"] == 2
+        assert stats["sessions"] == 2
+        assert stats["queries"] == 2
+        assert stats["failures"] == 1
+        raw.session.assert_any_call(database="neo4j")
+    
+    def test_async_driver_counts_sessions_and_queries(self):
+        """Testa a contagem com AsyncSession e execute_query assíncrono"""
+        raw = MagicMock()
+        raw.execute_query = AsyncMock(return_value=([], None, None))
+        metrics = PoolMetrics(max_size=1)
+        driver = AsyncPooledDriver(raw, metrics)
+        
+        async def run():
+            async with driver.session():
+                assert metrics.snapshot()["in_use"] == 1
+            await driver.execute_query("RETURN 1")
+        
+        asyncio.run(run())
+        stats = metrics.snapshot()
+        assert (stats["in_use"], stats["sessions"], stats["queries"]) == (0, 1, 1)
+    
+    def test_acquisition_wait_measured_until_work_runs(self):
+        """Testa a espera medida até a primeira execução da função de trabalho (retries não contam)"""
+        raw = MagicMock()
+        
+        def execute_write(work, *args):
+            work("tx", *args)
+            return work("tx", *args)
+        
+        raw.session.return_value.execute_write.side_effect = execute_write
+        raw.session.return_value.execute_read.side_effect = RuntimeError("timeout")
+        metrics = PoolMetrics(max_size=1)
+        driver = PooledDriver(raw, metrics)
+        
+        with driver.session() as session:
+            assert session.execute_write(lambda tx, value: (tx, value), 1) == ("tx", 1)
+            with pytest.raises(RuntimeError):
+                session.execute_read(lambda tx: None)
+        
+        stats = metrics.snapshot()
+        assert (stats["acquisitions"], stats["acquisition_failures"]) == (1, 1)
+        assert stats["acquisition_wait_max_ms"] >= stats["acquisition_wait_avg_ms"] >= 0
+    
+    def test_async_acquisition_wait(self):
+        """Testa a espera medida com funções de trabalho corrotinas"""
+        raw = MagicMock()
+        
+        async def execute_read(work, *args):
+            return await work("tx", *args)
+        
+        raw.session.return_value.__aenter__ = AsyncMock()
+        raw.session.return_value.__aexit__ = AsyncMock(return_value=False)
+        raw.session.return_value.execute_read = AsyncMock(side_effect=execute_read)
+        metrics = PoolMetrics(max_size=1)
+        driver = AsyncPooledDriver(raw, metrics)
+        
+        async def work(tx, value):
+            return value
+        
+        async def run():
+            async with driver.session() as session:
+                return await session.execute_read(work, 42)
+        
+        assert asyncio.run(run()) == 42
+        assert metrics.snapshot()["acquisitions"] == 1
+    
+    def test_new_connections_counted_from_pool_log(self, caplog):
+        """Testa conexões novas contadas pelo log neo4j.pool sem expor os registros DEBUG"""
+        pool_logger = logging.getLogger("neo4j.pool")
+        
+        def execute_query(*args, **kwargs):
+            pool_logger.debug("[#0000]  _: <POOL> trying to hand out new connection")
+            pool_logger.warning("aviso do pool")
+            return [], None, None
+        
+        with patch('src.utils.neo4j_pool.GraphDatabase') as mock_db:
+            mock_db.driver.return_value.execute_query.side_effect = execute_query
+            driver = get_driver('bolt://x', 'neo4j', 'senha')
+            with caplog.at_level(logging.WARNING):
+                driver.execute_query("RETURN 1")
+                driver.execute_query("RETURN 1")
+            # Fora de uma sessão ou consulta do driver não há a quem atribuir
+            pool_logger.debug("[#0000]  _: <POOL> trying to hand out new connection")
+        
+        assert pool_stats()["bolt://x"]["connections_created"] == 2
+        assert [r.getMessage() for r in caplog.records if r.name == "neo4j.pool"] == ["aviso do pool"] * 2
+    
+    def test_async_metrics_dropped_when_drivers_close(self):
+        """Testa as métricas dos AsyncDrivers somadas por (uri, usuário) e descartadas no fechamento"""
+        with patch('src.utils.neo4j_pool.AsyncGraphDatabase') as mock_db:
+            mock_db.driver.return_value.close = AsyncMock()
+            first = create_async_driver('bolt://x', 'neo4j', 'senha')
+            second = create_async_driver('bolt://x', 'neo4j', 'senha')
+        
+        assert first.metrics is second.metrics
+        size = neo4j_pool.Settings.NEO4J_MAX_POOL_SIZE
+        assert pool_stats()["async:bolt://x"]["max_size"] == 2 * size
+        
+        asyncio.run(first.close())
+        asyncio.run(first.close())
+        assert pool_stats()["async:bolt://x"]["max_size"] == size
+        asyncio.run(second.close())
+        assert "async:bolt://x" not in pool_stats()
+    
+    def test_get_driver_is_shared(self):
+        """Testa reaproveitamento do driver e configuração do pool por Settings"""
+        with patch('src.utils.neo4j_pool.GraphDatabase') as mock_db:
+            first = get_driver('bolt://x', 'neo4j', 'senha')
+            second = get_driver('bolt://x', 'neo4j', 'senha')
+        
+        assert first is second
+        mock_db.driver.assert_called_once()
+        kwargs = mock_db.driver.call_args.kwargs
+        assert kwargs["max_connection_pool_size"] == neo4j_pool.Settings.NEO4J_MAX_POOL_SIZE
+        assert kwargs["connection_acquisition_timeout"] == neo4j_pool.Settings.NEO4J_ACQUISITION_TIMEOUT
+        assert "bolt://x" in pool_stats()
+    
+    def test_forked_child_creates_its_own_driver(self):
+        """Testa que o filho esquece o driver herdado sem fechá-lo"""
+        with patch('src.utils.neo4j_pool.GraphDatabase') as mock_db:
+            mock_db.driver.side_effect = [MagicMock(), MagicMock()]
+            parent = get_driver('bolt://x', 'neo4j', 'senha')
+            neo4j_pool._reset_after_fork()
+            child = get_driver('bolt://x', 'neo4j', 'senha')
+        
+        assert child is not parent
+        parent.close.assert_not_called()
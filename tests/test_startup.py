@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Testes de tempo de importação dos pontos de entrada (python -X importtime)
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamento de importação (ms) de cada ponto de entrada; IMPORT_BUDGET_FACTOR
+# multiplica os limites em máquinas lentas
+BUDGETS_MS = {
+    "chat": 300,
+    "main": 300,
+    "web_chat": 600,
+}
+
+# Pacotes que só podem ser carregados quando usados (conexão ao Neo4j)
+DEFERRED = ("neo4j", "langchain", "langchain_neo4j", "pandas")
+
+
+def import_times(module: str):
+    """Tempo acumulado (µs) por módulo importado, lido do relatório do -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+    """Testes para a importação leve de chat.py, main.py e web_chat.py"""
+    
+    @pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+    def test_entry_point_import_budget(self, module):
+        """Testa que o ponto de entrada não carrega o driver Neo4j e cabe no orçamento"""
+        times = import_times(module)
+        assert module in times
+        
+        loaded = {name.split(".")[0] for name in times}
+        assert not loaded & set(DEFERRED)
+        
+        budget_ms = BUDGETS_MS[module] * float(os.getenv("IMPORT_BUDGET_FACTOR", "1"))
+        assert times[module] / 1000 < budget_ms, f"{module}: {times[module] / 1000:.0f} ms"
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Testes para o aquecimento do grafo (templates, índices e readiness)
+"""
+
+import os
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+
+from src.core.backends import Neo4jBackend
+from src.core.cypher import INDEX_WARMUP_QUERIES, TOP_CHARACTERS_QUERY
+from src.core.local_graph import LocalGraphBackend
+from src.core.qa_system import StarWarsDynamicQA
+from src.core.warmup import GraphWarmup
+from test_importer import create_sample_db
+
+RELATIONS = [("PILOTS", "Starship", "name"), ("SAID", "Quote", "quote")]
+
+
+class TestGraphWarmup:
+    """Testes para GraphWarmup e o aquecimento do QA"""
+    
+    @pytest.fixture
+    def backend(self, tmp_path):
+        """Grafo local do star_wars.db de exemplo"""
+        path = str(tmp_path / "star_wars.db")
+        create_sample_db(path)
+        return LocalGraphBackend(path)
+    
+    def test_runs_every_template_per_entity(self):
+        """Testa índices, lista padrão e count/list/página/perfil de cada entidade"""
+        backend = MagicMock()
+        backend.warm_indexes.return_value = 3
+        warmup = GraphWarmup(backend, RELATIONS, lambda: ["Han Solo", "Luke Skywalker"], page_size=10)
+        
+        stats = warmup.run()
+        assert stats == {"ready": True, "state": "done", "queries": 3 + 1 + 2 * 7,
+                         "errors": 0, "seconds": warmup.seconds}
+        backend.run.assert_any_call("list", None, None)
+        backend.run.assert_any_call("detail", "Luke Skywalker", None)
+        backend.run.assert_any_call("count", "Han Solo", RELATIONS[1])
+        backend.run_page.assert_any_call("Han Solo", RELATIONS[0], None, 11)
+    
+    def test_failures_still_mark_ready(self):
+        """Testa que erros são contados sem impedir a readiness"""
+        backend = MagicMock()
+        backend.warm_indexes.side_effect = RuntimeError("sem conexão")
+        backend.run.side_effect = RuntimeError("sem conexão")
+        warmup = GraphWarmup(backend, [], lambda: [])
+        
+        warmup.start()
+        assert warmup.wait(5)
+        assert warmup.stats()["errors"] == 2
+    
+    def test_neo4j_backend_queries(self):
+        """Testa as varreduras de índice e a escolha por número de relacionamentos"""
+        graph = Mock()
+        graph.query.return_value = [{"name": "Han Solo"}]
+        backend = Neo4jBackend(graph)
+        
+        assert backend.top_entities(5) == ["Han Solo"]
+        graph.query.assert_called_with(TOP_CHARACTERS_QUERY, {"limit": 5})
+        assert backend.warm_indexes() == len(INDEX_WARMUP_QUERIES)
+        assert any("Character" in query and "c.name" in query for query in INDEX_WARMUP_QUERIES)
+    
+    def test_local_top_entities(self, backend):
+        """Testa personagens ordenados pelo total de relacionamentos (empate pelo nome)"""
+        assert backend.top_entities(3) == ["Han Solo", "Luke Skywalker", "Darth Vader"]
+    
+    def test_qa_warms_up_in_background(self, backend):
+        """Testa o aquecimento iniciado pelo QA e a ordem das entidades"""
+        with patch.dict(os.environ, {"QA_WARMUP": "1", "QA_WARMUP_ENTITIES": "Leia Organa",
+                                     "QA_WARMUP_SIZE": "3"}):
+            qa_system = StarWarsDynamicQA(backend=backend)
+            assert qa_system.warmup.wait(5)
+            assert qa_system.warmup.stats()["errors"] == 0
+            
+            qa_system.ask("Quantas naves Han Solo pilota?")
+            entities = qa_system._warmup_entities()
+        assert entities[:2] == ["Leia Organa", "Han Solo"]
+        assert len(entities) == 3
+    
+    def test_disabled_warmup_is_ready(self, backend):
+        """Testa QA_WARMUP=0: pronto sem consultas, e start_warmup(wait=True) ainda aquece"""
+        qa_system = StarWarsDynamicQA(backend=backend)
+        assert qa_system.warmup.stats()["state"] == "disabled"
+        assert qa_system.warmup.ready.is_set()
+        
+        stats = qa_system.start_warmup(wait=True)
+        assert stats["state"] == "done"
+        assert stats["queries"] > 0
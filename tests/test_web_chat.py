@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Testes para a aplicação web do chat (fábrica, QA por processo e readiness)
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, patch
+
+from src.core.local_graph import LocalGraphBackend
+from src.core.qa_system import StarWarsDynamicQA
+from test_importer import create_sample_db
+from web_chat import LazyQA, create_app
+
+QUESTION = 'Quais filmes Luke aparece?'
+
+
+class TestWebChat:
+    """Testes para create_app e LazyQA"""
+    
+    @pytest.fixture
+    def qa_system(self):
+        """QA falso com backend acessível"""
+        qa = Mock()
+        qa.ask.return_value = "Total: 1"
+        qa.backend.graph_version.return_value = "v1"
+        qa.warmup.stats.return_value = {'ready': True, 'state': 'done'}
+        return qa
+    
+    @pytest.fixture
+    def client(self, tmp_path):
+        """Cliente da aplicação com o QA servido pelo grafo local de exemplo"""
+        path = str(tmp_path / "star_wars.db")
+        create_sample_db(path)
+        qa = StarWarsDynamicQA(backend=LocalGraphBackend(path))
+        return create_app(Mock(return_value=qa)).test_client()
+    
+    def test_qa_created_on_first_request_only(self, qa_system):
+        """Testa que a importação e a fábrica não criam o QA antes da primeira requisição"""
+        factory = Mock(return_value=qa_system)
+        client = create_app(factory).test_client()
+        factory.assert_not_called()
+        
+        for _ in range(3):
+            response = client.post('/ask', json={'question': 'Quantas naves Han Solo pilota?'})
+            assert response.get_json() == {'success': True, 'answer': 'Total: 1'}
+        factory.assert_called_once()
+    
+    def test_ready_reports_failures(self, qa_system):
+        """Testa 503 enquanto o QA não inicializa e 200 quando o grafo responde"""
+        factory = Mock(side_effect=[RuntimeError("Neo4j fora do ar"), qa_system])
+        app = create_app(factory)
+        client = app.test_client()
+        
+        response = client.get('/ready')
+        assert response.status_code == 503
+        assert response.get_json()['error'] == "Neo4j fora do ar"
+        
+        app.extensions['qa']._retry_at = 0
+        assert client.get('/ready').status_code == 200
+        
+        qa_system.backend.graph_version.side_effect = RuntimeError("sem conexão")
+        assert client.get('/ready').status_code == 503
+        assert client.get('/health').status_code == 200
+    
+    def test_ready_waits_for_warmup(self, qa_system):
+        """Testa 503 enquanto o grafo é aquecido"""
+        client = create_app(Mock(return_value=qa_system)).test_client()
+        qa_system.warmup.stats.return_value = {'ready': False, 'state': 'running'}
+        response = client.get('/ready')
+        assert response.status_code == 503
+        assert response.get_json()['warmup']['state'] == 'running'
+        
+        qa_system.warmup.stats.return_value = {'ready': True, 'state': 'done'}
+        assert client.get('/ready').get_json()['ready'] is True
+    
+    def test_forked_worker_creates_its_own_qa(self, qa_system):
+        """Testa que um processo filho não reaproveita (nem fecha) o QA do pai"""
+        factory = Mock(side_effect=[qa_system, Mock()])
+        provider = LazyQA(factory)
+        parent = provider.get()
+        
+        with patch('web_chat.os.getpid', return_value=-1):
+            child = provider.get()
+        
+        assert child is not parent
+        assert factory.call_count == 2
+        parent.close.assert_not_called()
+    
+    def test_metrics_endpoint(self, qa_system):
+        """Testa /metrics no formato texto do Prometheus"""
+        client = create_app(Mock(return_value=qa_system)).test_client()
+        with patch('web_chat.METRICS.enabled', True):
+            response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert '# TYPE qa_request_seconds histogram' in response.get_data(as_text=True)
+        
+        with patch('web_chat.METRICS.enabled', False):
+            assert client.get('/metrics').status_code == 404
+    
+    def test_ask_with_cursor_and_limit(self, client):
+        """Testa /ask paginado: cursor da página seguinte e limit convertido e limitado"""
+        first = client.post('/ask', json={'question': QUESTION, 'limit': 1}).get_json()
+        assert first['values'] == ['A New Hope']
+        assert first['cursor'] is not None
+        
+        second = client.post('/ask', json={'question': QUESTION, 'cursor': first['cursor'], 'limit': '1'})
+        assert second.get_json() == {'success': True, 'answer': 'The Empire Strikes Back',
+                                     'values': ['The Empire Strikes Back'], 'cursor': None}
+        
+        assert client.post('/ask', json={'question': QUESTION, 'limit': 0}).get_json()['values'] == ['A New Hope']
+        assert len(client.post('/ask', json={'question': QUESTION, 'limit': 10 ** 9}).get_json()['values']) == 2
+        for bad in ('dez', [1], True):
+            response = client.post('/ask', json={'question': QUESTION, 'limit': bad})
+            assert response.status_code == 400
+            assert 'limit inválido' in response.get_json()['error']
+    
+    def test_ask_validates_cursor(self, client):
+        """Testa /ask com cursor em string (convertido) e 400 para cursor inválido ou negativo"""
+        first = client.post('/ask', json={'question': QUESTION, 'limit': 1}).get_json()
+        page = client.post('/ask', json={'question': QUESTION, 'cursor': str(first['cursor']), 'limit': 1})
+        assert page.get_json()['values'] == ['The Empire Strikes Back']
+        
+        for bad in ('abc', -1, '-5', 2.5, False):
+            response = client.post('/ask', json={'question': QUESTION, 'cursor': bad})
+            assert response.status_code == 400
+            assert 'cursor inválido' in response.get_json()['error']
+    
+    def test_ask_stream(self, client):
+        """Testa /ask/stream: uma página por evento, evento end e 400 para limit inválido"""
+        response = client.get('/ask/stream', query_string={'question': QUESTION, 'limit': 1})
+        assert response.mimetype == 'text/event-stream'
+        events = response.get_data(as_text=True).strip().split("\n\n")
+        pages = [json.loads(event[len("data: "):]) for event in events if event.startswith("data: ")]
+        assert [page['values'] for page in pages] == [['A New Hope'], ['The Empire Strikes Back']]
+        assert events[-1] == "event: end\ndata: {}"
+        
+        response = client.post('/ask/stream', json={'question': QUESTION, 'limit': 'x'})
+        assert response.status_code == 400
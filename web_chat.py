@@ -1,24 +1,96 @@
+import atexit
+import json
 import os
 import sys
-from flask import Flask, render_template_string, request, jsonify
+import threading
+import time
+from typing import Callable, Optional
+from flask import (Blueprint, Flask, Response, current_app, render_template_string, request, jsonify,
+                   stream_with_context)
 from dotenv import load_dotenv
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.core.qa_system import StarWarsDynamicQA
 from src.config.settings import Settings
+from src.utils.metrics import METRICS
+from src.utils.neo4j_pool import pool_stats
 
 load_dotenv()
 
-app = Flask(__name__)
+# Segundos entre tentativas de criar o QA quando a inicialização falha
+QA_INIT_RETRY = float(os.getenv("QA_INIT_RETRY", "5"))
 
-try:
+
+def default_qa_factory() -> StarWarsDynamicQA:
+    """QA configurado pelo ambiente"""
     Settings.validate()
-    qa_system = StarWarsDynamicQA()
-    print("✅ Sistema QA inicializado com sucesso")
-except Exception as e:
-    print(f"❌ Erro ao inicializar: {e}")
-    qa_system = None
+    return StarWarsDynamicQA()
+
+
+class LazyQA:
+    """
+    QA criado na primeira requisição de cada processo
+    
+    Nada conecta na importação nem no processo mestre do gunicorn; um
+    worker criado por fork descarta o estado herdado e cria o próprio QA
+    (e o próprio pool do Neo4j). Falhas são repetidas a cada QA_INIT_RETRY s.
+    """
+    
+    def __init__(self, factory: Callable[[], StarWarsDynamicQA]):
+        self.factory = factory
+        self._reset()
+    
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._qa: Optional[StarWarsDynamicQA] = None
+        self._retry_at = 0.0
+        self.error: Optional[str] = None
+    
+    def get(self) -> Optional[StarWarsDynamicQA]:
+        if self._pid != os.getpid():
+            self._reset()
+        if self._qa is None and time.monotonic() >= self._retry_at:
+            with self._lock:
+                if self._qa is None and time.monotonic() >= self._retry_at:
+                    try:
+                        self._qa = self.factory()
+                        self.error = None
+                        print(f"✅ Sistema QA inicializado com sucesso (pid {self._pid})")
+                    except Exception as e:
+                        self.error = str(e)
+                        self._retry_at = time.monotonic() + QA_INIT_RETRY
+                        print(f"❌ Erro ao inicializar: {e}")
+        return self._qa
+    
+    def close(self):
+        """Fecha o QA deste processo (e o driver do Neo4j), se já foi criado"""
+        qa, self._qa = self._qa, None
+        if qa is not None and self._pid == os.getpid():
+            qa.close()
+
+
+chat = Blueprint('chat', __name__)
+
+
+def get_qa() -> Optional[StarWarsDynamicQA]:
+    """QA do processo atual"""
+    return current_app.extensions['qa'].get()
+
+
+def create_app(qa_factory: Optional[Callable[[], StarWarsDynamicQA]] = None) -> Flask:
+    """
+    Aplicação Flask do chat (gunicorn: web_chat:app ou "web_chat:create_app()")
+    
+    Args:
+        qa_factory: Cria o QA de cada processo (padrão: default_qa_factory)
+    """
+    app = Flask(__name__)
+    provider = app.extensions['qa'] = LazyQA(qa_factory or default_qa_factory)
+    app.register_blueprint(chat)
+    atexit.register(provider.close)
+    return app
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -235,12 +307,13 @@ HTML_TEMPLATE = """
 </html>
 """
 
-@app.route('/')
+@chat.route('/')
 def home():
     return render_template_string(HTML_TEMPLATE)
 
-@app.route('/ask', methods=['POST'])
+@chat.route('/ask', methods=['POST'])
 def ask():
+    qa_system = get_qa()
     try:
         data = request.get_json()
         question = data.get('question', '').strip()
@@ -251,12 +324,131 @@ def ask():
         if not qa_system:
             return jsonify({'success': False, 'error': 'Sistema QA não inicializado'})
         
+        # Com cursor/limit a resposta vem paginada: {"answer", "values", "cursor"}
+        if 'cursor' in data or 'limit' in data:
+            try:
+                limit = qa_system.page_limit(data.get('limit'))
+                cursor = qa_system.page_cursor(data.get('cursor'))
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            page = qa_system.ask_page(question, cursor, limit)
+            return jsonify({'success': True, **page})
+        
         answer = qa_system.ask(question)
         return jsonify({'success': True, 'answer': answer})
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+def sse(data, event=None):
+    """Evento Server-Sent Events com dados JSON"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@chat.route('/ask/stream', methods=['GET', 'POST'])
+def ask_stream():
+    """Páginas da resposta como Server-Sent Events, enviadas assim que lidas"""
+    qa_system = get_qa()
+    data = request.get_json(silent=True) or request.args
+    question = (data.get('question') or '').strip()
+    limit = data.get('limit')
+    
+    if not question:
+        return jsonify({'success': False, 'error': 'Pergunta vazia'})
+    
+    if not qa_system:
+        return jsonify({'success': False, 'error': 'Sistema QA não inicializado'})
+    
+    try:
+        limit = qa_system.page_limit(limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    def events():
+        try:
+            for page in qa_system.stream(question, limit):
+                yield sse(page)
+        except Exception as e:
+            yield sse({'error': str(e)}, event='error')
+        yield sse({}, event='end')
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@chat.route('/ask_batch', methods=['POST'])
+def ask_batch():
+    qa_system = get_qa()
+    try:
+        data = request.get_json()
+        questions = data.get('questions')
+
+        if not isinstance(questions, list) or not questions:
+            return jsonify({'success': False, 'error': 'Envie uma lista de perguntas'})
+
+        if not qa_system:
+            return jsonify({'success': False, 'error': 'Sistema QA não inicializado'})
+
+        return jsonify({'success': True, 'results': qa_system.ask_many(questions)})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@chat.route('/graph/stats')
+def graph_stats():
+    qa_system = get_qa()
+    if not qa_system:
+        return jsonify({'success': False, 'error': 'Sistema QA não inicializado'})
+    return jsonify({'success': True, 'stats': qa_system.graph_stats()})
+
+@chat.route('/cache/stats')
+def cache_stats():
+    qa_system = get_qa()
+    if not qa_system:
+        return jsonify({'success': False, 'error': 'Sistema QA não inicializado'})
+    return jsonify({'success': True, 'stats': qa_system.cache_stats()})
+
+@chat.route('/cache/invalidate', methods=['POST'])
+def cache_invalidate():
+    qa_system = get_qa()
+    if not qa_system:
+        return jsonify({'success': False, 'error': 'Sistema QA não inicializado'})
+    qa_system.invalidate_cache()
+    return jsonify({'success': True})
+
+@chat.route('/health')
+def health():
+    """Liveness: o processo responde (não consulta o grafo)"""
+    return jsonify({'status': 'ok'})
+
+@chat.route('/ready')
+def ready():
+    """Readiness: QA inicializado neste worker, grafo acessível e aquecimento concluído"""
+    provider = current_app.extensions['qa']
+    qa_system = provider.get()
+    if not qa_system:
+        return jsonify({'ready': False, 'error': provider.error}), 503
+    try:
+        qa_system.backend.graph_version()
+    except Exception as e:
+        return jsonify({'ready': False, 'error': str(e)}), 503
+    warmup = qa_system.warmup.stats()
+    if not warmup['ready']:
+        return jsonify({'ready': False, 'warmup': warmup}), 503
+    return jsonify({'ready': True, 'pid': os.getpid(), 'warmup': warmup})
+
+@chat.route('/pool/stats')
+def neo4j_pool_stats():
+    return jsonify({'success': True, 'stats': pool_stats()})
+
+@chat.route('/metrics')
+def metrics():
+    """Latências por etapa e por intent, consultas ao Neo4j e erros (formato Prometheus, por worker)"""
+    if not METRICS.enabled:
+        return Response("# métricas desligadas (QA_METRICS=0)\n", status=404, mimetype='text/plain')
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+app = create_app()
+
 if __name__ == '__main__':
     print("🌟 Iniciando servidor web...")
     print("📱 Acesse: http://localhost:5000")